@@ -8,12 +8,26 @@ This architecture follows Stake's core principle:
 - Frontend decides ILLUSION (events → visuals → animation)
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import secrets
 import hashlib
 import hmac
+import json
+import os
+import secrets
+import threading
 import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+from provably_fair import ProvablyFairStream, load_server_secret, sub_random, sub_randoms
+from spawn_plan import SpawnPlan, SECTIONS
+from session_store import SessionStore, RoundStore, PlayKeyStore, create_backend
+from metrics import MetricsRegistry, metrics_enabled_from_env
+from round_archive import RoundArchive, RoundCompactor
+from ledger import BalanceLedger, InsufficientFunds, UnknownAccount
+from book_table import BookTable
 
 app = Flask(__name__,
             static_folder='public',
@@ -30,13 +44,152 @@ MONETARY_PRECISION = 1_000_000  # 1 unit = 1.00 in display currency
 MIN_BET = MONETARY_PRECISION    # 1.00 in micro-units
 MAX_BET = 100 * MONETARY_PRECISION  # 100.00 in micro-units
 STEP_BET = MONETARY_PRECISION   # 1.00 step
-
-# Server secret for provably fair RNG
-SERVER_SECRET = secrets.token_hex(32)
-
-# Session storage (use Redis in production)
-sessions = {}
-rounds = {}
+STARTING_BALANCE = 10000_000_000  # 10,000.00 starting balance
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Durable state (server secret, journals, round archive) lives under RGS_DATA_DIR.
+# Unset, nothing is written to disk: the secret is per-process and balances,
+# sessions and rounds last as long as the process. Each file can also be set
+# (or disabled with '') through its own variable below.
+DATA_DIR = os.environ.get('RGS_DATA_DIR', '')
+if DATA_DIR:
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+def data_path(env_var: str, name: str) -> str:
+    """Path from env_var, else name under DATA_DIR; '' means disabled"""
+    return os.environ.get(env_var, os.path.join(DATA_DIR, name) if DATA_DIR else '')
+
+# Server secret for provably fair RNG, persisted so a restart keeps verifying
+# recovered sessions and resolving their account ids.
+SECRET_FILE = data_path('RGS_SECRET_FILE', 'rgs_secret.key')
+SERVER_SECRET = load_server_secret(SECRET_FILE)
+ACCOUNT_KEY = hmac.new(SERVER_SECRET.encode(), b'account-id', hashlib.sha256).digest()
+
+# Session storage - set REDIS_URL to share sessions across worker processes
+REDIS_URL = os.environ.get('REDIS_URL')
+SESSION_TTL_SECONDS = 24 * 3600
+ROUND_TTL_SECONDS = 7 * 24 * 3600
+STORE_MAX_ENTRIES = 200_000
+
+# Sessions and rounds are journaled so they survive a restart alongside their
+# balances: an active round carries a bet that is already debited.
+SESSION_JOURNAL = data_path('SESSION_JOURNAL', 'session_journal.jsonl')
+ROUND_JOURNAL = data_path('ROUND_JOURNAL', 'round_journal.jsonl')
+PLAY_KEY_JOURNAL = data_path('PLAY_KEY_JOURNAL', 'play_key_journal.jsonl')
+
+_store_backend = create_backend(REDIS_URL, max_entries=STORE_MAX_ENTRIES)
+# Round records carry an already-debited bet until /endround, so they expire by TTL only
+_round_backend = create_backend(REDIS_URL, max_entries=None)
+sessions = SessionStore(_store_backend, ttl=SESSION_TTL_SECONDS, journal_path=SESSION_JOURNAL or None)
+rounds = RoundStore(_round_backend, ttl=ROUND_TTL_SECONDS, journal_path=ROUND_JOURNAL or None)
+# /play idempotency keys outlive the ledger's short per-account key window,
+# so a late retry finds its round instead of placing a second bet
+play_keys = PlayKeyStore(_round_backend, ttl=ROUND_TTL_SECONDS, journal_path=PLAY_KEY_JOURNAL or None)
+
+# Balances live in the ledger (CAS updates + write-ahead journal), not in session
+# records. The ledger gets its own backend with no LRU eviction: an account is
+# only dropped after SESSION_TTL_SECONDS idle, when its session has expired too.
+LEDGER_JOURNAL = data_path('LEDGER_JOURNAL', 'ledger_journal.jsonl')
+_ledger_backend = create_backend(REDIS_URL, max_entries=None)
+ledger = BalanceLedger(_ledger_backend, journal_path=LEDGER_JOURNAL or None, ttl=SESSION_TTL_SECONDS)
+
+# Completed rounds move to an append-only zstd log after COMPLETED_ROUND_TTL_SECONDS
+# (with no archive they expire from the live store then, so only active rounds add up)
+ROUND_ARCHIVE_DIR = data_path('ROUND_ARCHIVE_DIR', 'round_archive')
+COMPLETED_ROUND_TTL_SECONDS = 300
+ROUND_COMPACTION_INTERVAL_SECONDS = 30
+
+_round_archive = None
+_round_compactor = None
+
+def get_round_archive():
+    """Round archive, opened on first use; None when archiving is disabled"""
+    global _round_archive
+    if _round_archive is None and ROUND_ARCHIVE_DIR:
+        _round_archive = RoundArchive(ROUND_ARCHIVE_DIR)
+    return _round_archive
+
+_recovered_pid = None
+_recover_lock = threading.Lock()
+
+def recover_ledger() -> int:
+    """
+    Restore sessions, rounds and balances from their journals.
+    Runs once per process: __main__ and the ASGI lifespan call it at startup
+    and WSGI servers (gunicorn app:app) run it on the first request. Later
+    calls in the same process return 0.
+    """
+    global _recovered_pid
+    if _recovered_pid == os.getpid():
+        return 0
+    with _recover_lock:
+        if _recovered_pid == os.getpid():
+            return 0
+        sessions.recover()
+        rounds.recover()
+        play_keys.recover()
+        restored = ledger.recover()
+        _recovered_pid = os.getpid()
+        return restored
+
+def start_round_compactor():
+    """
+    Start background compaction of completed rounds.
+    Called by __main__ and the ASGI lifespan; WSGI servers start it on the
+    first request through start_worker().
+    """
+    global _round_compactor
+    archive = get_round_archive()
+    if archive is None:
+        return None
+    if _round_compactor is None:
+        _round_compactor = RoundCompactor(
+            rounds,
+            archive,
+            ttl=COMPLETED_ROUND_TTL_SECONDS,
+            interval=ROUND_COMPACTION_INTERVAL_SECONDS
+        )
+    _round_compactor.start()
+    return _round_compactor
+
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+def start_worker() -> None:
+    """
+    Recover journals and start round compaction, once per process.
+    Run on the first request so WSGI servers (gunicorn app:app) get both
+    without server hooks; forked workers start their own.
+    """
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    with _worker_lock:
+        if _worker_pid == os.getpid():
+            return
+        recover_ledger()
+        start_round_compactor()
+        _worker_pid = os.getpid()
+
+def stop_round_compactor():
+    """Stop background compaction if running"""
+    if _round_compactor is not None:
+        _round_compactor.stop()
+
+def find_round(round_id: str):
+    """Live round record, falling back to the archive for compacted rounds"""
+    if not round_id:
+        return None
+    round_data = rounds.get(round_id)
+    if round_data is None:
+        archive = get_round_archive()
+        if archive is not None:
+            round_data = archive.get(round_id)
+    return round_data
+
+# Hot-path metrics - set RGS_METRICS=1 to collect and serve /metrics
+metrics = MetricsRegistry(enabled=metrics_enabled_from_env(), target_rtp=RTP)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PROVABLY FAIR RNG
@@ -51,29 +204,49 @@ def generate_client_seed():
 def generate_nonce():
     return secrets.randbelow(2**32)
 
+@lru_cache(maxsize=4096)
+def get_rng_stream(server_seed: str, client_seed: str) -> ProvablyFairStream:
+    """Keyed HMAC stream for a session, cached per seed pair"""
+    return ProvablyFairStream(SERVER_SECRET, server_seed, client_seed)
+
 def provably_fair_rng(server_seed: str, client_seed: str, nonce: int) -> float:
     """Generate a provably fair random float between 0 and 1"""
-    message = f"{server_seed}:{client_seed}:{nonce}"
-    hash_bytes = hmac.new(
-        SERVER_SECRET.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).digest()
-
-    int_value = int.from_bytes(hash_bytes[:4], 'big')
-    return int_value / (2**32)
+    return get_rng_stream(server_seed, client_seed).random(nonce)
 
 def seeded_random(base_rng: float, index: int) -> float:
     """Generate deterministic sub-random from base RNG"""
-    combined = f"{base_rng}:{index}"
-    hash_bytes = hashlib.sha256(combined.encode()).digest()
-    int_value = int.from_bytes(hash_bytes[:4], 'big')
-    return int_value / (2**32)
+    return sub_random(base_rng, index)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PAYOUT CALCULATION (RTP-COMPLIANT) - NO GEOMETRY, JUST MATH
 # ═══════════════════════════════════════════════════════════════════════════
 
+class OutcomeTier(NamedTuple):
+    """One segment of the RNG → outcome ladder"""
+    lower: float                 # Inclusive lower RNG bound
+    width: float                 # Segment width used to normalise the RNG
+    base_multiplier: float
+    multiplier_span: float
+    collectible_count: int       # +1 in the upper half of the segment
+    black_hole_probability: float
+    black_hole_base: float
+    black_hole_span: float
+
+# Loss probability: ~40% for balanced RTP
+OUTCOME_TIERS = [
+    # LOSS: No collectibles, immediate end
+    OutcomeTier(0.00, 0.40, 0.0, 0.0, 0, 0.0, 1.0, 0.0),
+    # SMALL WIN: 0.5x to 2x, 2-3 collectibles (increased)
+    OutcomeTier(0.40, 0.35, 0.5, 1.5, 2, 0.0, 1.0, 0.0),
+    # MEDIUM WIN: 2x to 10x, 3-4 collectibles (increased)
+    OutcomeTier(0.75, 0.17, 2.0, 8.0, 3, 0.3, 1.5, 1.5),
+    # BIG WIN: 10x to 100x, 4-5 collectibles (increased)
+    OutcomeTier(0.92, 0.07, 10.0, 90.0, 4, 0.6, 2.0, 3.0),
+    # JACKPOT: 100x to 5000x (rare), 5-6 collectibles (increased)
+    OutcomeTier(0.99, 0.01, 100.0, MAX_WIN_MULTIPLIER - 100, 5, 1.0, 3.0, 7.0),
+]
+OUTCOME_TIER_BOUNDS = [tier.lower for tier in OUTCOME_TIERS[1:]]
+
 def calculate_outcome(rng_value: float, bet: int, mode: str = 'normal') -> dict:
     """
     Calculate game outcome from RNG value.
@@ -83,46 +256,32 @@ def calculate_outcome(rng_value: float, bet: int, mode: str = 'normal') -> dict:
     Frontend decides how to visualize this outcome.
     """
 
-    # Loss probability: ~40% for balanced RTP
-    if rng_value < 0.40:
-        # LOSS: No collectibles, immediate end
+    tier_index = bisect_right(OUTCOME_TIER_BOUNDS, rng_value)
+    tier = OUTCOME_TIERS[tier_index]
+
+    if tier_index == 0:
         multiplier = 0.0
         collectible_count = 0
         black_hole_triggered = False
         black_hole_multiplier = 1.0
-
-    elif rng_value < 0.75:
-        # SMALL WIN: 0.5x to 2x, 2-3 collectibles (increased)
-        normalized = (rng_value - 0.40) / 0.35
-        multiplier = 0.5 + normalized * 1.5
-        collectible_count = 2 + int(normalized > 0.5)  # 2-3 items
-        black_hole_triggered = False
-        black_hole_multiplier = 1.0
-
-    elif rng_value < 0.92:
-        # MEDIUM WIN: 2x to 10x, 3-4 collectibles (increased)
-        normalized = (rng_value - 0.75) / 0.17
-        multiplier = 2.0 + normalized * 8.0
-        collectible_count = 3 + int(normalized > 0.5)  # 3-4 items
-        black_hole_triggered = seeded_random(rng_value, 100) < 0.3
-        black_hole_multiplier = 1.5 + seeded_random(rng_value, 101) * 1.5 if black_hole_triggered else 1.0
-
-    elif rng_value < 0.99:
-        # BIG WIN: 10x to 100x, 4-5 collectibles (increased)
-        normalized = (rng_value - 0.92) / 0.07
-        multiplier = 10.0 + normalized * 90.0
-        collectible_count = 4 + int(normalized > 0.5)  # 4-5 items
-        black_hole_triggered = seeded_random(rng_value, 100) < 0.6
-        black_hole_multiplier = 2.0 + seeded_random(rng_value, 101) * 3.0 if black_hole_triggered else 1.0
-
     else:
-        # JACKPOT: 100x to 5000x (rare), 5-6 collectibles (increased)
-        normalized = (rng_value - 0.99) / 0.01
-        multiplier = 100.0 + normalized * (MAX_WIN_MULTIPLIER - 100)
-        multiplier = min(multiplier, MAX_WIN_MULTIPLIER)
-        collectible_count = 5 + int(normalized > 0.5)  # 5-6 items
-        black_hole_triggered = True
-        black_hole_multiplier = 3.0 + seeded_random(rng_value, 101) * 7.0
+        normalized = (rng_value - tier.lower) / tier.width
+        multiplier = tier.base_multiplier + normalized * tier.multiplier_span
+        collectible_count = tier.collectible_count + int(normalized > 0.5)
+
+        if tier.black_hole_probability >= 1.0:
+            black_hole_triggered = True
+            bonus_rng = seeded_random(rng_value, 101)
+        elif tier.black_hole_probability > 0.0:
+            trigger_rng, bonus_rng = sub_randoms(rng_value, (100, 101))
+            black_hole_triggered = trigger_rng < tier.black_hole_probability
+        else:
+            black_hole_triggered = False
+
+        if black_hole_triggered:
+            black_hole_multiplier = tier.black_hole_base + bonus_rng * tier.black_hole_span
+        else:
+            black_hole_multiplier = 1.0
 
     # Cap multiplier
     multiplier = min(multiplier, MAX_WIN_MULTIPLIER)
@@ -191,6 +350,49 @@ def generate_abstract_events(outcome: dict) -> list:
     
     return events
 
+# ═══════════════════════════════════════════════════════════════════════════
+# BOOK-BASED OUTCOMES (SDK lookup table + books)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# OUTCOME_SOURCE=books serves /play from the published SDK math instead of calculate_outcome
+OUTCOME_SOURCE = os.environ.get('OUTCOME_SOURCE', 'live')
+BOOKS_DIR = os.environ.get('BOOKS_DIR', os.path.join(
+    APP_DIR, 'stake-math-sdk', 'games', 'drop_the_dictator', 'library', 'publish_files'
+))
+BOOK_MODE = os.environ.get('BOOK_MODE', 'base')
+# Indexed copies of books published without a sidecar index ('' = system temp dir)
+BOOK_CACHE_DIR = data_path('BOOK_CACHE_DIR', 'book_cache')
+# Round-stream sub-draw for the alias coin flip, independent of the round RNG
+# (spawn plans draw from the nonce's SHA-512 expansion, a separate message space)
+BOOK_COIN_DRAW = -1
+
+@lru_cache(maxsize=None)
+def get_book_table(mode: str = BOOK_MODE) -> BookTable:
+    """Lookup table + memory-mapped books for a bet mode, loaded once per process"""
+    return BookTable(BOOKS_DIR, mode, cache_dir=BOOK_CACHE_DIR or None)
+
+def book_outcome(rng_value: float, coin_value: float, bet: int) -> Tuple[dict, list]:
+    """
+    Outcome and events from a weighted book draw.
+    rng_value picks the alias column and coin_value, an independent
+    provably fair draw, flips its coin.
+    The book's payoutMultiplier (x100) is authoritative; book events are
+    passed through when present, otherwise abstract events are derived.
+    """
+    draw = get_book_table().draw(rng_value, coin_value)
+    multiplier = draw.payout_multiplier / 100
+    outcome = {
+        'multiplier': multiplier,
+        'payout': bet * draw.payout_multiplier // 100,
+        'collectible_count': 0,
+        'black_hole_triggered': False,
+        'black_hole_multiplier': 1.0,
+        'is_loss': draw.payout_multiplier == 0,
+        'book_id': draw.book_id
+    }
+    events = draw.book['events'] or generate_abstract_events(outcome)
+    return outcome, events
+
 # ═══════════════════════════════════════════════════════════════════════════
 # WEB ROUTES
 # ═══════════════════════════════════════════════════════════════════════════
@@ -201,40 +403,49 @@ def index():
     return app.send_static_file('index.html')
 
 # ═══════════════════════════════════════════════════════════════════════════
-# API ENDPOINTS - STAKE COMPLIANT
+# RGS HANDLERS - FRAMEWORK AGNOSTIC
+# Shared by the Flask routes below and the ASGI app in asgi.py.
+# Each handler takes the decoded JSON body and returns (payload, status).
 # ═══════════════════════════════════════════════════════════════════════════
 
-@app.route('/wallet/authenticate', methods=['POST'])
-def authenticate():
+def account_id(session_token: str) -> str:
+    """
+    Account id for a session token.
+    Sessions, the ledger, journals and round records are keyed by this HMAC,
+    so the bearer token itself is never stored.
+    """
+    return hmac.new(ACCOUNT_KEY, str(session_token).encode(), hashlib.sha256).hexdigest()[:32]
+
+def handle_authenticate(data: dict) -> Tuple[dict, int]:
     """Initialize session with balance and constraints"""
 
     session_token = secrets.token_hex(32)
+    account = account_id(session_token)
     server_seed = generate_server_seed()
     client_seed = generate_client_seed()
 
-    sessions[session_token] = {
+    session = {
         'player_id': f"player_{secrets.token_hex(8)}",
-        'balance': 10000_000_000,  # 10,000.00 starting balance
         'server_seed': server_seed,
         'client_seed': client_seed,
-        'nonce': 0,
         'created_at': time.time()
     }
+    sessions.put(account, session)
+    opening = ledger.open_account(account, STARTING_BALANCE)
 
-    return jsonify({
+    return {
         'session_token': session_token,
-        'player_id': sessions[session_token]['player_id'],
-        'balance': sessions[session_token]['balance'],
+        'player_id': session['player_id'],
+        'balance': opening.balance,
         'currency': 'USD',
         'min_bet': MIN_BET,
         'max_bet': MAX_BET,
         'step_bet': STEP_BET,
         'client_seed': client_seed,
         'unfinished_round': None
-    })
+    }, 200
 
-@app.route('/play', methods=['POST'])
-def play():
+def handle_play(data: dict) -> Tuple[dict, int]:
     """
     Start a new round - STAKE COMPLIANT.
     
@@ -245,6 +456,9 @@ def play():
     - events: Abstract event obligations
     - flags: Game state flags
     - balance: Updated balance
+
+    Optional body field idempotency_key: retrying /play with the same key
+    returns the original round instead of placing a second bet.
     
     Does NOT return:
     - X/Y positions
@@ -253,49 +467,117 @@ def play():
     - Terminal depths
     """
 
-    data = request.json
     session_id = data.get('sessionID')
     bet = data.get('bet', 0)
     mode = data.get('mode', 'normal')
 
-    if session_id not in sessions:
-        return jsonify({'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}), 401
-
-    session = sessions[session_id]
+    with metrics.stage('play', 'session_lookup'):
+        account = account_id(session_id) if session_id else None
+        session = sessions.get(account) if account else None
+    if session is None:
+        return {'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}, 401
 
     # Validate bet
     if bet < MIN_BET:
-        return jsonify({'error': 'Bet too low', 'code': 'INVALID_BET'}), 400
+        return {'error': 'Bet too low', 'code': 'INVALID_BET'}, 400
     if bet > MAX_BET:
-        return jsonify({'error': 'Bet too high', 'code': 'INVALID_BET'}), 400
-    if bet > session['balance']:
-        return jsonify({'error': 'Insufficient balance', 'code': 'INSUFFICIENT_BALANCE'}), 400
-
-    # Deduct bet
-    session['balance'] -= bet
-    session['nonce'] += 1
+        return {'error': 'Bet too high', 'code': 'INVALID_BET'}, 400
+
+    client_key = data.get('idempotency_key')
+    play_key = f"{account}:{client_key}" if client_key else None
+    if play_key is not None:
+        played = play_keys.get(play_key)
+        if played is not None:
+            return replay_play(account, session, played), 200
+
+    with metrics.stage('play', 'token_hex'):
+        round_id = secrets.token_hex(16)
+        simulation_id = secrets.token_hex(8)
+
+    # Deduct bet - the ledger sequence number doubles as the round nonce
+    ledger_key = f"play:{client_key}" if client_key else f"play:{round_id}"
+    try:
+        with metrics.stage('play', 'ledger'):
+            debit = ledger.apply(
+                account,
+                -bet,
+                ledger_key,
+                meta={'round_id': round_id, 'simulation_id': simulation_id, 'bet': bet, 'mode': mode}
+            )
+    except InsufficientFunds:
+        return {'error': 'Insufficient balance', 'code': 'INSUFFICIENT_BALANCE'}, 400
+    except UnknownAccount:
+        return {'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}, 401
+
+    if debit.replayed:
+        round_id = debit.meta['round_id']
+        round_data = find_round(round_id)
+        if round_data is None:
+            # Debited but the round was never stored (crash in between):
+            # the nonce pins the outcome, so rebuild the identical round
+            round_data = build_round(account, session, debit.meta['simulation_id'],
+                                     debit.meta['bet'], debit.meta['mode'], debit.seq)
+            if not rounds.add(round_id, round_data):
+                round_data = find_round(round_id)
+        remember_play(play_key, debit)
+        return play_response(round_id, round_data, debit.balance), 200
+
+    round_data = build_round(account, session, simulation_id, bet, mode, debit.seq)
+    metrics.record_round(bet, round_data['outcome']['payout'])
+    with metrics.stage('play', 'round_store'):
+        # A concurrent replay of this key may have rebuilt the round already
+        if not rounds.add(round_id, round_data):
+            round_data = find_round(round_id)
+        remember_play(play_key, debit)
+
+    return play_response(round_id, round_data, debit.balance), 200
+
+def remember_play(play_key, debit) -> None:
+    """Record the round a client idempotency key placed, once the round is stored"""
+    if play_key is not None:
+        play_keys.put(play_key, dict(debit.meta, balance=debit.balance, nonce=debit.seq))
+
+def replay_play(account: str, session: dict, played: dict) -> dict:
+    """/play payload for a retried idempotency key, from its play key record"""
+    round_data = find_round(played['round_id'])
+    if round_data is None:
+        # The round was stored, completed and has since left the live store:
+        # rebuild the identical payload without reviving the round
+        round_data = build_round(account, session, played['simulation_id'],
+                                 played['bet'], played['mode'], played['nonce'])
+    return play_response(played['round_id'], round_data, played['balance'])
+
+def build_round(account: str, session: dict, simulation_id: str, bet: int, mode: str, nonce: int) -> dict:
+    """Active round record for a debited bet; deterministic apart from created_at"""
 
     # Generate provably fair RNG
-    rng_value = provably_fair_rng(
-        session['server_seed'],
-        session['client_seed'],
-        session['nonce']
-    )
-
-    # Calculate outcome (math only, no geometry)
-    outcome = calculate_outcome(rng_value, bet, mode)
-
-    # Generate abstract events (no positions)
-    events = generate_abstract_events(outcome)
+    with metrics.stage('play', 'rng'):
+        rng_value = provably_fair_rng(
+            session['server_seed'],
+            session['client_seed'],
+            nonce
+        )
+
+    if OUTCOME_SOURCE == 'books':
+        # Weighted book from the certified lookup table (events come with it)
+        with metrics.stage('play', 'book'):
+            stream = get_rng_stream(session['server_seed'], session['client_seed'])
+            outcome, events = book_outcome(rng_value, stream.draw(nonce, BOOK_COIN_DRAW), bet)
+    else:
+        # Calculate outcome (math only, no geometry)
+        with metrics.stage('play', 'outcome'):
+            outcome = calculate_outcome(rng_value, bet, mode)
 
-    # Create round record
-    round_id = secrets.token_hex(16)
-    simulation_id = secrets.token_hex(8)
+        # Generate abstract events (no positions)
+        with metrics.stage('play', 'events'):
+            events = generate_abstract_events(outcome)
 
-    rounds[round_id] = {
-        'session_id': session_id,
+    return {
+        'account_id': account,
+        'simulation_id': simulation_id,
         'bet': bet,
         'mode': mode,
+        'nonce': nonce,
         'rng_value': rng_value,
         'outcome': outcome,
         'events': events,
@@ -303,88 +585,224 @@ def play():
         'created_at': time.time()
     }
 
+def play_response(round_id: str, round_data: dict, balance: int) -> dict:
+    """/play payload for a round record (also used for idempotent replays)"""
+
     # ═══════════════════════════════════════════════════════════════════════
     # STAKE COMPLIANT RESPONSE - NO GEOMETRY, NO TIMING
     # ═══════════════════════════════════════════════════════════════════════
-    return jsonify({
+    return {
         'round_id': round_id,
-        'simulation_id': simulation_id,
-        'bet': bet,
-        'payout': outcome['payout'],
-        'events': events,
+        'simulation_id': round_data['simulation_id'],
+        'bet': round_data['bet'],
+        'payout': round_data['outcome']['payout'],
+        'events': round_data['events'],
         'flags': {
-            'is_loss': outcome['is_loss']
+            'is_loss': round_data['outcome']['is_loss']
         },
-        'balance': session['balance']
-    })
+        'balance': balance
+    }
 
 # build_visual_timeline DELETED - Stake backend must be stateless and timeless
 # Frontend controls all animation timing based on events array
 
-@app.route('/endround', methods=['POST'])
-def end_round():
+def handle_end_round(data: dict) -> Tuple[dict, int]:
     """Complete a round and credit winnings"""
 
-    data = request.json
     session_id = data.get('sessionID')
     round_id = data.get('round_id')
 
-    if session_id not in sessions:
-        return jsonify({'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}), 401
-
-    if round_id not in rounds:
-        return jsonify({'error': 'Round not found', 'code': 'ROUND_NOT_FOUND'}), 404
+    with metrics.stage('end_round', 'session_lookup'):
+        account = account_id(session_id) if session_id else None
+        session = sessions.get(account) if account else None
+    if session is None:
+        return {'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}, 401
 
-    round_data = rounds[round_id]
+    with metrics.stage('end_round', 'round_lookup'):
+        round_data = find_round(round_id)
+    if round_data is None:
+        return {'error': 'Round not found', 'code': 'ROUND_NOT_FOUND'}, 404
 
     if round_data['status'] != 'active':
-        return jsonify({'error': 'Round already completed', 'code': 'ROUND_COMPLETED'}), 400
+        return {'error': 'Round already completed', 'code': 'ROUND_COMPLETED'}, 400
 
-    if round_data['session_id'] != session_id:
-        return jsonify({'error': 'Session mismatch', 'code': 'SESSION_MISMATCH'}), 403
+    if round_data['account_id'] != account:
+        return {'error': 'Session mismatch', 'code': 'SESSION_MISMATCH'}, 403
 
-    # Mark round complete
+    # Credit payout - keyed by round, so concurrent replays credit once
+    payout = round_data['outcome']['payout']
+    try:
+        with metrics.stage('end_round', 'ledger'):
+            credit = ledger.apply(account, payout, f"endround:{round_id}")
+    except UnknownAccount:
+        return {'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}, 401
+
+    # Mark round complete - also when the credit replayed: a crash after the
+    # credit left the round active, and the ledger forgets old keys
     round_data['status'] = 'completed'
     round_data['completed_at'] = time.time()
+    # Without an archive nothing compacts completed rounds: let them expire instead
+    completed_ttl = None if get_round_archive() is not None else COMPLETED_ROUND_TTL_SECONDS
+    with metrics.stage('end_round', 'round_store'):
+        rounds.put(round_id, round_data, ttl=completed_ttl)
 
-    # Credit payout
-    session = sessions[session_id]
-    payout = round_data['outcome']['payout']
-    session['balance'] += payout
-
-    return jsonify({
+    return {
         'round_id': round_id,
         'payout': payout,
-        'balance': session['balance'],
+        'balance': credit.balance,
         'status': 'completed'
-    })
-
-# ═══════════════════════════════════════════════════════════════════════════
-# SIMULATION ENDPOINT (for headless RTP testing)
-# ═══════════════════════════════════════════════════════════════════════════
+    }, 200
 
-@app.route('/simulate', methods=['POST'])
-def simulate():
+@lru_cache(maxsize=1024)
+def get_spawn_plan(server_seed: str, client_seed: str, nonce: int, black_hole_triggered: bool) -> SpawnPlan:
     """
-    Run headless simulation for RTP verification.
-    This endpoint is for testing only - not exposed in production.
+    Cosmetic spawn plan for a round.
+    Draw i is float i of the nonce's HMAC-SHA512 expansion (see expand_random),
+    so one HMAC covers sixteen spawn draws.
     """
-    data = request.json
-    num_rounds = data.get('num_rounds', 10000)
-    bet = data.get('bet', MONETARY_PRECISION)
+    stream = get_rng_stream(server_seed, client_seed)
+    return SpawnPlan.build(stream.expanded(nonce), 0, black_hole_triggered)
+
+def handle_spawn(round_id: str, args: dict) -> Tuple[dict, int]:
+    """
+    Expand a round's spawn layout on demand.
     
-    total_wagered = 0
-    total_returned = 0
+    Query:
+    - section: collectibles | black_holes | pushables (omit for compact plan)
+    - range: start:stop object indices within the section
     
-    for i in range(num_rounds):
-        rng_value = seeded_random(0.5, i)  # Deterministic for testing
+    Spawn layout is cosmetic only - it never changes the payout.
+    """
+    round_data = find_round(round_id)
+    if round_data is None:
+        return {'error': 'Round not found', 'code': 'ROUND_NOT_FOUND'}, 404
+
+    session = sessions.get(round_data['account_id'])
+    if session is None:
+        return {'error': 'Invalid session', 'code': 'SESSION_EXPIRED'}, 401
+
+    plan = get_spawn_plan(
+        session['server_seed'],
+        session['client_seed'],
+        round_data['nonce'],
+        round_data['outcome']['black_hole_triggered']
+    )
+
+    section = args.get('section')
+    if section is None:
+        return {'round_id': round_id, **plan.to_compact()}, 200
+
+    if section not in SECTIONS:
+        return {'error': 'Unknown section', 'code': 'INVALID_SECTION'}, 400
+
+    try:
+        start, _, stop = args.get('range', '0:').partition(':')
+        start = int(start or 0)
+        stop = int(stop) if stop else None
+    except ValueError:
+        return {'error': 'Invalid range', 'code': 'INVALID_RANGE'}, 400
+    if start < 0 or (stop is not None and stop < 0):
+        return {'error': 'Invalid range', 'code': 'INVALID_RANGE'}, 400
+
+    items = plan.expand(section, start, stop)
+    return {
+        'round_id': round_id,
+        'section': section,
+        'start': start,
+        'count': plan.counts[section],
+        'items': items
+    }, 200
+
+SIMULATION_SHARD_ROUNDS = 1_000_000
+MAX_SIMULATION_ROUNDS = 100_000_000
+SIMULATION_WORKERS = os.cpu_count() or 1
+# Upper bucket edges (multiplier) for the simulation payout histogram
+SIMULATION_HISTOGRAM_EDGES = [0.0, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0, MAX_WIN_MULTIPLIER]
+
+def handle_round_lookup(round_id: str) -> Tuple[dict, int]:
+    """
+    Round record for dispute lookups, live or archived.
+    The account id is never returned.
+    """
+    round_data = find_round(round_id)
+    if round_data is None:
+        return {'error': 'Round not found', 'code': 'ROUND_NOT_FOUND'}, 404
+
+    record = {key: value for key, value in round_data.items() if key != 'account_id'}
+    record['round_id'] = round_id
+    return record, 200
+
+def run_simulation_shard(start: int, stop: int, bet: int) -> dict:
+    """
+    Simulate rounds [start, stop) and return mergeable partial sums.
+    Round i always uses seeded_random(0.5, i), so shards can run in any
+    process and in any order without changing the merged result.
+    """
+    tier_counts = [0] * len(OUTCOME_TIERS)
+    histogram = [0] * len(SIMULATION_HISTOGRAM_EDGES)
+    total_returned = 0
+    sum_sq_payout = 0
+    hits = 0
+    max_payout = 0
+
+    for rng_value in sub_randoms(0.5, range(start, stop)):  # Deterministic for testing
         outcome = calculate_outcome(rng_value, bet)
-        total_wagered += bet
-        total_returned += outcome['payout']
-    
+        payout = outcome['payout']
+        total_returned += payout
+        sum_sq_payout += payout * payout
+        tier_counts[bisect_right(OUTCOME_TIER_BOUNDS, rng_value)] += 1
+        histogram[bisect_left(SIMULATION_HISTOGRAM_EDGES, outcome['multiplier'])] += 1
+        if payout > 0:
+            hits += 1
+        if payout > max_payout:
+            max_payout = payout
+
+    return {
+        'rounds': stop - start,
+        'total_wagered': bet * (stop - start),
+        'total_returned': total_returned,
+        'sum_sq_payout': sum_sq_payout,
+        'hits': hits,
+        'max_payout': max_payout,
+        'tier_counts': tier_counts,
+        'histogram': histogram
+    }
+
+def merge_simulation_shards(shards) -> dict:
+    """Combine shard partial sums; associative so shards may arrive in any order"""
+    merged = {
+        'rounds': 0,
+        'total_wagered': 0,
+        'total_returned': 0,
+        'sum_sq_payout': 0,
+        'hits': 0,
+        'max_payout': 0,
+        'tier_counts': [0] * len(OUTCOME_TIERS),
+        'histogram': [0] * len(SIMULATION_HISTOGRAM_EDGES)
+    }
+    for shard in shards:
+        for key in ('rounds', 'total_wagered', 'total_returned', 'sum_sq_payout', 'hits'):
+            merged[key] += shard[key]
+        merged['max_payout'] = max(merged['max_payout'], shard['max_payout'])
+        merged['tier_counts'] = [a + b for a, b in zip(merged['tier_counts'], shard['tier_counts'])]
+        merged['histogram'] = [a + b for a, b in zip(merged['histogram'], shard['histogram'])]
+    return merged
+
+def summarize_simulation(merged: dict, num_rounds: int, bet: int) -> dict:
+    """Turn merged partial sums into the /simulate response"""
+    total_wagered = merged['total_wagered']
+    total_returned = merged['total_returned']
+    rounds_done = merged['rounds']
     actual_rtp = total_returned / total_wagered if total_wagered > 0 else 0
-    
-    return jsonify({
+
+    if rounds_done > 0 and bet > 0:
+        mean_multiplier = total_returned / (bet * rounds_done)
+        mean_sq_multiplier = merged['sum_sq_payout'] / (bet * bet * rounds_done)
+        std_dev = max(0.0, mean_sq_multiplier - mean_multiplier ** 2) ** 0.5
+    else:
+        std_dev = 0.0
+
+    return {
         'num_rounds': num_rounds,
         'bet_per_round': bet,
         'total_wagered': total_wagered,
@@ -392,8 +810,194 @@ def simulate():
         'actual_rtp': round(actual_rtp, 4),
         'actual_rtp_percentage': f"{actual_rtp * 100:.2f}%",
         'target_rtp': RTP,
-        'variance': round(actual_rtp - RTP, 4)
-    })
+        'variance': round(actual_rtp - RTP, 4),
+        'std_dev': round(std_dev, 4),
+        'hit_rate': round(merged['hits'] / rounds_done, 6) if rounds_done else 0,
+        'max_multiplier': merged['max_payout'] / bet if bet else 0,
+        'tier_counts': merged['tier_counts'],
+        'histogram': {
+            'edges': SIMULATION_HISTOGRAM_EDGES,
+            'counts': merged['histogram']
+        }
+    }
+
+def simulation_shards(num_rounds: int, workers: int, shard_rounds: int = SIMULATION_SHARD_ROUNDS):
+    """Split [0, num_rounds) into contiguous (start, stop) ranges"""
+    per_worker = -(-num_rounds // max(1, workers))
+    size = max(1, min(shard_rounds, per_worker))
+    return [(start, min(start + size, num_rounds)) for start in range(0, num_rounds, size)]
+
+def run_simulation(num_rounds: int, bet: int) -> dict:
+    """
+    Headless RTP simulation over deterministic RNG values.
+    Pure function of its arguments so it can run in a worker process.
+    """
+    return summarize_simulation(run_simulation_shard(0, num_rounds, bet), num_rounds, bet)
+
+_simulation_pool = None
+
+def get_simulation_pool() -> ProcessPoolExecutor:
+    """Process pool shared by /simulate requests, created on first use"""
+    global _simulation_pool
+    if _simulation_pool is None:
+        _simulation_pool = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+    return _simulation_pool
+
+def iter_parallel_simulation(num_rounds: int, bet: int, pool: ProcessPoolExecutor, workers: int = SIMULATION_WORKERS):
+    """
+    Shard a simulation across a process pool.
+
+    Yields a progress record as each shard completes, then the final
+    summary ({'type': 'result', ...}) once every shard has merged.
+    """
+    futures = [pool.submit(run_simulation_shard, start, stop, bet) for start, stop in simulation_shards(num_rounds, workers)]
+    merged = merge_simulation_shards([])
+    for future in as_completed(futures):
+        merged = merge_simulation_shards([merged, future.result()])
+        summary = summarize_simulation(merged, num_rounds, bet)
+        yield {
+            'type': 'progress',
+            'rounds_completed': merged['rounds'],
+            'num_rounds': num_rounds,
+            'actual_rtp': summary['actual_rtp']
+        }
+    yield dict(summarize_simulation(merged, num_rounds, bet), type='result')
+
+def run_parallel_simulation(num_rounds: int, bet: int, pool: ProcessPoolExecutor, workers: int = SIMULATION_WORKERS) -> dict:
+    """Sharded equivalent of run_simulation; identical totals"""
+    futures = [pool.submit(run_simulation_shard, start, stop, bet) for start, stop in simulation_shards(num_rounds, workers)]
+    merged = merge_simulation_shards(future.result() for future in futures)
+    return summarize_simulation(merged, num_rounds, bet)
+
+def _int_field(data: dict, name: str, default: int, low: int, high: int) -> int:
+    """Integer body field within [low, high]; ValueError names the field otherwise"""
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"{name} must be an integer between {low} and {high}")
+    return value
+
+def parse_simulation_request(data: dict) -> Tuple[int, int]:
+    """
+    Extract (num_rounds, bet) from a /simulate body
+
+    Raises:
+        ValueError: A field is missing its type or range (caller answers 400 INVALID_REQUEST)
+    """
+    num_rounds = _int_field(data, 'num_rounds', 10000, 1, MAX_SIMULATION_ROUNDS)
+    bet = _int_field(data, 'bet', MONETARY_PRECISION, MIN_BET, MAX_BET)
+    return num_rounds, bet
+
+def parse_simulation_options(data: dict) -> Tuple[int, bool]:
+    """
+    Extract (workers, stream) from a /simulate body; workers=1 runs inline
+
+    Raises:
+        ValueError: workers is not a positive integer or stream is not a boolean
+    """
+    workers = min(_int_field(data, 'workers', SIMULATION_WORKERS, 1, 2 ** 31), SIMULATION_WORKERS)
+    stream = data.get('stream', False)
+    if not isinstance(stream, bool):
+        raise ValueError("stream must be true or false")
+    return workers, stream
+
+# ═══════════════════════════════════════════════════════════════════════════
+# API ENDPOINTS - STAKE COMPLIANT
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _json_body() -> dict:
+    return request.get_json(silent=True) or {}
+
+def _respond(endpoint: str, payload: dict, status: int):
+    with metrics.stage(endpoint, 'jsonify'):
+        return jsonify(payload), status
+
+@app.before_request
+def _start_worker_on_first_request():
+    start_worker()
+
+@app.before_request
+def _start_request_timer():
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    if metrics.enabled and 'request_started' in g:
+        metrics.observe_request(request.endpoint or 'unknown', response.status_code, time.perf_counter() - g.request_started)
+    return response
+
+@app.route('/wallet/authenticate', methods=['POST'])
+def authenticate():
+    """Initialize session with balance and constraints"""
+    payload, status = handle_authenticate(_json_body())
+    return _respond('authenticate', payload, status)
+
+@app.route('/play', methods=['POST'])
+def play():
+    """Start a new round - see handle_play"""
+    payload, status = handle_play(_json_body())
+    return _respond('play', payload, status)
+
+@app.route('/endround', methods=['POST'])
+def end_round():
+    """Complete a round and credit winnings"""
+    payload, status = handle_end_round(_json_body())
+    return _respond('end_round', payload, status)
+
+@app.route('/spawn/<round_id>', methods=['GET'])
+def spawn(round_id):
+    """Expand a round's spawn layout on demand - see handle_spawn"""
+    payload, status = handle_spawn(round_id, request.args)
+    return _respond('spawn', payload, status)
+
+@app.route('/round/<round_id>', methods=['GET'])
+def round_lookup(round_id):
+    """Round record for disputes - see handle_round_lookup"""
+    payload, status = handle_round_lookup(round_id)
+    return _respond('round_lookup', payload, status)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SIMULATION ENDPOINT (for headless RTP testing)
+# ═══════════════════════════════════════════════════════════════════════════
+
+@app.route('/simulate', methods=['POST'])
+def simulate():
+    """
+    Run headless simulation for RTP verification.
+    This endpoint is for testing only - not exposed in production.
+
+    Body: num_rounds, bet, workers (process shards, default all cores),
+    stream (true = NDJSON progress lines followed by the result line).
+    """
+    data = _json_body()
+    try:
+        num_rounds, bet = parse_simulation_request(data)
+        workers, stream = parse_simulation_options(data)
+    except ValueError as exc:
+        return jsonify({'error': str(exc), 'code': 'INVALID_REQUEST'}), 400
+
+    if stream:
+        chunks = iter_parallel_simulation(num_rounds, bet, get_simulation_pool(), workers)
+        return Response(
+            (json.dumps(chunk) + '\n' for chunk in chunks),
+            mimetype='application/x-ndjson'
+        )
+    if workers == 1:
+        return jsonify(run_simulation(num_rounds, bet))
+    return jsonify(run_parallel_simulation(num_rounds, bet, get_simulation_pool(), workers))
+
+# ═══════════════════════════════════════════════════════════════════════════
+# METRICS ENDPOINT (Prometheus text format)
+# ═══════════════════════════════════════════════════════════════════════════
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Per-stage latency histograms, request counters and RTP drift"""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics disabled', 'code': 'METRICS_DISABLED'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
+    recover_ledger()
+    start_round_compactor()
     app.run(debug=True, port=3000)
@@ -0,0 +1,285 @@
+"""
+ASGI SERVING MODE - RGS endpoints for async servers
+Same handlers as the Flask app (app.py), served without a WSGI worker per request.
+
+Run with any ASGI server, e.g.:
+    uvicorn asgi:application --port 3000
+
+- /wallet/authenticate, /play, /endround, /spawn, /round run on a thread pool
+  so store round-trips (Redis), journal fsyncs and archive reads never block
+  the event loop; the stores and ledger are safe to call from many threads
+- /simulate is sharded across a process pool so it never blocks other players;
+  with {"stream": true} it answers with NDJSON progress lines
+- A bounded concurrency limiter sheds load with 503 instead of queueing forever
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app import (
+    handle_authenticate,
+    handle_play,
+    handle_end_round,
+    handle_spawn,
+    handle_round_lookup,
+    recover_ledger,
+    start_round_compactor,
+    stop_round_compactor,
+    run_simulation_shard,
+    merge_simulation_shards,
+    summarize_simulation,
+    simulation_shards,
+    parse_simulation_request,
+    parse_simulation_options,
+    metrics,
+    SIMULATION_WORKERS,
+)
+
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('RGS_MAX_CONCURRENCY', 1024))
+MAX_QUEUED_REQUESTS = int(os.environ.get('RGS_MAX_QUEUED', 4096))
+HANDLER_THREADS = int(os.environ.get('RGS_HANDLER_THREADS', 32))
+MAX_BODY_BYTES = 64 * 1024
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+METRICS_HEADERS = [(b'content-type', b'text/plain; version=0.0.4')]
+
+# Metric endpoint labels, matching the Flask view names
+ENDPOINT_NAMES = {
+    '/wallet/authenticate': 'authenticate',
+    '/play': 'play',
+    '/endround': 'end_round',
+    '/simulate': 'simulate',
+    '/metrics': 'metrics_endpoint',
+}
+NDJSON_HEADERS = [(b'content-type', b'application/x-ndjson')]
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded wait queue"""
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.active = 0
+
+    def try_enter(self) -> bool:
+        """Reserve a slot in the queue; False if the node is saturated"""
+        if self.waiting >= self.max_queued:
+            return False
+        self.waiting += 1
+        return True
+
+    async def __aenter__(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.active -= 1
+        self._semaphore.release()
+
+
+class RGSApplication:
+    """Minimal ASGI application routing the RGS endpoints"""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        max_queued: int = MAX_QUEUED_REQUESTS,
+        simulation_workers: int = SIMULATION_WORKERS,
+        handler_threads: int = HANDLER_THREADS
+    ):
+        self.limiter = ConcurrencyLimiter(max_concurrent, max_queued)
+        self.simulation_workers = simulation_workers
+        self.handler_threads = handler_threads
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ('POST', '/wallet/authenticate'): self._sync(handle_authenticate),
+            ('POST', '/play'): self._sync(handle_play),
+            ('POST', '/endround'): self._sync(handle_end_round),
+            ('POST', '/simulate'): self._simulate,
+        }
+
+    def _sync(self, handler: Callable) -> Callable:
+        async def endpoint(data: dict, query: dict) -> Tuple[dict, int]:
+            return await self._run_blocking(handler, data)
+        return endpoint
+
+    async def _run_blocking(self, handler: Callable, *args):
+        """Run a blocking handler on the handler thread pool"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.handler_threads, thread_name_prefix='rgs-handler')
+        return await asyncio.get_running_loop().run_in_executor(self.executor, handler, *args)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.simulation_workers)
+        return self.pool
+
+    async def _simulate(self, data: dict, query: dict) -> Tuple[dict, int]:
+        try:
+            num_rounds, bet = parse_simulation_request(data)
+            workers, stream = parse_simulation_options(data)
+        except ValueError as exc:
+            return {'error': str(exc), 'code': 'INVALID_REQUEST'}, 400
+        workers = min(workers, self.simulation_workers)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        futures = [
+            loop.run_in_executor(pool, run_simulation_shard, start, stop, bet)
+            for start, stop in simulation_shards(num_rounds, workers)
+        ]
+        if stream:
+            return self._stream_simulation(futures, num_rounds, bet), 200
+        merged = merge_simulation_shards(await asyncio.gather(*futures))
+        return summarize_simulation(merged, num_rounds, bet), 200
+
+    @staticmethod
+    async def _stream_simulation(futures, num_rounds: int, bet: int) -> AsyncIterator[dict]:
+        """Progress record per completed shard, then the merged result"""
+        merged = merge_simulation_shards([])
+        for future in asyncio.as_completed(futures):
+            merged = merge_simulation_shards([merged, await future])
+            yield {
+                'type': 'progress',
+                'rounds_completed': merged['rounds'],
+                'num_rounds': num_rounds,
+                'actual_rtp': summarize_simulation(merged, num_rounds, bet)['actual_rtp']
+            }
+        yield dict(summarize_simulation(merged, num_rounds, bet), type='result')
+
+    async def _spawn(self, round_id: str, query: dict) -> Tuple[dict, int]:
+        return await self._run_blocking(handle_spawn, round_id, query)
+
+    def shutdown(self) -> None:
+        """Stop the simulation pool and the handler threads"""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if not self.limiter.try_enter():
+            await self._respond(send, {'error': 'Server busy', 'code': 'SERVER_BUSY'}, 503)
+            return
+
+        started = time.perf_counter() if metrics.enabled else 0.0
+        # Respond inside the limiter: a streamed /simulate body is produced while sending
+        async with self.limiter:
+            payload, status = await self._dispatch(scope, receive)
+            await self._respond(send, payload, status)
+        if metrics.enabled:
+            path = scope['path']
+            if path.startswith('/spawn/'):
+                endpoint = 'spawn'
+            elif path.startswith('/round/'):
+                endpoint = 'round_lookup'
+            else:
+                endpoint = ENDPOINT_NAMES.get(path, 'unknown')
+            metrics.observe_request(endpoint, status, time.perf_counter() - started)
+
+    async def _dispatch(self, scope, receive) -> Tuple[dict, int]:
+        method = scope['method']
+        path = scope['path']
+        query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+
+        if method == 'GET' and path.startswith('/spawn/'):
+            return await self._spawn(path[len('/spawn/'):], query)
+        if method == 'GET' and path.startswith('/round/'):
+            return await self._run_blocking(handle_round_lookup, path[len('/round/'):])
+        if method == 'GET' and path == '/metrics':
+            if not metrics.enabled:
+                return {'error': 'Metrics disabled', 'code': 'METRICS_DISABLED'}, 404
+            return metrics.render(), 200
+
+        endpoint = self.routes.get((method, path))
+        if endpoint is None:
+            return {'error': 'Not found', 'code': 'NOT_FOUND'}, 404
+
+        body = await self._read_body(receive)
+        if body is None:
+            return {'error': 'Request body too large', 'code': 'BODY_TOO_LARGE'}, 413
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return {'error': 'Invalid JSON', 'code': 'INVALID_JSON'}, 400
+        if not isinstance(data, dict):
+            data = {}
+
+        return await endpoint(data, query)
+
+    @staticmethod
+    async def _read_body(receive) -> Optional[bytes]:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    @staticmethod
+    async def _respond(send, payload, status: int) -> None:
+        if hasattr(payload, '__aiter__'):
+            await send({'type': 'http.response.start', 'status': status, 'headers': NDJSON_HEADERS})
+            async for chunk in payload:
+                line = json.dumps(chunk, separators=(',', ':')).encode() + b'\n'
+                await send({'type': 'http.response.body', 'body': line, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        if isinstance(payload, str):
+            body = payload.encode()
+            await send({'type': 'http.response.start', 'status': status, 'headers': METRICS_HEADERS})
+            await send({'type': 'http.response.body', 'body': body})
+            return
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': JSON_HEADERS + [(b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                recover_ledger()
+                start_round_compactor()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                stop_round_compactor()
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = RGSApplication()
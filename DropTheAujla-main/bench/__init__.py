@@ -0,0 +1,4 @@
+"""
+RGS benchmark suite
+Load-test harness for the authenticate → play → endround loop
+"""
@@ -0,0 +1,264 @@
+"""
+RGS LOAD TEST & LATENCY BENCHMARK
+Drives authenticate → play → endround with N concurrent virtual players.
+
+Transports:
+- inprocess: Flask test client (no network, isolates handler cost)
+- socket:    threaded WSGI server on 127.0.0.1, real HTTP round trips
+
+Usage:
+    python -m bench.rgs_bench --players 16 --rounds 100 --transport both --output bench.json
+
+Output is a single JSON document so CI can diff it against a baseline.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import app as rgs
+
+BET = rgs.MIN_BET
+ENDPOINTS = ('authenticate', 'play', 'endround')
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# TRANSPORTS - each returns post(path, body) -> (status, payload)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def inprocess_transport() -> Tuple[Callable[[str, dict], Tuple[int, dict]], Callable[[], None]]:
+    """Flask test client; one client per call is thread-safe"""
+    def post(path: str, body: dict) -> Tuple[int, dict]:
+        response = rgs.app.test_client().post(path, json=body)
+        return response.status_code, response.get_json()
+    return post, lambda: None
+
+
+def socket_transport() -> Tuple[Callable[[str, dict], Tuple[int, dict]], Callable[[], None]]:
+    """Threaded werkzeug server on an ephemeral local port"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, rgs.app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_port
+
+    def post(path: str, body: dict) -> Tuple[int, dict]:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def close() -> None:
+        server.shutdown()
+        thread.join()
+
+    return post, close
+
+
+TRANSPORTS = {
+    'inprocess': inprocess_transport,
+    'socket': socket_transport,
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LOAD TEST
+# ═══════════════════════════════════════════════════════════════════════════
+
+def percentiles(samples_ns: List[int]) -> Dict:
+    """Latency summary in milliseconds"""
+    if not samples_ns:
+        return {'count': 0}
+    ordered = sorted(samples_ns)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1e6
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) / 1e6, 4),
+        'p50_ms': round(pick(0.50), 4),
+        'p95_ms': round(pick(0.95), 4),
+        'p99_ms': round(pick(0.99), 4),
+        'max_ms': round(ordered[-1] / 1e6, 4)
+    }
+
+
+def virtual_player(post: Callable, rounds: int) -> Dict[str, List[int]]:
+    """One player session: authenticate once, then play/endround `rounds` times"""
+    latencies = {name: [] for name in ENDPOINTS}
+    errors = 0
+
+    start = time.perf_counter_ns()
+    status, auth = post('/wallet/authenticate', {})
+    latencies['authenticate'].append(time.perf_counter_ns() - start)
+    if status != 200:
+        return {'latencies': latencies, 'errors': 1}
+    session_id = auth['session_token']
+
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        status, played = post('/play', {'sessionID': session_id, 'bet': BET})
+        latencies['play'].append(time.perf_counter_ns() - start)
+        if status != 200:
+            errors += 1
+            continue
+
+        start = time.perf_counter_ns()
+        status, _ = post('/endround', {'sessionID': session_id, 'round_id': played['round_id']})
+        latencies['endround'].append(time.perf_counter_ns() - start)
+        if status != 200:
+            errors += 1
+
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run_load(transport: str, players: int, rounds: int) -> Dict:
+    """Run `players` concurrent sessions and aggregate latency/throughput"""
+    post, close = TRANSPORTS[transport]()
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=players) as pool:
+            results = list(pool.map(lambda _: virtual_player(post, rounds), range(players)))
+        elapsed = time.perf_counter() - started
+    finally:
+        close()
+
+    merged = {name: [] for name in ENDPOINTS}
+    for result in results:
+        for name in ENDPOINTS:
+            merged[name].extend(result['latencies'][name])
+    total_requests = sum(len(samples) for samples in merged.values())
+
+    return {
+        'transport': transport,
+        'players': players,
+        'rounds_per_player': rounds,
+        'elapsed_s': round(elapsed, 4),
+        'requests': total_requests,
+        'errors': sum(result['errors'] for result in results),
+        'requests_per_s': round(total_requests / elapsed, 1) if elapsed else 0,
+        'rounds_per_s': round(len(merged['play']) / elapsed, 1) if elapsed else 0,
+        'latency': {name: percentiles(samples) for name, samples in merged.items()}
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ALLOCATIONS & STAGE SPLIT
+# ═══════════════════════════════════════════════════════════════════════════
+
+def measure_allocations(samples: int) -> Dict:
+    """
+    tracemalloc cost of one play+endround through the in-process handlers.
+    peak = transient bytes allocated during the request, retained = bytes
+    still live afterwards (round/session records, caches).
+    """
+    auth, _ = rgs.handle_authenticate({})
+    session_id = auth['session_token']
+    peaks = []
+    retained = []
+
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            played, _ = rgs.handle_play({'sessionID': session_id, 'bet': BET})
+            rgs.handle_end_round({'sessionID': session_id, 'round_id': played['round_id']})
+            json.dumps(played)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'samples': samples,
+        'peak_bytes_per_round': int(statistics.median(peaks)),
+        'retained_bytes_per_round': int(statistics.median(retained))
+    }
+
+
+def measure_stage_split(iterations: int) -> Dict:
+    """Mean time per call of each /play stage: RNG, outcome, events, JSON encode"""
+    server_seed = rgs.generate_server_seed()
+    client_seed = rgs.generate_client_seed()
+    rng_values = [rgs.provably_fair_rng(server_seed, client_seed, nonce) for nonce in range(iterations)]
+    outcomes = [rgs.calculate_outcome(value, BET) for value in rng_values]
+    events = [rgs.generate_abstract_events(outcome) for outcome in outcomes]
+
+    def timed(fn: Callable[[int], object]) -> float:
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            fn(i)
+        return (time.perf_counter_ns() - start) / iterations
+
+    stages = {
+        'rng': timed(lambda i: rgs.provably_fair_rng(server_seed, client_seed, i)),
+        'outcome': timed(lambda i: rgs.calculate_outcome(rng_values[i], BET)),
+        'events': timed(lambda i: rgs.generate_abstract_events(outcomes[i])),
+        'json': timed(lambda i: json.dumps({'payout': outcomes[i]['payout'], 'events': events[i]})),
+    }
+    total = sum(stages.values())
+
+    return {
+        'iterations': iterations,
+        'ns_per_call': {name: round(ns, 1) for name, ns in stages.items()},
+        'share': {name: round(ns / total, 4) for name, ns in stages.items()}
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def run_benchmark(players: int, rounds: int, transports: List[str], alloc_samples: int, stage_iterations: int) -> Dict:
+    """Full benchmark report"""
+    return {
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'load': [run_load(transport, players, rounds) for transport in transports],
+        'allocations': measure_allocations(alloc_samples),
+        'stage_split': measure_stage_split(stage_iterations)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='RGS play/endround benchmark')
+    parser.add_argument('--players', type=int, default=16, help='Concurrent virtual players')
+    parser.add_argument('--rounds', type=int, default=50, help='Rounds per player')
+    parser.add_argument('--transport', choices=['inprocess', 'socket', 'both'], default='both')
+    parser.add_argument('--alloc-samples', type=int, default=200)
+    parser.add_argument('--stage-iterations', type=int, default=20000)
+    parser.add_argument('--output', help='Write JSON report to file instead of stdout')
+    args = parser.parse_args(argv)
+
+    transports = list(TRANSPORTS) if args.transport == 'both' else [args.transport]
+    report = run_benchmark(args.players, args.rounds, transports, args.alloc_samples, args.stage_iterations)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
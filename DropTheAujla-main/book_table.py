@@ -0,0 +1,146 @@
+"""
+Book Table for Drop the Dictator
+Serves outcomes from the SDK's published lookup table and books instead of live tier math
+"""
+
+import csv
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from game_math import OutcomeTable
+
+# Book index from the SDK (see stake_sdk_adapter.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stake-math-sdk'))
+from src.write_data.book_index import BookIndexReader, index_path_for, write_indexed_books
+
+# Indexed copies of books published without a sidecar; publish_files is never written
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'drop-the-dictator-books')
+
+
+class BookDraw(NamedTuple):
+    """One weighted book selection"""
+    book_id: int
+    payout_multiplier: int   # Book payoutMultiplier (x100, integer as published)
+    book: Dict
+
+
+def open_book_index(books_path: str, cache_dir: Optional[str] = None) -> BookIndexReader:
+    """
+    Frame-indexed reader for books_<mode>.jsonl.zst
+
+    Uses the SDK's <books>.idx sidecar when the publish step wrote one that
+    matches the books. Otherwise the books are rewritten as indexed frames
+    into cache_dir and rebuilt whenever the books are newer than the copy;
+    the certified books in the publish folder are only ever read. Workers
+    racing on the build each publish complete files via os.replace, and a
+    reader that catches the index and books from different builds is
+    refused by the index header and rebuilds.
+
+    Args:
+        books_path: Path to books_<mode>.jsonl.zst (or plain .jsonl)
+        cache_dir: Folder for the framed copy and its index (default DEFAULT_CACHE_DIR)
+
+    Returns:
+        Open BookIndexReader
+    """
+    if os.path.exists(index_path_for(books_path)):
+        try:
+            return BookIndexReader(books_path)
+        except ValueError:
+            pass  # Stale or foreign sidecar: fall back to a cached copy
+
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    # Copies of different publish folders share the cache: key them by source path
+    digest = hashlib.sha1(os.path.abspath(books_path).encode()).hexdigest()[:12]
+    name = os.path.basename(books_path)
+    framed_path = os.path.join(cache_dir, f"{digest}-{name if name.endswith('.zst') else name + '.zst'}")
+    index_path = index_path_for(framed_path)
+    if (
+        os.path.exists(framed_path)
+        and os.path.exists(index_path)
+        and os.path.getmtime(index_path) >= os.path.getmtime(books_path)
+    ):
+        try:
+            return BookIndexReader(framed_path)
+        except ValueError:
+            pass  # Older index version or a half-swapped pair: rebuild
+
+    os.makedirs(cache_dir, exist_ok=True)
+    write_indexed_books(books_path, output_path=framed_path)
+    return BookIndexReader(framed_path)
+
+
+class BookTable:
+    """
+    Weighted book selection for one bet mode
+
+    Weights and payouts come from lookUpTable_<mode>_0.csv (id,weight,payout);
+    books come from books_<mode>.jsonl.zst. Selection is an alias-table draw,
+    so its distribution is exactly the published weights.
+    """
+
+    def __init__(self, publish_dir: str, mode: str = 'base', cache_dir: Optional[str] = None):
+        """
+        Load lookup table and open the book index
+
+        Args:
+            publish_dir: SDK publish_files folder
+            mode: Bet mode name
+            cache_dir: Folder for the framed books copy (default DEFAULT_CACHE_DIR)
+        """
+        self.mode = mode
+        lookup_path = os.path.join(publish_dir, f"lookUpTable_{mode}_0.csv")
+        books_path = os.path.join(publish_dir, f"books_{mode}.jsonl.zst")
+
+        ids = []
+        weights = []
+        payouts = []
+        with open(lookup_path, newline='') as f:
+            for book_id, weight, payout in csv.reader(f):
+                ids.append(int(book_id))
+                weights.append(int(weight))
+                payouts.append(int(payout))
+
+        self.book_ids = np.asarray(ids, dtype=np.int64)
+        self.payouts = np.asarray(payouts, dtype=np.int64)
+        self.total_weight = sum(weights)
+        self.table = OutcomeTable(list(enumerate(weights)))
+        self.table.alias  # Build now, not on the first /play
+        self.index = open_book_index(books_path, cache_dir)
+        self._index_lock = threading.Lock()  # The reader's frame cache is not thread-safe
+
+    def rtp(self) -> float:
+        """Weighted mean payout multiplier of the lookup table"""
+        weighted = sum(int(p) * w for p, (_, w) in zip(self.payouts.tolist(), self.table.source))
+        return weighted / self.total_weight / 100
+
+    def draw(self, column_value: float, coin_value: float) -> BookDraw:
+        """
+        Select a book from two provably fair floats
+
+        One float picks the alias column and the other flips its coin. The
+        two must come from independent draws (never one derived from the
+        other); then each book is selected with its published weight up to
+        the floats' 32-bit resolution: for n rows the column choice is
+        uniform to within a relative n / 2**32, and the coin to within 2**-32.
+
+        Args:
+            column_value: Float in [0, 1) choosing the column
+            coin_value: Independent float in [0, 1) choosing column vs alias
+
+        Returns:
+            BookDraw with the selected book
+        """
+        probability, alias = self.table.alias
+        column = min(int(column_value * len(self.book_ids)), self.table.last_index)
+        row = column if coin_value < probability[column] else int(alias[column])
+        book_id = int(self.book_ids[row])
+        with self._index_lock:
+            book = self.index.get(book_id)
+        return BookDraw(book_id, int(self.payouts[row]), book)
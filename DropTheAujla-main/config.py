@@ -138,6 +138,18 @@ class GameConfig:
         }
     }
     
+    # Bumped by update_weights(); compiled weight tables rebuild when it changes
+    WEIGHTS_VERSION = 0
+    
+    @classmethod
+    def update_weights(cls, multiplier_weights=None, black_hole_weights=None):
+        """Replace multiplier weight lists; always edit weights through here"""
+        if multiplier_weights is not None:
+            cls.MULTIPLIER_WEIGHTS = list(multiplier_weights)
+        if black_hole_weights is not None:
+            cls.BLACK_HOLE = dict(cls.BLACK_HOLE, multiplier_weights=list(black_hole_weights))
+        cls.WEIGHTS_VERSION += 1
+    
     @classmethod
     def get_total_multiplier_weight(cls):
         """Calculate total weight for normalization"""
@@ -82,7 +82,7 @@ class EventGenerator:
         # Zero payout = early stop, max payout = near ground
         terminal_depth_y = int(WORLD_START_Y + payout_ratio * MAX_DESCENT)
         
-        return {
+        event = {
             'type': 'round_start',
             'timestamp': int(time.time() * 1000),
             'bet_amount': result['bet_amount'],
@@ -96,6 +96,12 @@ class EventGenerator:
             'black_hole_triggered': result['black_hole_triggered'],
             'black_hole_multiplier': result['black_hole_multiplier'],
         }
+        
+        # Compact plan when GameMath runs with lazy_spawn
+        if 'spawn_plan' in result:
+            event['spawn_plan'] = result['spawn_plan']
+        
+        return event
     
     def _create_collectible_events(self, result: Dict) -> List[Dict]:
         """Create events for collected items"""
@@ -6,8 +6,28 @@ Handles RTP calculation, provably fair RNG, and payout engine
 import hashlib
 import hmac
 import random
-from typing import Tuple, Dict, List, Optional
+from bisect import bisect_left
+from math import comb
+from typing import Tuple, Dict, Iterator, List, Optional, Sequence
+import numpy as np
 from config import GameConfig
+from provably_fair import FLOATS_PER_BLOCK, ExpandedDraws, unpack_block
+from spawn_plan import SpawnPlan
+
+# Counter-mode draw layout within a round. Draws below DRAW_EXPANDED_START are
+# HMAC-SHA256(client_seed:nonce:index); draw i from there on is word
+# i - DRAW_EXPANDED_START of the round's HMAC-SHA512(client_seed:nonce:block) expansion
+DRAW_BASE_MULTIPLIER = 0
+DRAW_BLACK_HOLE_TRIGGER = 1
+DRAW_BLACK_HOLE_MULTIPLIER = 2
+DRAW_COLLECTIBLES_START = 3  # One draw per collectible slot
+DRAW_SPAWN_START = 64  # Cosmetic spawn plan draws
+DRAW_EXPANDED_START = DRAW_COLLECTIBLES_START
+
+
+def collectible_slot_count() -> int:
+    """Total collectible slots per round (sum of max_per_round)"""
+    return sum(config['max_per_round'] for config in GameConfig.COLLECTIBLES.values())
 
 
 class ProvablyFairRNG:
@@ -41,6 +61,109 @@ class ProvablyFairRNG:
         """Return hashed server seed for client verification"""
         return hashlib.sha256(self.server_seed.encode()).hexdigest()
     
+    def _keyed_hmac(self):
+        """HMAC state keyed with server_seed that has absorbed "client_seed:" """
+        seeds = (self.server_seed, self.client_seed)
+        if getattr(self, '_keyed_seeds', None) != seeds:
+            self._keyed = hmac.new(self.server_seed.encode(), f"{self.client_seed}:".encode(), hashlib.sha256)
+            self._keyed_seeds = seeds
+        return self._keyed
+    
+    def _keyed_hmac512(self):
+        """HMAC-SHA512 state keyed with server_seed that has absorbed "client_seed:" """
+        seeds = (self.server_seed, self.client_seed)
+        if getattr(self, '_keyed512_seeds', None) != seeds:
+            self._keyed512 = hmac.new(self.server_seed.encode(), f"{self.client_seed}:".encode(), hashlib.sha512)
+            self._keyed512_seeds = seeds
+        return self._keyed512
+    
+    def _expand_block(self, round_nonce: int, block: int) -> List[float]:
+        """Sixteen expanded draws of a round: HMAC-SHA512(server_seed, client_seed:round_nonce:block)"""
+        h = self._keyed_hmac512().copy()
+        h.update(f"{round_nonce}:{block}".encode())
+        return unpack_block(h.digest(), 0xFFFFFFFF)
+    
+    @staticmethod
+    def _to_float(digest: bytes) -> float:
+        # First 4 bytes (8 hex characters) as a number between 0 and 1
+        return int.from_bytes(digest[:4], 'big') / 0xFFFFFFFF
+    
+    def random_at(self, nonce: int) -> float:
+        """
+        Provably fair random number for a specific nonce (does not advance state)
+        Uses HMAC-SHA256(server_seed, client_seed:nonce)
+        
+        Args:
+            nonce: Nonce to derive the value from
+            
+        Returns:
+            Float between 0.0 and 1.0
+        """
+        h = self._keyed_hmac().copy()
+        h.update(str(nonce).encode())
+        return self._to_float(h.digest())
+    
+    def random_for(self, round_nonce: int, index: int) -> float:
+        """
+        Counter-mode draw `index` of round `round_nonce` (does not advance state)
+        Draws below DRAW_EXPANDED_START use HMAC-SHA256(server_seed, client_seed:round_nonce:index);
+        later draws are words of the round's HMAC-SHA512 expansion
+        
+        Any draw of any round can be computed directly, so a round can be
+        verified or regenerated without replaying the session.
+        
+        Args:
+            round_nonce: Round nonce
+            index: Draw index within the round
+            
+        Returns:
+            Float between 0.0 and 1.0
+        """
+        if index >= DRAW_EXPANDED_START:
+            block, word = divmod(index - DRAW_EXPANDED_START, FLOATS_PER_BLOCK)
+            return self._expand_block(round_nonce, block)[word]
+        h = self._keyed_hmac().copy()
+        h.update(f"{round_nonce}:{index}".encode())
+        return self._to_float(h.digest())
+    
+    def randoms_for(self, round_nonce: int, start: int, count: int) -> List[float]:
+        """
+        Batch of consecutive counter-mode draws for a round
+        
+        Expanded draws cost one HMAC per sixteen.
+        
+        Args:
+            round_nonce: Round nonce
+            start: First draw index
+            count: Number of draws
+            
+        Returns:
+            List of floats for indices [start, start + count)
+        """
+        draws = self.draws_for(round_nonce)
+        return [draws(index) for index in range(start, start + count)]
+    
+    def draws_for(self, round_nonce: int):
+        """
+        Random-access draws of a round, equal to random_for(round_nonce, index)
+        
+        Each expansion block is hashed once, on first use.
+        
+        Args:
+            round_nonce: Round nonce
+            
+        Returns:
+            Function from draw index to float
+        """
+        expanded = ExpandedDraws(lambda block: self._expand_block(round_nonce, block))
+        
+        def draw(index: int) -> float:
+            if index >= DRAW_EXPANDED_START:
+                return expanded(index - DRAW_EXPANDED_START)
+            return self.random_for(round_nonce, index)
+        
+        return draw
+    
     def generate_random(self) -> float:
         """
         Generate provably fair random number between 0 and 1
@@ -49,20 +172,19 @@ class ProvablyFairRNG:
         Returns:
             Float between 0.0 and 1.0
         """
-        message = f"{self.client_seed}:{self.nonce}"
-        hash_result = hmac.new(
-            self.server_seed.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Convert first 8 hex characters to number between 0 and 1
-        value = int(hash_result[:8], 16) / 0xFFFFFFFF
+        value = self.random_at(self.nonce)
         self.nonce += 1
         
         return value
     
-    def verify_result(self, server_seed: str, client_seed: str, nonce: int, expected_value: float) -> bool:
+    def verify_result(
+        self,
+        server_seed: str,
+        client_seed: str,
+        nonce: int,
+        expected_value: float,
+        index: Optional[int] = None
+    ) -> bool:
         """
         Verify a previous result using known seeds and nonce
         
@@ -71,11 +193,22 @@ class ProvablyFairRNG:
             client_seed: Original client seed
             nonce: Nonce used for that round
             expected_value: Expected random value
+            index: Draw index within the round (counter-mode draws)
             
         Returns:
             True if verification passes
         """
-        message = f"{client_seed}:{nonce}"
+        if index is not None and index >= DRAW_EXPANDED_START:
+            block, word = divmod(index - DRAW_EXPANDED_START, FLOATS_PER_BLOCK)
+            digest = hmac.new(
+                server_seed.encode(),
+                f"{client_seed}:{nonce}:{block}".encode(),
+                hashlib.sha512
+            ).digest()
+            value = unpack_block(digest, 0xFFFFFFFF)[word]
+            return abs(value - expected_value) < 0.0001
+        
+        message = f"{client_seed}:{nonce}" if index is None else f"{client_seed}:{nonce}:{index}"
         hash_result = hmac.new(
             server_seed.encode(),
             message.encode(),
@@ -86,9 +219,160 @@ class ProvablyFairRNG:
         return abs(value - expected_value) < 0.0001  # Allow small floating point variance
 
 
+class OutcomeTable:
+    """
+    Compiled inverse-CDF lookup for a weighted (value, weight) distribution
+
+    Draws are bit-identical to walking the weight list: the cumulative sums
+    are accumulated in the same order and a draw returns the first entry
+    whose cumulative weight is >= random_value * total_weight.
+    """
+
+    _cache: Dict[str, Tuple[int, Sequence, 'OutcomeTable']] = {}
+
+    def __init__(self, weights: Sequence[Tuple[float, float]]):
+        """
+        Build table from weight config
+
+        Args:
+            weights: List of (value, weight) tuples
+        """
+        self.source = list(weights)
+        self.values = [value for value, _ in self.source]
+        self.cumulative = []
+        cumulative = 0
+        for _, weight in self.source:
+            cumulative += weight
+            self.cumulative.append(cumulative)
+        self.total_weight = sum(weight for _, weight in self.source)
+        self.last_index = len(self.values) - 1
+
+        self.values_array = np.asarray(self.values, dtype=np.float64)
+        self.cumulative_array = np.asarray(self.cumulative, dtype=np.float64)
+        self._alias = None
+
+    @classmethod
+    def for_weights(cls, name: str, weights: Sequence[Tuple[float, float]], version: int = 0) -> 'OutcomeTable':
+        """
+        Return cached table for `name`, rebuilding it if the weights changed
+
+        The check is O(1): the table is rebuilt when `version` moves on
+        (GameConfig.update_weights) or a different list object is passed.
+        Mutating a weight list in place is not detected.
+
+        Args:
+            name: Cache key (e.g. 'multiplier', 'black_hole')
+            weights: Current (value, weight) list from GameConfig
+            version: GameConfig.WEIGHTS_VERSION
+
+        Returns:
+            Compiled OutcomeTable
+        """
+        cached = cls._cache.get(name)
+        if cached is not None and cached[0] == version and cached[1] is weights:
+            return cached[2]
+        table = cls(weights)
+        cls._cache[name] = (version, weights, table)
+        return table
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all compiled tables"""
+        cls._cache.clear()
+
+    def index(self, random_value: float) -> int:
+        """Outcome index for a single random float in [0, 1)"""
+        return min(bisect_left(self.cumulative, random_value * self.total_weight), self.last_index)
+
+    def sample(self, random_value: float) -> float:
+        """Outcome value for a single random float in [0, 1)"""
+        return self.values[self.index(random_value)]
+
+    def sample_batch(self, random_values: np.ndarray) -> np.ndarray:
+        """
+        Vectorised inverse-CDF lookup
+
+        Args:
+            random_values: Array of floats in [0, 1)
+
+        Returns:
+            Array of outcome values
+        """
+        indices = np.searchsorted(self.cumulative_array, np.asarray(random_values) * self.total_weight, side='left')
+        np.minimum(indices, self.last_index, out=indices)
+        return self.values_array[indices]
+
+    def _build_alias(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Walker/Vose alias table: (probability, alias) per column"""
+        n = len(self.values)
+        scaled = [weight * n / self.total_weight for _, weight in self.source]
+        probability = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] = (scaled[high] + scaled[low]) - 1.0
+            if scaled[high] < 1.0:
+                small.append(high)
+            else:
+                large.append(high)
+        for i in large + small:
+            probability[i] = 1.0
+
+        return np.asarray(probability), np.asarray(alias, dtype=np.int64)
+
+    @property
+    def alias(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Lazily built alias table"""
+        if self._alias is None:
+            self._alias = self._build_alias()
+        return self._alias
+
+    def sample_alias(self, random_value: float) -> float:
+        """
+        O(1) alias-method draw from one random float
+
+        Same distribution as sample() but a different mapping from
+        random value to outcome, so it is not interchangeable for replays.
+        """
+        probability, alias = self.alias
+        scaled = random_value * len(self.values)
+        column = min(int(scaled), self.last_index)
+        if scaled - column < probability[column]:
+            return self.values[column]
+        return self.values[alias[column]]
+
+    def sample_alias_batch(self, random_values: np.ndarray) -> np.ndarray:
+        """Vectorised alias-method draws"""
+        probability, alias = self.alias
+        scaled = np.asarray(random_values) * len(self.values)
+        columns = np.minimum(scaled.astype(np.int64), self.last_index)
+        keep = (scaled - columns) < probability[columns]
+        return self.values_array[np.where(keep, columns, alias[columns])]
+
+    def probabilities(self) -> List[float]:
+        """Normalised probability per outcome"""
+        return [weight / self.total_weight for _, weight in self.source]
+
+
 class MultiplierEngine:
     """Handles multiplier selection based on weighted probabilities"""
     
+    @staticmethod
+    def multiplier_table() -> OutcomeTable:
+        """Compiled table for GameConfig.MULTIPLIER_WEIGHTS"""
+        return OutcomeTable.for_weights('multiplier', GameConfig.MULTIPLIER_WEIGHTS, GameConfig.WEIGHTS_VERSION)
+    
+    @staticmethod
+    def black_hole_table() -> OutcomeTable:
+        """Compiled table for GameConfig.BLACK_HOLE multiplier weights"""
+        return OutcomeTable.for_weights('black_hole', GameConfig.BLACK_HOLE['multiplier_weights'], GameConfig.WEIGHTS_VERSION)
+    
     @staticmethod
     def select_multiplier(random_value: float) -> float:
         """
@@ -100,17 +384,7 @@ class MultiplierEngine:
         Returns:
             Selected multiplier value
         """
-        total_weight = GameConfig.get_total_multiplier_weight()
-        cumulative = 0
-        threshold = random_value * total_weight
-        
-        for multiplier, weight in GameConfig.MULTIPLIER_WEIGHTS:
-            cumulative += weight
-            if threshold <= cumulative:
-                return multiplier
-        
-        # Fallback to last multiplier
-        return GameConfig.MULTIPLIER_WEIGHTS[-1][0]
+        return MultiplierEngine.multiplier_table().sample(random_value)
     
     @staticmethod
     def select_black_hole_multiplier(random_value: float) -> float:
@@ -123,17 +397,7 @@ class MultiplierEngine:
         Returns:
             Black hole multiplier value
         """
-        total_weight = GameConfig.get_total_black_hole_weight()
-        cumulative = 0
-        threshold = random_value * total_weight
-        
-        for multiplier, weight in GameConfig.BLACK_HOLE['multiplier_weights']:
-            cumulative += weight
-            if threshold <= cumulative:
-                return multiplier
-        
-        # Fallback to last multiplier
-        return GameConfig.BLACK_HOLE['multiplier_weights'][-1][0]
+        return MultiplierEngine.black_hole_table().sample(random_value)
 
 
 class PayoutEngine:
@@ -257,6 +521,17 @@ class RTPCalculator:
         
         return expected_value
     
+    @staticmethod
+    def calculate_exact_rtp() -> Dict[str, float]:
+        """
+        Calculate exact RTP of the full payout model
+        (base multiplier, collectibles, black hole and max win cap)
+        
+        Returns:
+            Distribution statistics from ExactRTPEngine
+        """
+        return ExactRTPEngine().statistics()
+    
     @staticmethod
     def simulate_rtp(num_rounds: int = 100000, bet_amount: float = 1.0) -> Dict[str, float]:
         """
@@ -269,34 +544,19 @@ class RTPCalculator:
         Returns:
             Dictionary with simulation results
         """
-        rng = ProvablyFairRNG()
-        total_wagered = 0
-        total_returned = 0
-        results = []
-        
-        for _ in range(num_rounds):
-            # Generate multiplier
-            rand_val = rng.generate_random()
-            multiplier = MultiplierEngine.select_multiplier(rand_val)
-            
-            # Calculate payout (simplified, no collectibles/black holes)
-            payout = bet_amount * multiplier
-            
-            total_wagered += bet_amount
-            total_returned += payout
-            results.append(multiplier)
-        
-        actual_rtp = total_returned / total_wagered if total_wagered > 0 else 0
+        # Base multiplier only (no collectibles/black holes), matching calculate_theoretical_rtp
+        simulator = VectorRTPSimulator(include_features=False)
+        results = simulator.run(num_rounds, bet_amount)
         
         return {
-            'actual_rtp': actual_rtp,
-            'actual_rtp_percentage': actual_rtp * 100,
-            'total_wagered': total_wagered,
-            'total_returned': total_returned,
+            'actual_rtp': results['rtp'],
+            'actual_rtp_percentage': results['rtp'] * 100,
+            'total_wagered': results['total_wagered'],
+            'total_returned': results['total_returned'],
             'num_rounds': num_rounds,
-            'average_multiplier': sum(results) / len(results),
-            'max_multiplier': max(results),
-            'min_multiplier': min(results),
+            'average_multiplier': results['mean_multiplier'],
+            'max_multiplier': results['max_multiplier'],
+            'min_multiplier': results['min_multiplier'],
         }
     
     @staticmethod
@@ -316,20 +576,344 @@ class RTPCalculator:
         return (target - tolerance) <= actual_rtp <= (target + tolerance)
 
 
+class ExactRTPEngine:
+    """
+    Exact payout distribution for the full round model
+
+    Convolves the base multiplier distribution, the per-type binomial
+    collectible counts and the black hole multiplier into a discrete PMF of
+    min((base + collectible bonus) * black hole, max win), matching
+    PayoutEngine.calculate_final_payout without simulation.
+    """
+
+    def __init__(
+        self,
+        multiplier_weights: Optional[Sequence[Tuple[float, float]]] = None,
+        collectibles: Optional[Dict] = None,
+        black_hole: Optional[Dict] = None,
+        max_win_multiplier: Optional[float] = None
+    ):
+        """
+        Initialize engine, defaulting to GameConfig values
+
+        Args:
+            multiplier_weights: (multiplier, weight) list
+            collectibles: Collectible config keyed by type
+            black_hole: Black hole config with trigger_probability and multiplier_weights
+            max_win_multiplier: Win cap as a multiple of bet
+        """
+        self.multiplier_weights = multiplier_weights if multiplier_weights is not None else GameConfig.MULTIPLIER_WEIGHTS
+        self.collectibles = collectibles if collectibles is not None else GameConfig.COLLECTIBLES
+        self.black_hole = black_hole if black_hole is not None else GameConfig.BLACK_HOLE
+        self.max_win_multiplier = max_win_multiplier if max_win_multiplier is not None else GameConfig.MAX_WIN_MULTIPLIER
+
+    @staticmethod
+    def _weights_pmf(weights: Sequence[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        total_weight = sum(weight for _, weight in weights)
+        values = np.array([value for value, _ in weights], dtype=np.float64)
+        probabilities = np.array([weight / total_weight for _, weight in weights], dtype=np.float64)
+        return values, probabilities
+
+    @staticmethod
+    def _binomial_pmf(trials: int, probability: float) -> np.ndarray:
+        return np.array([
+            comb(trials, k) * probability ** k * (1 - probability) ** (trials - k)
+            for k in range(trials + 1)
+        ])
+
+    def base_pmf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Base multiplier values and probabilities"""
+        return self._weights_pmf(self.multiplier_weights)
+
+    def collectible_pmf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Collectible bonus values and probabilities (sum of per-type binomials)"""
+        values = np.zeros(1)
+        probabilities = np.ones(1)
+        for config in self.collectibles.values():
+            counts = np.arange(config['max_per_round'] + 1)
+            type_values = counts * config['value_multiplier']
+            type_probabilities = self._binomial_pmf(config['max_per_round'], config['spawn_probability'])
+            values = (values[:, None] + type_values[None, :]).ravel()
+            probabilities = (probabilities[:, None] * type_probabilities[None, :]).ravel()
+        return self._merge(values, probabilities)
+
+    def black_hole_pmf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Black hole multiplier values and probabilities (1.0 when not triggered)"""
+        trigger_probability = self.black_hole['trigger_probability']
+        values, probabilities = self._weights_pmf(self.black_hole['multiplier_weights'])
+        values = np.concatenate(([1.0], values))
+        probabilities = np.concatenate(([1 - trigger_probability], probabilities * trigger_probability))
+        return self._merge(values, probabilities)
+
+    @staticmethod
+    def _merge(values: np.ndarray, probabilities: np.ndarray, decimals: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Combine equal outcomes (to `decimals` places), sorted by value"""
+        keys, inverse = np.unique(np.round(values, decimals), return_inverse=True)
+        merged = np.bincount(inverse.ravel(), weights=probabilities.ravel(), minlength=len(keys))
+        return keys, merged
+
+    def payout_pmf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Full payout distribution with wincap truncation
+
+        Returns:
+            Tuple of (sorted payout multipliers, probabilities)
+        """
+        base_values, base_probabilities = self.base_pmf()
+        bonus_values, bonus_probabilities = self.collectible_pmf()
+        hole_values, hole_probabilities = self.black_hole_pmf()
+
+        payouts = (base_values[:, None, None] + bonus_values[None, :, None]) * hole_values[None, None, :]
+        probabilities = (
+            base_probabilities[:, None, None]
+            * bonus_probabilities[None, :, None]
+            * hole_probabilities[None, None, :]
+        )
+        payouts = np.minimum(payouts, self.max_win_multiplier)
+        return self._merge(payouts, probabilities)
+
+    def statistics(self) -> Dict[str, float]:
+        """
+        Exact RTP, variance, hit rate and max win odds
+
+        Returns:
+            Dictionary of distribution statistics
+        """
+        values, probabilities = self.payout_pmf()
+        rtp = float(np.dot(values, probabilities))
+        variance = float(np.dot((values - rtp) ** 2, probabilities))
+        hit_rate = float(probabilities[values > 0].sum())
+        max_win_probability = float(probabilities[-1])
+        wincap_probability = float(probabilities[values >= self.max_win_multiplier].sum())
+
+        return {
+            'rtp': rtp,
+            'rtp_percentage': rtp * 100,
+            'variance': variance,
+            'std_dev': variance ** 0.5,
+            'hit_rate': hit_rate,
+            'max_multiplier': float(values[-1]),
+            'max_win_probability': max_win_probability,
+            'max_win_odds': 1 / max_win_probability if max_win_probability > 0 else float('inf'),
+            'wincap_probability': wincap_probability,
+            'num_outcomes': len(values),
+            'total_probability': float(probabilities.sum()),
+        }
+
+
+class VectorRTPSimulator:
+    """
+    Chunked NumPy simulator for the full round payout model
+
+    Each chunk draws the uniforms a round consumes in GameMath.generate_round_result
+    (base multiplier, black hole trigger and multiplier, one per collectible slot),
+    maps them through the compiled OutcomeTables with array ops and folds the
+    result into running statistics, so memory stays constant in num_rounds.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 262_144,
+        seed: Optional[int] = None,
+        include_features: bool = True,
+        replay_rng: Optional[ProvablyFairRNG] = None
+    ):
+        """
+        Initialize simulator
+
+        Args:
+            chunk_size: Rounds per vectorised chunk
+            seed: Seed for the NumPy generator (ignored when replaying)
+            include_features: Include collectibles and black holes in payouts
+            replay_rng: Replay rounds from this provably fair stream's
+                current nonce, exactly as GameMath.generate_round_result does
+        """
+        self.chunk_size = max(1, chunk_size)
+        self.include_features = include_features
+        self.replay_rng = replay_rng
+        self.generator = np.random.default_rng(seed)
+        self.collectible_slots = [
+            (config['spawn_probability'], config['value_multiplier'])
+            for config in GameConfig.COLLECTIBLES.values()
+            for _ in range(config['max_per_round'])
+        ]
+
+    def _draw_uniforms(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Uniforms for n rounds: (base, trigger, black_hole, collectibles[n, slots])"""
+        if self.replay_rng is not None:
+            return self._replay_uniforms(n)
+        
+        base = self.generator.random(n)
+        if not self.include_features:
+            return base, None, None, None
+        trigger = self.generator.random(n)
+        black_hole = self.generator.random(n)
+        collectibles = self.generator.random((n, len(self.collectible_slots)))
+        return base, trigger, black_hole, collectibles
+
+    def _replay_uniforms(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Pull the next n rounds' draws from the provably fair stream (GameMath layout)"""
+        rng = self.replay_rng
+        first_round = rng.nonce
+        rng.nonce += n
+        
+        if not self.include_features:
+            base = np.array([rng.random_for(first_round + i, DRAW_BASE_MULTIPLIER) for i in range(n)])
+            return base, None, None, None
+        
+        slots = len(self.collectible_slots)
+        draws = np.array([
+            rng.randoms_for(first_round + i, 0, DRAW_COLLECTIBLES_START + slots)
+            for i in range(n)
+        ])
+        return (
+            draws[:, DRAW_BASE_MULTIPLIER],
+            draws[:, DRAW_BLACK_HOLE_TRIGGER],
+            draws[:, DRAW_BLACK_HOLE_MULTIPLIER],
+            draws[:, DRAW_COLLECTIBLES_START:],
+        )
+
+    def payout_multipliers(
+        self,
+        base: np.ndarray,
+        trigger: Optional[np.ndarray] = None,
+        black_hole: Optional[np.ndarray] = None,
+        collectibles: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Map per-round uniforms to final payout multipliers
+
+        Follows PayoutEngine.calculate_final_payout:
+        (base + collectible bonus) * black hole multiplier, clamped to max win.
+
+        Returns:
+            Array of final multipliers
+        """
+        multipliers = MultiplierEngine.multiplier_table().sample_batch(base)
+        if trigger is None:
+            return np.minimum(multipliers, GameConfig.MAX_WIN_MULTIPLIER)
+        
+        # Accumulate slot by slot to keep PayoutEngine's summation order
+        bonus = np.zeros(len(base))
+        for slot, (probability, value) in enumerate(self.collectible_slots):
+            bonus += np.where(collectibles[:, slot] < probability, value, 0.0)
+        
+        triggered = trigger < GameConfig.BLACK_HOLE['trigger_probability']
+        black_hole_multipliers = np.where(
+            triggered, MultiplierEngine.black_hole_table().sample_batch(black_hole), 1.0
+        )
+        
+        payouts = (multipliers + bonus) * black_hole_multipliers
+        return np.minimum(payouts, GameConfig.MAX_WIN_MULTIPLIER)
+
+    def iter_chunks(self, num_rounds: int, bet_amount: float = 1.0) -> Iterator[Dict[str, float]]:
+        """
+        Simulate in chunks, yielding running statistics after each chunk
+
+        Args:
+            num_rounds: Total rounds to simulate
+            bet_amount: Bet amount per round
+
+        Yields:
+            Running statistics dictionary
+        """
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        hits = 0
+        max_multiplier = 0.0
+        min_multiplier = float('inf')
+        
+        while count < num_rounds:
+            n = min(self.chunk_size, num_rounds - count)
+            multipliers = self.payout_multipliers(*self._draw_uniforms(n))
+            
+            # Chan et al. parallel variance merge
+            chunk_mean = float(multipliers.mean())
+            chunk_m2 = float(((multipliers - chunk_mean) ** 2).sum())
+            total = count + n
+            delta = chunk_mean - mean
+            mean += delta * n / total
+            m2 += chunk_m2 + delta * delta * count * n / total
+            count = total
+            
+            hits += int(np.count_nonzero(multipliers))
+            max_multiplier = max(max_multiplier, float(multipliers.max()))
+            min_multiplier = min(min_multiplier, float(multipliers.min()))
+            
+            yield {
+                'num_rounds': count,
+                'rtp': mean,
+                'variance': m2 / count,
+                'std_dev': (m2 / count) ** 0.5,
+                'hit_rate': hits / count,
+                'mean_multiplier': mean,
+                'max_multiplier': max_multiplier,
+                'min_multiplier': min_multiplier,
+                'total_wagered': bet_amount * count,
+                'total_returned': bet_amount * mean * count,
+            }
+
+    def run(self, num_rounds: int, bet_amount: float = 1.0) -> Dict[str, float]:
+        """
+        Simulate num_rounds and return final statistics
+
+        Args:
+            num_rounds: Total rounds to simulate
+            bet_amount: Bet amount per round
+
+        Returns:
+            Statistics dictionary (rtp, variance, hit_rate, max_multiplier, ...)
+        """
+        results = None
+        for results in self.iter_chunks(num_rounds, bet_amount):
+            pass
+        return results
+
+
 class GameMath:
     """Main interface for game mathematics"""
     
-    def __init__(self, server_seed: Optional[str] = None, client_seed: Optional[str] = None):
-        """Initialize game math with optional seeds"""
+    def __init__(self, server_seed: Optional[str] = None, client_seed: Optional[str] = None, lazy_spawn: bool = False):
+        """
+        Initialize game math with optional seeds
+        
+        Args:
+            server_seed: Optional server seed
+            client_seed: Optional client seed
+            lazy_spawn: Return a compact 'spawn_plan' instead of expanded 'spawn_data'
+        """
         self.rng = ProvablyFairRNG(server_seed, client_seed)
+        self.lazy_spawn = lazy_spawn
     
     def generate_round_result(self, bet_amount: float) -> Dict:
         """
         Generate complete round result with all elements
         
+        Each round consumes exactly one nonce; its draws are addressed by
+        (nonce, draw index) in counter mode, see round_result().
+        
         Args:
             bet_amount: Amount wagered
             
+        Returns:
+            Complete round result dictionary
+        """
+        result = self.round_result(self.rng.nonce, bet_amount)
+        self.rng.nonce += 1
+        return result
+    
+    def round_result(self, round_nonce: int, bet_amount: float) -> Dict:
+        """
+        Compute the result of the round at `round_nonce` without touching RNG state
+        
+        Rounds are independent, so any round can be verified directly or
+        many rounds generated in parallel.
+        
+        Args:
+            round_nonce: Nonce of the round
+            bet_amount: Amount wagered
+            
         Returns:
             Complete round result dictionary
         """
@@ -337,23 +921,25 @@ class GameMath:
         if not GameConfig.validate_bet(bet_amount):
             raise ValueError(f"Invalid bet amount: {bet_amount}")
         
+        draws = self.rng.randoms_for(round_nonce, 0, DRAW_COLLECTIBLES_START + collectible_slot_count())
+        
         # Generate base multiplier
-        base_multiplier = MultiplierEngine.select_multiplier(self.rng.generate_random())
+        base_multiplier = MultiplierEngine.select_multiplier(draws[DRAW_BASE_MULTIPLIER])
         
         # Determine if black hole triggers
-        black_hole_triggered = self.rng.generate_random() < GameConfig.BLACK_HOLE['trigger_probability']
+        black_hole_triggered = draws[DRAW_BLACK_HOLE_TRIGGER] < GameConfig.BLACK_HOLE['trigger_probability']
         black_hole_multiplier = 1.0
         
         if black_hole_triggered:
             black_hole_multiplier = MultiplierEngine.select_black_hole_multiplier(
-                self.rng.generate_random()
+                draws[DRAW_BLACK_HOLE_MULTIPLIER]
             )
         
         # Generate collectibles (simplified for now)
-        collectibles = self._generate_collectibles()
+        collectibles = self._generate_collectibles(draws[DRAW_COLLECTIBLES_START:])
         
         # Generate spawn positions for visual elements
-        spawn_data = self._generate_spawn_data(black_hole_triggered)
+        spawn_plan = self._generate_spawn_plan(round_nonce, black_hole_triggered)
         
         # Calculate final payout
         payout_data = PayoutEngine.calculate_final_payout(
@@ -363,219 +949,74 @@ class GameMath:
             black_hole_multiplier
         )
         
-        return {
+        result = {
             'bet_amount': bet_amount,
-            'nonce': self.rng.nonce - (3 if black_hole_triggered else 1),  # Adjust for RNG calls
+            'nonce': round_nonce,
             'base_multiplier': base_multiplier,
             'collectibles': collectibles,
             'black_hole_triggered': black_hole_triggered,
             'black_hole_multiplier': black_hole_multiplier,
-            'spawn_data': spawn_data,
             **payout_data,
             'server_seed_hash': self.rng.get_server_seed_hash(),
         }
+        
+        if self.lazy_spawn:
+            result['spawn_plan'] = spawn_plan.to_compact()
+        else:
+            result['spawn_data'] = spawn_plan.to_dict()
+        
+        return result
     
-    def _generate_collectibles(self) -> List[str]:
-        """Generate collectibles for the round"""
+    def _generate_collectibles(self, slot_draws: Sequence[float]) -> List[str]:
+        """Generate collectibles for the round, one draw per collectible slot"""
         collectibles = []
+        slot = 0
         
         for collectible_type, config in GameConfig.COLLECTIBLES.items():
             max_count = config['max_per_round']
             spawn_prob = config['spawn_probability']
             
-            count = 0
             for _ in range(max_count):
-                if self.rng.generate_random() < spawn_prob:
+                if slot_draws[slot] < spawn_prob:
                     collectibles.append(collectible_type)
-                    count += 1
+                slot += 1
         
         return collectibles
     
-    def _generate_spawn_data(self, black_hole_triggered: bool) -> Dict:
+    def _generate_spawn_plan(self, round_nonce: int, black_hole_triggered: bool) -> SpawnPlan:
         """
-        Generate all spawn positions using provably fair RNG.
-        Frontend should use these positions instead of Math.random()
-        
-        Returns:
-            Dictionary with all spawn data
-        """
-        # World constants (matching frontend)
-        SCREEN_W = 1920
-        WORLDH = 20000
-        GROUND_Y = WORLDH - 700  # GROUND_HEIGHT = 700
-        DEADZONE = 1500
-        TOP_SAFE = DEADZONE
-        BOTTOM_SAFE = GROUND_Y - DEADZONE
-        
-        # DESCENT CORRIDOR CONSTANTS
-        # Matches frontend map center (roughly 8000)
-        WORLD_CENTER_X = 8000 
-        CORRIDOR_WIDTH = 1400  # Narrow corridor to force interaction
-        CORRIDOR_MIN_X = WORLD_CENTER_X - (CORRIDOR_WIDTH / 2)
-        CORRIDOR_MAX_X = WORLD_CENTER_X + (CORRIDOR_WIDTH / 2)
-        
-        spawn_data = {
-            'collectibles': [],
-            'black_holes': [],
-            'clouds': [],
-            'dark_clouds': [],
-            'pushables': [],
-            'config': {
-                'screen_w': SCREEN_W,
-                'world_h': WORLDH,
-                'ground_y': GROUND_Y,
-                'deadzone': DEADZONE,
-                'corridor_width': CORRIDOR_WIDTH,
-                'world_center_x': WORLD_CENTER_X
-            }
-        }
-        
-        # Helper for random X within corridor
-        def get_corridor_x():
-            return CORRIDOR_MIN_X + self.rng.generate_random() * CORRIDOR_WIDTH
-
-        # ---------------------------------------------------------
-        # FLIGHT PATH GENERATION
-        # ---------------------------------------------------------
-        # Generate a zig-zag path to ensure character hits obstacles/clouds
-        path_points = []
-        current_y = TOP_SAFE
-        current_x = WORLD_CENTER_X  # Start center
-        
-        # Zig-zag parameters - adjusted for ~100 corners
-        SEGMENT_HEIGHT_MIN = 150
-        SEGMENT_HEIGHT_MAX = 250
-        X_VARIANCE = 500  # How far to sway left/right
-        
-        path_points.append((current_x, current_y)) # Start point
-        
-        direction = 1 if self.rng.generate_random() < 0.5 else -1 # 1 = Right, -1 = Left
+        Build the round's spawn plan from draws DRAW_SPAWN_START onwards.
+        Only the flight path is hashed here; other objects expand on demand.
+        """
+        return SpawnPlan.build(
+            self.rng.draws_for(round_nonce),
+            DRAW_SPAWN_START,
+            black_hole_triggered
+        )
+    
+    def expand_spawn(
+        self,
+        round_nonce: int,
+        spawn_plan: Dict,
+        section: str,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Expand a slice of a compact spawn plan returned by generate_round_result
         
-        while current_y < BOTTOM_SAFE:
-            # Calculate next point
-            step_y = SEGMENT_HEIGHT_MIN + self.rng.generate_random() * (SEGMENT_HEIGHT_MAX - SEGMENT_HEIGHT_MIN)
-            next_y = current_y + step_y
-            
-            if next_y > BOTTOM_SAFE:
-                next_y = BOTTOM_SAFE
-                
-            # Calculate next X (sway)
-            # If direction is 1 (Right), target should be Center + Variance
-            # If direction is -1 (Left), target should be Center - Variance
-            # But we can also just move relative to current_x
-            
-            # Simple approach: target random X in the direction
-            if direction == 1:
-                target_x = WORLD_CENTER_X + (100 + self.rng.generate_random() * (X_VARIANCE - 100))
-            else:
-                target_x = WORLD_CENTER_X - (100 + self.rng.generate_random() * (X_VARIANCE - 100))
-            
-            # Clamp to designated corridor
-            target_x = max(CORRIDOR_MIN_X + 100, min(CORRIDOR_MAX_X - 100, target_x))
-            
-            # Add point
-            path_points.append((target_x, next_y))
-            
-            # -----------------------------------------------------
-            # CLOUD PLACEMENT AT TURN (The "Push")
-            # -----------------------------------------------------
-            # If we are moving LOW->HIGH Y (down), and need to move X to target_x
-            # We need a cloud at the start of the turn to "push" us
-            
-            # If pushing RIGHT (dx > 0): Cloud should be on LEFT of character
-            # If pushing LEFT (dx < 0): Cloud should be on RIGHT of character
-            
-            dx = target_x - current_x
-            
-            # Cloud Offset
-            CLOUD_OFFSET_X = 150 # Distance from path center to cloud center
-            
-            cloud_x = 0
-            # Logic: 
-            # If moving Right (dx > 0), we want a cloud on the left side of the path point
-            # so the character "bounces" off it to the right.
-            if dx > 0:
-                # Moving Right -> Cloud on Left
-                # "make the clouds offset a bit left from the center"
-                # Center here refers to the path vertex (current_x)
-                cloud_x = current_x - CLOUD_OFFSET_X 
-            else:
-                # Moving Left -> Cloud on Right
-                cloud_x = current_x + CLOUD_OFFSET_X
-            
-            spawn_data['clouds'].append({
-                'type': 1 if self.rng.generate_random() < 0.5 else 2,
-                'x': round(cloud_x, 2),
-                'y': round(current_y + 100, 2), # Slightly below the vertex to catch the fall
-                'index': len(spawn_data['clouds']),
-            })
-            
-            # Advance
-            current_x = target_x
-            current_y = next_y
-            direction *= -1 # Switch direction for next segment
-            
-        # ---------------------------------------------------------
-        # RANDOM FILL FOR OTHER OBJECTS (Keep existing logic mostly)
-        # ---------------------------------------------------------
-        
-        # Generate collectible positions (along the path segments approx)
-        collectible_count = 300 
-        for i in range(collectible_count):
-            ctype = 'chain' if self.rng.generate_random() < 0.4 else 'music'
-            # Pick a random point on the generated path to spawn near
-            # Interpolate between two path points
-            if len(path_points) > 1:
-                seg_idx = int(self.rng.generate_random() * (len(path_points) - 1))
-                p1 = path_points[seg_idx]
-                p2 = path_points[seg_idx+1]
-                t = self.rng.generate_random()
-                
-                # Lerp
-                px = p1[0] + (p2[0] - p1[0]) * t
-                py = p1[1] + (p2[1] - p1[1]) * t
-                
-                # Add noise
-                px += (self.rng.generate_random() - 0.5) * 300
-                
-                spawn_data['collectibles'].append({
-                    'type': ctype,
-                    'x': round(px, 2),
-                    'y': round(py, 2),
-                    'index': i
-                })
-        
-        # Generate black hole positions (randomly in corridor)
-        bh_count = 50 
-        BH_SIZE = 300
-        for i in range(bh_count):
-            x = get_corridor_x()
-            y = TOP_SAFE + self.rng.generate_random() * (BOTTOM_SAFE - DEADZONE - BH_SIZE - TOP_SAFE)
-            # Mark which black hole will trigger bonus (if any)
-            will_trigger = (i == 0 and black_hole_triggered)
-            spawn_data['black_holes'].append({
-                'x': round(x, 2),
-                'y': round(y, 2),
-                'will_trigger': will_trigger,
-                'index': i
-            })
+        Args:
+            round_nonce: Nonce of the round ('nonce' entry of the result)
+            spawn_plan: Compact plan ('spawn_plan' entry of the result)
+            section: 'collectibles', 'black_holes' or 'pushables'
+            start: First object index
+            stop: End index (exclusive)
             
-        # Remove all additional cosmetic clouds - only keep corner clouds for drama
-        # Generate dark cloud positions - remove for dramatic corner-only clouds
-        
-        # Generate pushable positions
-        pushable_count = 20 
-        PUSHABLE_SIZE = 550
-        for i in range(pushable_count):
-            x = get_corridor_x()
-            y = TOP_SAFE + self.rng.generate_random() * (BOTTOM_SAFE - PUSHABLE_SIZE - TOP_SAFE)
-            spawn_data['pushables'].append({
-                'x': round(x, 2),
-                'y': round(y, 2),
-                'index': i
-            })
-        
-        return spawn_data
+        Returns:
+            List of spawn dicts
+        """
+        plan = self._generate_spawn_plan(round_nonce, spawn_plan['black_hole_triggered'])
+        return plan.expand(section, start, stop)
     
     def get_verification_data(self) -> Dict[str, str]:
         """Get data needed for provably fair verification"""
@@ -0,0 +1,265 @@
+"""
+Journal Files for Drop the Dictator
+Append-only JSON lines with group-committed fsyncs and snapshot compaction,
+shared by the ledger, session store and round store
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so one process per journal path
+    fcntl = None
+
+SNAPSHOT_SUFFIX = '.snapshot'
+CLOSED_SUFFIX = '.closed'
+WRITE_LOCK_SUFFIX = '.lock'             # Held by any process writing or rotating the active file
+CHECKPOINT_LOCK_SUFFIX = '.checkpoint'  # Held by any process folding or reading the segments
+CHECKPOINT_EVERY = 100_000  # Appends between automatic checkpoints
+
+
+@contextmanager
+def _flock(lock_path: str):
+    """Exclusive inter-process lock on lock_path, released on exit"""
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Closing the descriptor drops the lock
+
+
+class JournalWriter:
+    """
+    Durable appends to a JSON lines file from many threads.
+
+    One handle stays open for the life of the process. A writer thread
+    drains every line queued since its last pass with a single write() and
+    fsync(), so concurrent callers share one fsync instead of paying one
+    each. append() still returns only once its line is on disk, so callers
+    acknowledge durable entries only.
+
+    Several processes may append to the same path. Each write and rotate()
+    holds an flock on <path>.lock, and a writer whose handle no longer
+    points at <path> (another process rotated it away) reopens it before
+    writing, so no line lands in a segment that is already being folded.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize writer; the file and thread are opened on first append
+
+        Args:
+            path: Journal file
+        """
+        self.path = path
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._queued = 0   # Lines ever queued
+        self._durable = 0  # Lines ever fsynced
+        self._error: Optional[OSError] = None
+        self._closing = False
+        self._file = None
+        self._file_lock = threading.Lock()  # Held around every write and by rotate()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, entry: Dict) -> None:
+        """
+        Write one entry and wait until it is fsynced
+
+        Raises:
+            OSError: The journal could not be written
+        """
+        line = json.dumps(entry, separators=(',', ':')).encode() + b'\n'
+        with self._cond:
+            if self._thread is None:
+                with self._file_lock:
+                    self._file = open(self.path, 'ab')
+                self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+                self._thread.start()
+            self._pending.append(line)
+            self._queued += 1
+            ticket = self._queued
+            self._cond.notify_all()
+            while self._durable < ticket:
+                if self._error is not None:
+                    raise OSError(f"Journal {self.path} failed: {self._error}")
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                through = self._queued
+            try:
+                with self._file_lock, _flock(self.path + WRITE_LOCK_SUFFIX):
+                    self._reopen_if_rotated()
+                    self._file.write(b''.join(batch))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+            except OSError as exc:
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = through
+                self._cond.notify_all()
+
+    def _reopen_if_rotated(self) -> None:
+        """Reopen the path if another process moved the open file away (locks held)"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self._file.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self._file.close()
+            self._file = open(self.path, 'ab')
+
+    def rotate(self, closed_path: str) -> None:
+        """
+        Move every line written so far to closed_path and continue in a fresh file
+
+        Lines still queued here or in other processes land in the fresh file,
+        so each acknowledged entry is in exactly one of the two.
+        """
+        with self._file_lock, _flock(self.path + WRITE_LOCK_SUFFIX):
+            if self._file is not None:
+                self._file.close()
+            if os.path.exists(self.path):
+                os.replace(self.path, closed_path)
+            if self._file is not None:
+                self._file = open(self.path, 'ab')
+
+    def close(self) -> None:
+        """Flush queued lines, stop the writer thread and close the file"""
+        with self._cond:
+            thread = self._thread
+            self._closing = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+            self._file.close()
+        with self._cond:
+            self._thread = None
+            self._file = None
+            self._closing = False
+
+
+def iter_journal(path: Optional[str]) -> Iterator[Dict]:
+    """Entries of a journal file in write order; a torn final line is skipped"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, 'rb') as journal:
+        for line in journal:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class Journal:
+    """
+    Write-ahead journal that compacts itself into a snapshot.
+
+    Appends go to <path>. checkpoint() rotates <path> to <path>.closed, runs
+    <path>.snapshot followed by <path>.closed through `fold`, writes the result
+    as the new snapshot (temp file + os.replace) and deletes <path>.closed.
+    It runs in the background every `checkpoint_every` appends, so replay
+    cost follows live state instead of total traffic. `fold` must be
+    idempotent over entries it has already folded: a crash between replacing
+    the snapshot and deleting the closed segment replays both.
+
+    Worker processes may share a journal path: checkpoints and entries()
+    hold an flock on <path>.checkpoint, so only one process folds at a time
+    and readers never see a closed segment that is half folded away.
+    """
+
+    def __init__(self, path: str, fold: Callable[[Iterable[Dict]], Iterable[Dict]],
+                 checkpoint_every: int = CHECKPOINT_EVERY):
+        """
+        Initialize journal
+
+        Args:
+            path: Active journal file; the snapshot and closed segment sit beside it
+            fold: Reduces entries in write order to the entries of a snapshot
+            checkpoint_every: Appends between automatic checkpoints (0 disables them)
+        """
+        self.path = path
+        self.fold = fold
+        self.checkpoint_every = checkpoint_every
+        self._writer = JournalWriter(path)
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._appended = 0
+        self._checkpointing = False
+
+    def append(self, entry: Dict) -> None:
+        """
+        Write one entry and wait until it is fsynced
+
+        Raises:
+            OSError: The journal could not be written
+        """
+        self._writer.append(entry)
+        with self._lock:
+            self._appended += 1
+            due = (self.checkpoint_every and self._appended >= self.checkpoint_every
+                   and not self._checkpointing)
+            if due:
+                self._checkpointing = True
+        if due:
+            threading.Thread(target=self._background_checkpoint, name='journal-checkpoint',
+                             daemon=True).start()
+
+    def _background_checkpoint(self) -> None:
+        try:
+            self.checkpoint()
+        except OSError:
+            pass  # Segments stay on disk and the next checkpoint folds them
+        finally:
+            with self._lock:
+                self._checkpointing = False
+
+    def entries(self) -> Iterator[Dict]:
+        """Every entry on disk in write order: snapshot, closed segment, active file"""
+        with _flock(self.path + CHECKPOINT_LOCK_SUFFIX):
+            yield from iter_journal(self.path + SNAPSHOT_SUFFIX)
+            yield from iter_journal(self.path + CLOSED_SUFFIX)
+            yield from iter_journal(self.path)
+
+    def checkpoint(self) -> None:
+        """Fold everything written so far into the snapshot and truncate the journal"""
+        snapshot_path = self.path + SNAPSHOT_SUFFIX
+        closed_path = self.path + CLOSED_SUFFIX
+        with self._checkpoint_lock, _flock(self.path + CHECKPOINT_LOCK_SUFFIX):
+            with self._lock:
+                self._appended = 0
+            # A closed segment left by an interrupted checkpoint is folded first
+            if not os.path.exists(closed_path):
+                self._writer.rotate(closed_path)
+            folded = self.fold(chain(iter_journal(snapshot_path), iter_journal(closed_path)))
+            temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as snapshot:
+                for entry in folded:
+                    snapshot.write(json.dumps(entry, separators=(',', ':')).encode() + b'\n')
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temp_path, snapshot_path)
+            if os.path.exists(closed_path):
+                os.remove(closed_path)
+
+    def close(self) -> None:
+        """Flush queued lines and close the active file"""
+        self._writer.close()
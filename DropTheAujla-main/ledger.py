@@ -0,0 +1,277 @@
+"""
+Balance Ledger for Drop the Dictator
+Per-account sequenced balance updates with idempotency keys, CAS writes and a write-ahead journal
+"""
+
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from journal import Journal
+
+# Idempotency keys remembered per account. Older keys are forgotten and apply again,
+# so callers that must stay idempotent for longer keep their own record of the key.
+MAX_REMEMBERED_KEYS = 256
+
+# Striped locks serializing updates to one account within a process
+LOCK_STRIPES = 64
+
+
+class InsufficientFunds(Exception):
+    """Debit would take the balance below zero"""
+
+
+class UnknownAccount(Exception):
+    """No ledger account for the account id"""
+
+
+class LedgerResult(NamedTuple):
+    """Outcome of a ledger update"""
+    balance: int
+    seq: int
+    replayed: bool          # True if idempotency_key was already applied
+    meta: Optional[Dict]    # Caller data stored with the original entry
+
+
+class BalanceLedger:
+    """
+    Account balances updated by compare-and-swap.
+
+    Each account is one record {'balance', 'seq', 'keys'} in a store backend.
+    apply() reads it, computes the new record and writes it back only if no
+    other writer changed it in between, retrying otherwise - so concurrent
+    /play and /endround requests in any number of threads or worker processes
+    never lose an update and need no global lock. Every update bumps the
+    account's sequence number; repeating an idempotency key returns the
+    original result instead of moving money twice.
+
+    The journal is write-ahead: each entry is fsynced before its CAS, so
+    money never moves without a durable record, and a journal failure raises
+    before the backend changes. A CAS lost to another process is followed by
+    an abort record that replay honours; within one process, striped locks
+    keep updates to an account from racing at all. Entries carry the
+    absolute balance, so replay keeps the highest sequence number per
+    account. An entry journaled just before a crash counts as applied: the
+    client's retry with the same idempotency key gets it back as replayed.
+    The journal is folded into a balance snapshot periodically and truncated.
+
+    Accounts are keyed by an opaque account id. Callers must not pass bearer
+    credentials such as session tokens: ids land in the journal in plain text.
+    """
+
+    namespace = 'ledger'
+
+    def __init__(self, backend, journal_path: Optional[str] = None, ttl: Optional[float] = None, max_retries: int = 64):
+        """
+        Initialize ledger
+
+        Args:
+            backend: MemoryBackend or RedisBackend (needs compare_and_set, must not evict)
+            journal_path: Journal file; None disables journaling
+            ttl: Seconds an idle account lives in the backend and snapshot
+            max_retries: CAS attempts before giving up
+        """
+        self.backend = backend
+        self.journal_path = journal_path
+        self.ttl = ttl
+        self.max_retries = max_retries
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._journal = Journal(journal_path, self._fold) if journal_path else None
+
+    def _key(self, account_id: str) -> str:
+        return f"{self.namespace}:{account_id}"
+
+    def open_account(self, account_id: str, balance: int) -> LedgerResult:
+        """
+        Create an account with an opening balance (idempotent)
+
+        Args:
+            account_id: Account id
+            balance: Opening balance in micro-units
+
+        Returns:
+            LedgerResult for the opening entry
+        """
+        return self.apply(account_id, balance, idempotency_key='open', create=True)
+
+    def balance(self, account_id: str) -> Optional[int]:
+        """Current balance or None if the account is unknown"""
+        account = self.backend.get(self._key(account_id))
+        return account['balance'] if account is not None else None
+
+    def apply(
+        self,
+        account_id: str,
+        delta: int,
+        idempotency_key: str,
+        meta: Optional[Dict] = None,
+        create: bool = False
+    ) -> LedgerResult:
+        """
+        Atomically add delta to an account balance
+
+        Args:
+            account_id: Account id
+            delta: Signed amount in micro-units (negative = debit)
+            idempotency_key: Unique per logical operation, e.g. "endround:<round_id>"
+            meta: Small JSON-safe dict stored with the entry and returned on replay
+            create: Create the account if missing
+
+        Returns:
+            LedgerResult (balance after the entry, its sequence number)
+
+        Raises:
+            InsufficientFunds: Debit exceeds balance
+            UnknownAccount: Account missing and create is False
+        """
+        key = self._key(account_id)
+        with self._locks[zlib.crc32(account_id.encode()) % LOCK_STRIPES]:
+            for _ in range(self.max_retries):
+                account = self.backend.get(key)
+                if account is None:
+                    if not create:
+                        raise UnknownAccount(account_id)
+                    account_balance, seq, keys = 0, 0, {}
+                else:
+                    account_balance, seq, keys = account['balance'], account['seq'], account['keys']
+
+                applied = keys.get(idempotency_key)
+                if applied is not None:
+                    return LedgerResult(applied['balance'], applied['seq'], True, applied.get('meta'))
+
+                new_balance = account_balance + delta
+                if new_balance < 0:
+                    raise InsufficientFunds(account_id)
+
+                new_seq = seq + 1
+                new_keys = _remember(keys, idempotency_key, new_seq, new_balance, meta)
+                updated = {'balance': new_balance, 'seq': new_seq, 'keys': new_keys}
+                if self._journal is not None:
+                    self._journal.append({
+                        'account': account_id,
+                        'seq': new_seq,
+                        'key': idempotency_key,
+                        'delta': delta,
+                        'balance': new_balance,
+                        'meta': meta,
+                        'at': time.time()
+                    })
+                if self.backend.compare_and_set(key, account, updated, self.ttl):
+                    return LedgerResult(new_balance, new_seq, False, meta)
+                if self._journal is not None:
+                    self._journal.append({'account': account_id, 'abort': new_seq,
+                                          'key': idempotency_key, 'at': time.time()})
+
+        raise RuntimeError(f"Ledger contention on account {account_id}")
+
+    def _fold(self, entries: Iterable[Dict]) -> List[Dict]:
+        """
+        Reduce journal entries to one snapshot record per live account
+
+        Snapshot records carry 'keys'; entries at or below an account's
+        sequence number are already folded in and skipped, so folding a
+        snapshot together with entries it already covers is harmless.
+        Workers sharing a journal may each write an entry at the same
+        sequence number; abort records name the losers by (seq, key), so
+        only committed entries are folded, whichever was written first.
+        """
+        accounts: Dict[str, Dict] = {}
+        journaled: Dict[str, List[Dict]] = {}
+        aborted = set()
+        for entry in entries:
+            account_id = entry['account']
+            if 'keys' in entry:
+                accounts[account_id] = entry
+            elif 'abort' in entry:
+                aborted.add((account_id, entry['abort'], entry['key']))
+            else:
+                journaled.setdefault(account_id, []).append(entry)
+
+        for account_id, account_entries in journaled.items():
+            current = accounts.get(account_id)
+            committed = [
+                entry for entry in account_entries
+                if (account_id, entry['seq'], entry['key']) not in aborted
+                and (current is None or entry['seq'] > current['seq'])
+            ]
+            committed.sort(key=lambda entry: entry['seq'])  # Stable: ties keep write order
+            for entry in _one_per_seq(committed):
+                keys = current['keys'] if current is not None else {}
+                current = {
+                    'account': account_id,
+                    'balance': entry['balance'],
+                    'seq': entry['seq'],
+                    'keys': _remember(keys, entry['key'], entry['seq'], entry['balance'], entry.get('meta')),
+                    'at': entry['at']
+                }
+            if current is not None:
+                accounts[account_id] = current
+        cutoff = time.time() - self.ttl if self.ttl else None
+        return [record for record in accounts.values() if cutoff is None or record['at'] > cutoff]
+
+    def checkpoint(self) -> None:
+        """Write a balance snapshot and truncate the journal behind it"""
+        if self._journal is not None:
+            self._journal.checkpoint()
+
+    def close(self) -> None:
+        """Flush and close the journal"""
+        if self._journal is not None:
+            self._journal.close()
+
+    def recover(self) -> int:
+        """
+        Rebuild accounts from the journal after a restart
+
+        Accounts already present with an equal or newer sequence number are
+        left alone, so recovery is safe against a shared backend.
+
+        Returns:
+            Number of accounts restored
+        """
+        if self._journal is None:
+            return 0
+        now = time.time()
+        restored = 0
+        for record in self._fold(self._journal.entries()):
+            key = self._key(record['account'])
+            current = self.backend.get(key)
+            if current is not None and current['seq'] >= record['seq']:
+                continue
+            ttl = record['at'] + self.ttl - now if self.ttl else None
+            account = {'balance': record['balance'], 'seq': record['seq'], 'keys': record['keys']}
+            if self.backend.compare_and_set(key, current, account, ttl):
+                restored += 1
+        return restored
+
+
+def _one_per_seq(entries: List[Dict]) -> List[Dict]:
+    """
+    Entries sorted by seq with one entry kept per sequence number
+
+    Two unaborted entries share a seq only when the loser crashed before
+    journaling its abort. The winner is the one the next entry builds on
+    (its balance minus delta); with no next entry the later write is kept.
+    """
+    kept: List[Dict] = []
+    for index, entry in enumerate(entries):
+        if kept and kept[-1]['seq'] == entry['seq']:
+            following = next((later for later in entries[index + 1:] if later['seq'] > entry['seq']), None)
+            if following is None or following['balance'] - following['delta'] == entry['balance']:
+                kept[-1] = entry
+            continue
+        kept.append(entry)
+    return kept
+
+
+def _remember(keys: Dict, idempotency_key: str, seq: int, balance: int, meta: Optional[Dict]) -> Dict:
+    """Copy of keys with one more applied key, keeping the newest MAX_REMEMBERED_KEYS"""
+    new_keys = dict(keys)
+    new_keys.pop(idempotency_key, None)
+    new_keys[idempotency_key] = {'seq': seq, 'balance': balance, 'meta': meta}
+    if len(new_keys) > MAX_REMEMBERED_KEYS:
+        # Dicts keep insertion order: drop the oldest keys
+        for stale in list(new_keys)[:len(new_keys) - MAX_REMEMBERED_KEYS]:
+            del new_keys[stale]
+    return new_keys
@@ -0,0 +1,184 @@
+"""
+Hot-path Metrics for Drop the Dictator RGS
+Per-endpoint/per-stage latency histograms and money counters in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Latency buckets in seconds (upper bounds, +Inf implied)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram matching Prometheus semantics"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _Stage:
+    """Times one stage into a histogram"""
+
+    __slots__ = ('histogram', 'lock', 'started')
+
+    def __init__(self, histogram: Histogram, lock: threading.Lock):
+        self.histogram = histogram
+        self.lock = lock
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            self.histogram.observe(elapsed)
+        return False
+
+
+class _NullStage:
+    """Shared no-op stage used when metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics registry.
+
+    When disabled every hook returns immediately (stage() hands back a shared
+    no-op context manager), so instrumentation can stay in the hot path.
+    Each worker process exposes its own registry; scrape every worker or
+    aggregate in Prometheus.
+    """
+
+    def __init__(self, enabled: bool = False, target_rtp: Optional[float] = None):
+        """
+        Initialize registry
+
+        Args:
+            enabled: Record metrics; when False all hooks are no-ops
+            target_rtp: RTP that drift is measured against
+        """
+        self.enabled = enabled
+        self.target_rtp = target_rtp
+        self._lock = threading.Lock()
+        self._stages: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, int], int] = {}
+        self._counters: Dict[str, float] = {}
+
+    def _histogram(self, endpoint: str, stage: str) -> Histogram:
+        key = (endpoint, stage)
+        histogram = self._stages.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(key, Histogram())
+        return histogram
+
+    def stage(self, endpoint: str, stage: str):
+        """Context manager timing `stage` of `endpoint`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self._histogram(endpoint, stage), self._lock)
+
+    def observe_request(self, endpoint: str, status: int, seconds: float) -> None:
+        """Record a finished request: total latency + status counter"""
+        if not self.enabled:
+            return
+        histogram = self._histogram(endpoint, 'total')
+        with self._lock:
+            histogram.observe(seconds)
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Increment a plain counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_round(self, bet: int, payout: int) -> None:
+        """Money counters for RTP drift: wagered, paid, rounds"""
+        if not self.enabled:
+            return
+        with self._lock:
+            counters = self._counters
+            counters['rgs_rounds_total'] = counters.get('rgs_rounds_total', 0) + 1
+            counters['rgs_wagered_total'] = counters.get('rgs_wagered_total', 0) + bet
+            counters['rgs_paid_total'] = counters.get('rgs_paid_total', 0) + payout
+            if payout > 0:
+                counters['rgs_wins_total'] = counters.get('rgs_wins_total', 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            stages = {key: (list(h.counts), h.total, h.count, h.buckets) for key, h in self._stages.items()}
+            requests = dict(self._requests)
+            counters = dict(self._counters)
+
+        lines.append('# HELP rgs_stage_seconds Time spent per endpoint stage')
+        lines.append('# TYPE rgs_stage_seconds histogram')
+        for (endpoint, stage), (counts, total, count, buckets) in sorted(stages.items()):
+            labels = f'endpoint="{endpoint}",stage="{stage}"'
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'rgs_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'rgs_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'rgs_stage_seconds_sum{{{labels}}} {total}')
+            lines.append(f'rgs_stage_seconds_count{{{labels}}} {count}')
+
+        lines.append('# HELP rgs_requests_total Requests by endpoint and status')
+        lines.append('# TYPE rgs_requests_total counter')
+        for (endpoint, status), count in sorted(requests.items()):
+            lines.append(f'rgs_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        for name, value in sorted(counters.items()):
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name} {value}')
+
+        wagered = counters.get('rgs_wagered_total', 0)
+        if wagered:
+            observed = counters.get('rgs_paid_total', 0) / wagered
+            lines.append('# HELP rgs_observed_rtp Paid / wagered since process start')
+            lines.append('# TYPE rgs_observed_rtp gauge')
+            lines.append(f'rgs_observed_rtp {observed}')
+            if self.target_rtp is not None:
+                lines.append('# HELP rgs_rtp_drift Observed RTP minus target RTP')
+                lines.append('# TYPE rgs_rtp_drift gauge')
+                lines.append(f'rgs_rtp_drift {observed - self.target_rtp}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_enabled_from_env() -> bool:
+    """RGS_METRICS=1/true/yes enables collection"""
+    return os.environ.get('RGS_METRICS', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,356 @@
+"""
+Round Archive for Drop the Dictator
+Append-only zstd JSONL log of completed rounds with a compact round_id index
+"""
+
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import traceback
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import zstandard as zstd
+
+# Index record: 16-byte round id, uint64 frame offset, uint32 frame length
+_INDEX_RECORD = struct.Struct('<16sQI')
+_KEY_SIZE = 16
+LOG_FILENAME = 'rounds.jsonl.zst'
+INDEX_FILENAME = 'rounds.idx'
+# Index records per sorted run sealed from the unsorted tail of the index
+INDEX_SEGMENT_RECORDS = 4096
+_RUN_NAME = re.compile(r'^rounds\.idx\.(\d+)-(\d+)$')
+
+
+class _RunKeys:
+    """Round ids of a sorted index run as a sequence, so bisect can search it in place"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer) // _INDEX_RECORD.size
+
+    def __getitem__(self, i: int) -> bytes:
+        start = i * _INDEX_RECORD.size
+        return self.buffer[start:start + _KEY_SIZE]
+
+
+class RoundArchive:
+    """
+    Append-only archive of completed rounds.
+
+    Each archive() call writes one independent zstd frame holding a JSONL
+    batch, so the log stays a valid multi-frame .zst stream (zstd -d / the
+    SDK's decompress utilities read it whole) while any single frame can be
+    decompressed on its own. The index maps round_id -> (offset, length) of
+    its frame as fixed-size binary records, 28 bytes per round, so dispute
+    lookups touch one frame instead of the whole log.
+
+    Nothing per round is kept in memory. New index records are appended to
+    rounds.idx; every `segment_records` of them are sealed into a sorted run
+    file (rounds.idx.<start>-<stop>, record positions in rounds.idx), and
+    runs of equal size are merged, so there are O(log n) runs. A lookup
+    scans the short unsorted tail, then binary searches the memory-mapped
+    runs newest first. Sealing and merging are deterministic and published
+    with os.replace, so workers sharing the directory may race on them.
+    """
+
+    def __init__(self, directory: str, level: int = 3, segment_records: int = INDEX_SEGMENT_RECORDS):
+        """
+        Open (or create) an archive
+
+        Args:
+            directory: Folder holding the log and index files
+            level: zstd compression level
+            segment_records: Index records per sealed sorted run
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, LOG_FILENAME)
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.segment_records = max(1, segment_records)
+        self._compressor = zstd.ZstdCompressor(level=level)
+        self._local = threading.local()  # One decompressor per lookup thread: zstd contexts are not thread-safe
+        self._lock = threading.Lock()
+        # (start, stop, mapped run) covering index records [0, stop of the last run), oldest first
+        self._runs: List[Tuple[int, int, mmap.mmap]] = []
+        self._refresh_runs()
+
+    @staticmethod
+    def _key(round_id: str) -> bytes:
+        return bytes.fromhex(round_id)
+
+    def _run_path(self, start: int, stop: int) -> str:
+        return os.path.join(self.directory, f"{INDEX_FILENAME}.{start:012d}-{stop:012d}")
+
+    def _list_runs(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Widest contiguous chain of run files from record 0, and run files it supersedes"""
+        found = []
+        for name in os.listdir(self.directory):
+            match = _RUN_NAME.match(name)
+            if match:
+                found.append((int(match[1]), int(match[2])))
+        widest: Dict[int, int] = {}
+        for start, stop in found:
+            widest[start] = max(stop, widest.get(start, stop))
+        chain = []
+        position = 0
+        while position in widest:
+            chain.append((position, widest[position]))
+            position = widest[position]
+        superseded = [run for run in found if run not in chain and run[1] <= position]
+        return chain, superseded
+
+    def _refresh_runs(self) -> None:
+        """Map the current run chain; runs merged away by another worker stay readable until dropped"""
+        for _ in range(3):
+            chain, _ = self._list_runs()
+            mapped = {run[:2]: run for run in self._runs}
+            runs = []
+            try:
+                for start, stop in chain:
+                    run = mapped.get((start, stop))
+                    if run is None:
+                        with open(self._run_path(start, stop), 'rb') as f:
+                            run = (start, stop, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                    runs.append(run)
+            except FileNotFoundError:
+                continue  # Merged while we listed; list again
+            break
+        self._runs = runs
+
+    def _read_tail(self, sealed: int) -> bytes:
+        """Whole index records appended after the sealed runs"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                f.seek(sealed * _INDEX_RECORD.size)
+                data = f.read()
+        except FileNotFoundError:
+            return b''
+        return data[:len(data) - len(data) % _INDEX_RECORD.size]
+
+    def _locate(self, key: bytes) -> Optional[Tuple[int, int]]:
+        """(offset, length) of the newest frame holding key"""
+        runs = self._runs
+        tail = self._read_tail(runs[-1][1] if runs else 0)
+        if len(tail) >= self.segment_records * _INDEX_RECORD.size:
+            # Another worker sealed runs since we last looked
+            with self._lock:
+                self._refresh_runs()
+            runs = self._runs
+            tail = self._read_tail(runs[-1][1] if runs else 0)
+
+        end = len(tail)
+        while True:
+            position = tail.rfind(key, 0, end)
+            if position < 0:
+                break
+            if position % _INDEX_RECORD.size == 0:
+                return _INDEX_RECORD.unpack_from(tail, position)[1:]
+            end = position + _KEY_SIZE - 1
+
+        for _, _, buffer in reversed(runs):
+            keys = _RunKeys(buffer)
+            i = bisect_right(keys, key) - 1
+            if i >= 0 and keys[i] == key:
+                return _INDEX_RECORD.unpack_from(buffer, i * _INDEX_RECORD.size)[1:]
+        return None
+
+    def _write_run(self, start: int, stop: int, records: Iterable[bytes]) -> None:
+        path = self._run_path(start, stop)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, 'wb') as f:
+            for record in records:
+                f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+
+    def _maintain(self) -> None:
+        """Seal full segments of the unsorted tail, merge equal-sized runs, drop superseded runs"""
+        self._refresh_runs()
+        sealed = self._runs[-1][1] if self._runs else 0
+        tail = self._read_tail(sealed)
+        segment_bytes = self.segment_records * _INDEX_RECORD.size
+        for first in range(0, len(tail) - segment_bytes + 1, segment_bytes):
+            # Stable sort: a round archived twice keeps its newest record last
+            records = sorted(_INDEX_RECORD.iter_unpack(tail[first:first + segment_bytes]), key=itemgetter(0))
+            start = sealed + first // _INDEX_RECORD.size
+            self._write_run(start, start + self.segment_records, (_INDEX_RECORD.pack(*record) for record in records))
+        self._refresh_runs()
+
+        while len(self._runs) >= 2:
+            (start, middle, older), (_, stop, newer) = self._runs[-2:]
+            if middle - start != stop - middle:
+                break
+            merged = heapq.merge(_INDEX_RECORD.iter_unpack(older), _INDEX_RECORD.iter_unpack(newer), key=itemgetter(0))
+            self._write_run(start, stop, (_INDEX_RECORD.pack(*record) for record in merged))
+            self._refresh_runs()
+
+        _, superseded = self._list_runs()
+        for start, stop in superseded:
+            try:
+                os.remove(self._run_path(start, stop))
+            except OSError:
+                pass  # Already removed by another worker, or still mapped on Windows
+
+    def archive(self, records: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        Append a batch of rounds as one compressed frame
+
+        Args:
+            records: (round_id, round record) pairs
+
+        Returns:
+            Number of rounds written
+        """
+        batch = [(round_id, record) for round_id, record in records]
+        if not batch:
+            return 0
+        lines = b''.join(
+            json.dumps(dict(record, round_id=round_id), separators=(',', ':')).encode() + b'\n'
+            for round_id, record in batch
+        )
+        frame = self._compressor.compress(lines)
+
+        with self._lock:
+            # Unbuffered O_APPEND: one write() per frame, so workers sharing the
+            # directory never interleave and the end position locates our frame
+            with open(self.log_path, 'ab', buffering=0) as log:
+                log.write(frame)
+                offset = log.tell() - len(frame)
+                os.fsync(log.fileno())
+            entries = [_INDEX_RECORD.pack(self._key(round_id), offset, len(frame)) for round_id, _ in batch]
+            with open(self.index_path, 'ab', buffering=0) as index:
+                index.write(b''.join(entries))
+            self._maintain()
+        return len(batch)
+
+    def get(self, round_id: str) -> Optional[Dict]:
+        """Return the archived record for round_id, or None"""
+        try:
+            key = self._key(round_id)
+        except ValueError:
+            return None
+        location = self._locate(key)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.log_path, 'rb') as log:
+            log.seek(offset)
+            frame = log.read(length)
+        if len(frame) < length:
+            return None  # Index record for a frame that never reached the log
+        marker = f'"round_id":"{round_id}"'.encode()
+        decompressor = getattr(self._local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstd.ZstdDecompressor()
+        for line in decompressor.decompress(frame).splitlines():
+            if marker in line:
+                return json.loads(line)
+        return None
+
+    def __contains__(self, round_id: str) -> bool:
+        try:
+            return self._locate(self._key(round_id)) is not None
+        except ValueError:
+            return False
+
+    def __len__(self) -> int:
+        """Index records written (a round archived twice counts twice)"""
+        try:
+            return os.path.getsize(self.index_path) // _INDEX_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+
+class RoundCompactor:
+    """
+    Moves completed rounds out of the live RoundStore into a RoundArchive.
+
+    Active rounds are never touched, so resident memory is bounded by rounds
+    in flight plus those completed within `ttl`. With a shared backend several
+    workers may compact concurrently; a round archived twice is harmless
+    because lookups return the newest frame.
+    """
+
+    def __init__(self, rounds, archive: RoundArchive, ttl: float = 300.0, interval: float = 30.0, batch_size: int = 512):
+        """
+        Initialize compactor
+
+        Args:
+            rounds: RoundStore holding live rounds
+            archive: Destination archive
+            ttl: Seconds a completed round stays in the live store
+            interval: Seconds between background passes
+            batch_size: Rounds per compressed frame
+        """
+        self.rounds = rounds
+        self.archive = archive
+        self.ttl = ttl
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def compact_once(self, now: Optional[float] = None) -> int:
+        """
+        Archive and evict completed rounds older than ttl
+
+        Returns:
+            Number of rounds moved to the archive
+        """
+        cutoff = (time.time() if now is None else now) - self.ttl
+        moved = 0
+        batch: List[Tuple[str, Dict]] = []
+
+        for round_id in list(self.rounds.keys()):
+            record = self.rounds.get(round_id)
+            if record is None or record.get('status') != 'completed':
+                continue
+            if record.get('completed_at', 0) > cutoff:
+                continue
+            batch.append((round_id, record))
+            if len(batch) >= self.batch_size:
+                moved += self._flush(batch)
+                batch = []
+        if batch:
+            moved += self._flush(batch)
+        return moved
+
+    def _flush(self, batch: List[Tuple[str, Dict]]) -> int:
+        written = self.archive.archive(batch)
+        # Evict only after the frame is durable
+        for round_id, _ in batch:
+            self.rounds.delete(round_id)
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.compact_once()
+            except Exception:
+                # Keep compacting on the next pass; rounds stay in the live store
+                traceback.print_exc()
+
+    def start(self) -> None:
+        """Start the background compaction thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='round-compactor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after its current pass"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,441 @@
+"""
+Session and Round Storage for Drop the Dictator
+Pluggable key/value backends so the RGS endpoints can run across worker processes
+"""
+
+import json
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from journal import Journal
+
+# Uncapped shards sweep expired entries once they reach this size, then at double the survivors
+_MIN_SWEEP_SIZE = 1024
+
+
+class MemoryBackend:
+    """
+    Sharded in-process LRU store with per-entry TTL.
+
+    Each shard owns its own lock so concurrent requests touching different
+    keys do not contend. Expired entries are dropped lazily on access and
+    the least recently used entry is evicted once a shard is full, which
+    keeps resident memory flat under sustained load.
+
+    With max_entries=None nothing is ever evicted early; entries leave only
+    when their TTL runs out, swept each time a shard doubles in size. Use
+    this for records that must not be lost (debited rounds, balances).
+    """
+
+    def __init__(self, num_shards: int = 16, max_entries: Optional[int] = 100_000):
+        """
+        Initialize shards
+
+        Args:
+            num_shards: Number of independently locked shards
+            max_entries: Total capacity across all shards (None = TTL-only, no LRU eviction)
+        """
+        self.num_shards = max(1, num_shards)
+        self.shard_capacity = max(1, max_entries // self.num_shards) if max_entries else None
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(self.num_shards)]
+        self._locks = [threading.Lock() for _ in range(self.num_shards)]
+        self._sweep_at = [_MIN_SWEEP_SIZE] * self.num_shards
+
+    def _shard_index(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % self.num_shards
+
+    def _make_room(self, index: int, shard: OrderedDict) -> None:
+        """Evict LRU entries past capacity, or sweep expired ones when uncapped (lock held)"""
+        if self.shard_capacity is not None:
+            while len(shard) > self.shard_capacity:
+                shard.popitem(last=False)
+            return
+        if len(shard) < self._sweep_at[index]:
+            return
+        now = time.time()
+        expired = [key for key, (_, expires_at) in shard.items() if expires_at is not None and expires_at <= now]
+        for key in expired:
+            del shard[key]
+        self._sweep_at[index] = max(_MIN_SWEEP_SIZE, 2 * len(shard))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return stored value or None if missing/expired"""
+        index = self._shard_index(key)
+        shard = self._shards[index]
+        with self._locks[index]:
+            entry = shard.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del shard[key]
+                return None
+            shard.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value, evicting least recently used entries when full"""
+        index = self._shard_index(key)
+        shard = self._shards[index]
+        expires_at = time.time() + ttl if ttl else None
+        with self._locks[index]:
+            shard[key] = (value, expires_at)
+            shard.move_to_end(key)
+            self._make_room(index, shard)
+
+    def compare_and_set(self, key: str, expected: Optional[Any], value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Store value only if the key still holds `expected`
+
+        Args:
+            key: Storage key
+            expected: Object previously returned by get() (None = key absent)
+            value: New value; must be a fresh object, not a mutated `expected`
+            ttl: Seconds to live
+
+        Returns:
+            True if stored, False if another writer got there first
+        """
+        index = self._shard_index(key)
+        shard = self._shards[index]
+        expires_at = time.time() + ttl if ttl else None
+        with self._locks[index]:
+            entry = shard.get(key)
+            current = None
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                current = entry[0]
+            if current is not expected:
+                return False
+            shard[key] = (value, expires_at)
+            shard.move_to_end(key)
+            self._make_room(index, shard)
+            return True
+
+    def delete(self, key: str) -> None:
+        """Remove key if present"""
+        index = self._shard_index(key)
+        with self._locks[index]:
+            self._shards[index].pop(key, None)
+
+    def scan(self, prefix: str = '') -> Iterator[str]:
+        """Iterate live keys starting with prefix"""
+        now = time.time()
+        for index, shard in enumerate(self._shards):
+            with self._locks[index]:
+                keys = [
+                    key for key, (_, expires_at) in shard.items()
+                    if key.startswith(prefix) and (expires_at is None or expires_at > now)
+                ]
+            yield from keys
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+# KEYS[1] = key, ARGV = expected JSON ('' = absent), new JSON, ttl ms (0 = none)
+_CAS_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (current == false and ARGV[1] ~= '') or (current ~= false and current ~= ARGV[1]) then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisBackend:
+    """
+    Minimal Redis client speaking RESP over a plain socket.
+
+    Values are JSON encoded so every worker process sees the same session
+    and round records. Only the handful of commands the stores need are
+    implemented, which keeps the RGS free of an extra dependency and lets
+    it run against any Redis-protocol server (Redis, KeyDB, a local fake).
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', timeout: float = 5.0):
+        """
+        Initialize client
+
+        Args:
+            url: redis://[:password@]host[:port][/db]
+            timeout: Socket timeout in seconds
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            if self.password:
+                self._call('AUTH', self.password)
+            if self.db:
+                self._call('SELECT', self.db)
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+        self._local.conn = None
+
+    @staticmethod
+    def _encode_command(*args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b''.join(parts)
+
+    def _read_reply(self, reader) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            raise RuntimeError(f"Redis error: {payload.decode()}")
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            count = int(payload)
+            if count == -1:
+                return None
+            return [self._read_reply(reader) for _ in range(count)]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def _call(self, *args) -> Any:
+        sock, reader = self._connection()
+        try:
+            sock.sendall(self._encode_command(*args))
+            return self._read_reply(reader)
+        except (OSError, ConnectionError):
+            self._reset()
+            raise
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return decoded value or None"""
+        raw = self._call('GET', key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store JSON-encoded value with optional TTL"""
+        data = json.dumps(value, separators=(',', ':'))
+        if ttl:
+            self._call('SET', key, data, 'PX', int(ttl * 1000))
+        else:
+            self._call('SET', key, data)
+
+    def compare_and_set(self, key: str, expected: Optional[Any], value: Any, ttl: Optional[float] = None) -> bool:
+        """Atomic server-side compare of the JSON encoding, then SET"""
+        old = '' if expected is None else json.dumps(expected, separators=(',', ':'))
+        new = json.dumps(value, separators=(',', ':'))
+        return self._call('EVAL', _CAS_SCRIPT, 1, key, old, new, int(ttl * 1000) if ttl else 0) == 1
+
+    def delete(self, key: str) -> None:
+        """Remove key if present"""
+        self._call('DEL', key)
+
+    def scan(self, prefix: str = '') -> Iterator[str]:
+        """Iterate keys starting with prefix"""
+        cursor = '0'
+        while True:
+            cursor, keys = self._call('SCAN', cursor, 'MATCH', f"{prefix}*", 'COUNT', 500)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            for key in keys:
+                yield key.decode()
+            if cursor == '0':
+                break
+
+
+class _NamespacedStore:
+    """Common key prefixing and TTL handling for session/round stores"""
+
+    namespace = ''
+
+    def __init__(self, backend, ttl: Optional[float] = None, journal_path: Optional[str] = None):
+        """
+        Initialize store
+
+        Args:
+            backend: MemoryBackend or RedisBackend instance
+            ttl: Seconds an entry lives after its last write (None = forever)
+            journal_path: Write-ahead journal replayed by recover(); None disables it
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.journal_path = journal_path
+        self._journal = Journal(journal_path, self._fold) if journal_path else None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return record or None if unknown/expired"""
+        return self.backend.get(self._key(key))
+
+    def put(self, key: str, record: Dict, ttl: Optional[float] = None) -> None:
+        """
+        Store record
+
+        Records returned by get() must be put() back after modification;
+        remote backends hand out copies, not shared references.
+
+        Args:
+            key: Record key
+            record: Record to store
+            ttl: Seconds this write lives (None = the store's ttl)
+        """
+        entry = {'key': key, 'record': record, 'at': time.time()}
+        if ttl is None:
+            ttl = self.ttl
+        else:
+            entry['ttl'] = ttl
+        if self._journal is not None:
+            self._journal.append(entry)
+        self.backend.set(self._key(key), record, ttl)
+
+    def add(self, key: str, record: Dict) -> bool:
+        """
+        Store record only if the key is absent
+
+        Returns:
+            False when a record already exists (nothing is written)
+        """
+        if self.backend.get(self._key(key)) is not None:
+            return False
+        if self._journal is not None:
+            self._journal.append({'key': key, 'record': record, 'at': time.time()})
+        if self.backend.compare_and_set(self._key(key), None, record, self.ttl):
+            return True
+        # Lost to a concurrent writer: journal its record back over ours
+        if self._journal is not None:
+            current = self.backend.get(self._key(key))
+            self._journal.append({'key': key, 'record': current, 'at': time.time()})
+        return False
+
+    def delete(self, key: str) -> None:
+        """Remove record"""
+        if self._journal is not None:
+            self._journal.append({'key': key, 'record': None, 'at': time.time()})
+        self.backend.delete(self._key(key))
+
+    def _fold(self, entries: Iterable[Dict]) -> List[Dict]:
+        """Latest live entry per key; deleted and expired keys drop out"""
+        latest: Dict[str, Dict] = {}
+        for entry in entries:
+            latest[entry['key']] = entry
+        now = time.time()
+        live = []
+        for entry in latest.values():
+            ttl = self._entry_ttl(entry)
+            if entry['record'] is not None and (not ttl or entry['at'] + ttl > now):
+                live.append(entry)
+        return live
+
+    def _entry_ttl(self, entry: Dict) -> Optional[float]:
+        """TTL a journaled write was stored with"""
+        return entry.get('ttl', self.ttl)
+
+    def checkpoint(self) -> None:
+        """Compact the journal into a snapshot of live records"""
+        if self._journal is not None:
+            self._journal.checkpoint()
+
+    def recover(self) -> int:
+        """
+        Restore journaled records still within their TTL after a restart
+
+        Records already present in the backend are left alone.
+
+        Returns:
+            Number of records restored
+        """
+        if self._journal is None:
+            return 0
+        now = time.time()
+        restored = 0
+        for entry in self._fold(self._journal.entries()):
+            entry_ttl = self._entry_ttl(entry)
+            ttl = entry['at'] + entry_ttl - now if entry_ttl else None
+            if self.backend.get(self._key(entry['key'])) is None:
+                self.backend.set(self._key(entry['key']), entry['record'], ttl)
+                restored += 1
+        return restored
+
+    def close(self) -> None:
+        """Flush and close the journal"""
+        if self._journal is not None:
+            self._journal.close()
+
+    def keys(self) -> Iterator[str]:
+        """Iterate stored keys without namespace prefix"""
+        offset = len(self.namespace) + 1
+        for key in self.backend.scan(f"{self.namespace}:"):
+            yield key[offset:]
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class SessionStore(_NamespacedStore):
+    """Player sessions keyed by account id (never by the bearer session token)"""
+
+    namespace = 'session'
+
+
+class RoundStore(_NamespacedStore):
+    """Round records keyed by round_id"""
+
+    namespace = 'round'
+
+
+class PlayKeyStore(_NamespacedStore):
+    """Rounds placed by client idempotency keys, keyed by account id and key"""
+
+    namespace = 'playkey'
+
+
+def create_backend(redis_url: Optional[str] = None, num_shards: int = 16, max_entries: Optional[int] = 100_000):
+    """
+    Create storage backend
+
+    Args:
+        redis_url: Redis URL; when empty the in-process backend is used
+        num_shards: Shard count for in-process backend
+        max_entries: Capacity for in-process backend (None = TTL-only, never evicted)
+
+    Returns:
+        Backend instance
+    """
+    if redis_url:
+        return RedisBackend(redis_url)
+    return MemoryBackend(num_shards=num_shards, max_entries=max_entries)
@@ -0,0 +1,291 @@
+"""
+Spawn Plan for Drop the Dictator
+Compact, nonce-addressable description of a round's visual spawn layout
+"""
+
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# World constants (matching frontend)
+SCREEN_W = 1920
+WORLDH = 20000
+GROUND_Y = WORLDH - 700  # GROUND_HEIGHT = 700
+DEADZONE = 1500
+TOP_SAFE = DEADZONE
+BOTTOM_SAFE = GROUND_Y - DEADZONE
+
+# DESCENT CORRIDOR CONSTANTS
+# Matches frontend map center (roughly 8000)
+WORLD_CENTER_X = 8000
+CORRIDOR_WIDTH = 1400  # Narrow corridor to force interaction
+CORRIDOR_MIN_X = WORLD_CENTER_X - (CORRIDOR_WIDTH / 2)
+CORRIDOR_MAX_X = WORLD_CENTER_X + (CORRIDOR_WIDTH / 2)
+
+# Zig-zag parameters - adjusted for ~100 corners
+SEGMENT_HEIGHT_MIN = 150
+SEGMENT_HEIGHT_MAX = 250
+X_VARIANCE = 500  # How far to sway left/right
+CLOUD_OFFSET_X = 150  # Distance from path center to cloud center
+
+COLLECTIBLE_COUNT = 300
+BLACK_HOLE_COUNT = 50
+BH_SIZE = 300
+PUSHABLE_COUNT = 20
+PUSHABLE_SIZE = 550
+
+# Draws consumed per object in each lazily expanded section
+COLLECTIBLE_STRIDE = 4  # type, segment, lerp t, x noise
+BLACK_HOLE_STRIDE = 2   # x, y
+PUSHABLE_STRIDE = 2     # x, y
+
+SECTIONS = ('collectibles', 'black_holes', 'pushables')
+
+
+def _coord(value, digits: Optional[int] = 2) -> float:
+    """JSON coordinate: integral values stay ints as the eager generator emitted them"""
+    value = float(value)
+    if value.is_integer():
+        return int(value)
+    return value if digits is None else round(value, digits)
+
+
+class SpawnPlan:
+    """
+    Spawn layout for one round, stored as typed arrays plus nonce ranges
+
+    Only the flight path and its corner clouds are generated eagerly (their
+    draw count depends on the path itself). Collectibles, black holes and
+    pushables use a fixed number of draws each, so object i of a section is a
+    pure function of its nonce and is expanded only when requested. Expanding
+    everything reproduces the draw order of the original eager generator.
+    """
+
+    def __init__(
+        self,
+        random_at: Callable[[int], float],
+        nonce_start: int,
+        black_hole_triggered: bool,
+        path_x: np.ndarray,
+        path_y: np.ndarray,
+        cloud_type: np.ndarray,
+        cloud_x: np.ndarray,
+        cloud_y: np.ndarray,
+        section_nonces: Dict[str, int],
+        collectible_count: int
+    ):
+        self.random_at = random_at
+        self.nonce_start = nonce_start
+        self.black_hole_triggered = black_hole_triggered
+        self.path_x = path_x
+        self.path_y = path_y
+        self.cloud_type = cloud_type
+        self.cloud_x = cloud_x
+        self.cloud_y = cloud_y
+        self.section_nonces = section_nonces
+        self.counts = {
+            'collectibles': collectible_count,
+            'black_holes': BLACK_HOLE_COUNT,
+            'pushables': PUSHABLE_COUNT,
+        }
+        self.nonce_end = section_nonces['pushables'] + PUSHABLE_COUNT * PUSHABLE_STRIDE
+
+    @classmethod
+    def build(cls, random_at: Callable[[int], float], nonce_start: int, black_hole_triggered: bool) -> 'SpawnPlan':
+        """
+        Generate the flight path and lay out the lazily expanded sections
+
+        Args:
+            random_at: Function returning the provably fair float for a nonce
+            nonce_start: First nonce available to spawn generation
+            black_hole_triggered: Whether the round's first black hole triggers
+
+        Returns:
+            SpawnPlan covering nonces [nonce_start, nonce_end)
+        """
+        nonce = nonce_start
+
+        path_x = [WORLD_CENTER_X]
+        path_y = [TOP_SAFE]
+        cloud_type = []
+        cloud_x = []
+        cloud_y = []
+        current_x = WORLD_CENTER_X
+        current_y = TOP_SAFE
+
+        direction = 1 if random_at(nonce) < 0.5 else -1  # 1 = Right, -1 = Left
+        nonce += 1
+
+        while current_y < BOTTOM_SAFE:
+            step_y = SEGMENT_HEIGHT_MIN + random_at(nonce) * (SEGMENT_HEIGHT_MAX - SEGMENT_HEIGHT_MIN)
+            next_y = min(current_y + step_y, BOTTOM_SAFE)
+
+            # Target random X in the current direction, clamped to corridor
+            sway = 100 + random_at(nonce + 1) * (X_VARIANCE - 100)
+            target_x = WORLD_CENTER_X + sway if direction == 1 else WORLD_CENTER_X - sway
+            target_x = max(CORRIDOR_MIN_X + 100, min(CORRIDOR_MAX_X - 100, target_x))
+
+            path_x.append(target_x)
+            path_y.append(next_y)
+
+            # Cloud at the turn "pushes" the character: moving right puts
+            # the cloud on the left of the vertex and vice versa
+            if target_x - current_x > 0:
+                cloud_x.append(current_x - CLOUD_OFFSET_X)
+            else:
+                cloud_x.append(current_x + CLOUD_OFFSET_X)
+            cloud_y.append(current_y + 100)  # Slightly below the vertex to catch the fall
+            cloud_type.append(1 if random_at(nonce + 2) < 0.5 else 2)
+            nonce += 3
+
+            current_x = target_x
+            current_y = next_y
+            direction *= -1
+
+        # Collectibles still consume their type draw when there is no path to sit on
+        has_path = len(path_x) > 1
+        section_nonces = {'collectibles': nonce}
+        nonce += COLLECTIBLE_COUNT * (COLLECTIBLE_STRIDE if has_path else 1)
+        section_nonces['black_holes'] = nonce
+        nonce += BLACK_HOLE_COUNT * BLACK_HOLE_STRIDE
+        section_nonces['pushables'] = nonce
+
+        return cls(
+            random_at,
+            nonce_start,
+            black_hole_triggered,
+            np.array(path_x, dtype=np.float64),
+            np.array(path_y, dtype=np.float64),
+            np.array(cloud_type, dtype=np.uint8),
+            np.array(cloud_x, dtype=np.float64),
+            np.array(cloud_y, dtype=np.float64),
+            section_nonces,
+            COLLECTIBLE_COUNT if has_path else 0,
+        )
+
+    @staticmethod
+    def config() -> Dict:
+        """World constants shared with the frontend"""
+        return {
+            'screen_w': SCREEN_W,
+            'world_h': WORLDH,
+            'ground_y': GROUND_Y,
+            'deadzone': DEADZONE,
+            'corridor_width': CORRIDOR_WIDTH,
+            'world_center_x': WORLD_CENTER_X
+        }
+
+    def clouds(self) -> List[Dict]:
+        """Corner clouds along the flight path"""
+        return [
+            {
+                'type': int(self.cloud_type[i]),
+                'x': _coord(self.cloud_x[i]),
+                'y': _coord(self.cloud_y[i]),
+                'index': i,
+            }
+            for i in range(len(self.cloud_type))
+        ]
+
+    def _collectible(self, i: int) -> Dict:
+        nonce = self.section_nonces['collectibles'] + i * COLLECTIBLE_STRIDE
+        ctype = 'chain' if self.random_at(nonce) < 0.4 else 'music'
+
+        # Interpolate between two path points, then add noise
+        seg_idx = int(self.random_at(nonce + 1) * (len(self.path_x) - 1))
+        t = self.random_at(nonce + 2)
+        x1, y1 = float(self.path_x[seg_idx]), float(self.path_y[seg_idx])
+        x2, y2 = float(self.path_x[seg_idx + 1]), float(self.path_y[seg_idx + 1])
+        px = x1 + (x2 - x1) * t
+        py = y1 + (y2 - y1) * t
+        px += (self.random_at(nonce + 3) - 0.5) * 300
+
+        return {'type': ctype, 'x': round(px, 2), 'y': round(py, 2), 'index': i}
+
+    def _black_hole(self, i: int) -> Dict:
+        nonce = self.section_nonces['black_holes'] + i * BLACK_HOLE_STRIDE
+        x = CORRIDOR_MIN_X + self.random_at(nonce) * CORRIDOR_WIDTH
+        y = TOP_SAFE + self.random_at(nonce + 1) * (BOTTOM_SAFE - DEADZONE - BH_SIZE - TOP_SAFE)
+        return {
+            'x': round(x, 2),
+            'y': round(y, 2),
+            'will_trigger': i == 0 and self.black_hole_triggered,
+            'index': i
+        }
+
+    def _pushable(self, i: int) -> Dict:
+        nonce = self.section_nonces['pushables'] + i * PUSHABLE_STRIDE
+        x = CORRIDOR_MIN_X + self.random_at(nonce) * CORRIDOR_WIDTH
+        y = TOP_SAFE + self.random_at(nonce + 1) * (BOTTOM_SAFE - PUSHABLE_SIZE - TOP_SAFE)
+        return {'x': round(x, 2), 'y': round(y, 2), 'index': i}
+
+    def expand(self, section: str, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """
+        Expand objects [start, stop) of a section
+
+        Args:
+            section: 'collectibles', 'black_holes' or 'pushables'
+            start: First object index
+            stop: End index (exclusive), defaults to section size
+
+        Returns:
+            List of spawn dicts in the original spawn_data format
+        """
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown spawn section: {section}")
+        factory = {
+            'collectibles': self._collectible,
+            'black_holes': self._black_hole,
+            'pushables': self._pushable,
+        }[section]
+        count = self.counts[section]
+        stop = count if stop is None else min(stop, count)
+        return [factory(i) for i in range(max(0, start), stop)]
+
+    def to_compact(self) -> Dict:
+        """
+        Compact JSON-friendly plan: path, clouds and per-section nonce ranges
+
+        Sections are expanded from (nonce, count, stride) once the server
+        seed is revealed, or on demand by the server. Collectibles sit on
+        the path, so it must be kept to expand them.
+        """
+        return {
+            'nonce_start': self.nonce_start,
+            'nonce_end': self.nonce_end,
+            'black_hole_triggered': self.black_hole_triggered,
+            'path': {'x': [_coord(x, None) for x in self.path_x], 'y': [_coord(y, None) for y in self.path_y]},
+            'clouds': {
+                'type': self.cloud_type.tolist(),
+                'x': [_coord(x) for x in self.cloud_x],
+                'y': [_coord(y) for y in self.cloud_y],
+            },
+            'sections': {
+                'collectibles': {
+                    'nonce': self.section_nonces['collectibles'],
+                    'count': self.counts['collectibles'],
+                    'stride': COLLECTIBLE_STRIDE,
+                },
+                'black_holes': {
+                    'nonce': self.section_nonces['black_holes'],
+                    'count': self.counts['black_holes'],
+                    'stride': BLACK_HOLE_STRIDE,
+                },
+                'pushables': {
+                    'nonce': self.section_nonces['pushables'],
+                    'count': self.counts['pushables'],
+                    'stride': PUSHABLE_STRIDE,
+                },
+            },
+            'config': self.config(),
+        }
+
+    def to_dict(self) -> Dict:
+        """Fully expanded spawn_data (legacy format)"""
+        return {
+            'collectibles': self.expand('collectibles'),
+            'black_holes': self.expand('black_holes'),
+            'clouds': self.clouds(),
+            'dark_clouds': [],
+            'pushables': self.expand('pushables'),
+            'config': self.config(),
+        }
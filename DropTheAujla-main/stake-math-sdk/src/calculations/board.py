@@ -1,17 +1,342 @@
 """Handles generating game-boards from reelstrips"""
 
 import random
-from typing import List
+from typing import List, NamedTuple
+import numpy as np
 from src.state.state import GeneralGameState
-from src.calculations.statistics import get_random_outcome
+from src.calculations.statistics import get_random_outcome, seeded_choice, seeded_draws, seeded_integers
+from src.calculations.symbol import Symbol
 from src.events.events import reveal_event
 
 
+class BoardBatch(NamedTuple):
+    """Boards drawn for many sims at once."""
+
+    reelstrip_ids: List[str]  # per board
+    positions: np.ndarray  # (boards, reels) stop positions
+    codes: np.ndarray  # (boards, reels, rows) int16 symbol codes, -1 below short reels
+
+
+# Cell flag for symbols whose special_symbol_functions must run when the board is drawn
+FUNCTION_FLAG = 1 << 31
+# Batched sim boards are seeded sim * BOARD_SEED_STRIDE + (board drawn within the sim)
+BOARD_SEED_STRIDE = 1 << 20
+
+
+class EncodedReelstrip:
+    """Reelstrip as int16 symbol codes for drawing compact boards.
+
+    Each reel is one row of `strips`, followed by a copy of its first max(num_rows)
+    codes so a board window never wraps; rows are padded with -1 to equal width.
+    """
+
+    __slots__ = ("strips", "strip_lists", "lengths", "num_rows", "rows", "reel_index", "empty_cells")
+
+    def __init__(self, reelstrip: List[List[str]], symbol_storage: object, num_rows: List[int]):
+        self.num_rows = list(num_rows)
+        max_rows = max(self.num_rows)
+        self.lengths = np.array([len(reel) for reel in reelstrip], dtype=np.int64)
+        self.strips = np.full((len(reelstrip), int(self.lengths.max()) + max_rows), -1, dtype=np.int16)
+        for reel, symbols in enumerate(reelstrip):
+            codes = symbol_storage.encode(symbols)
+            self.strips[reel, : len(codes)] = codes
+            self.strips[reel, len(codes) : len(codes) + max_rows] = codes[np.arange(max_rows) % len(codes)]
+        # Plain lists for single boards, where slicing beats numpy call overhead
+        self.strip_lists = [
+            self.strips[reel, : len(symbols) + max_rows].tolist() for reel, symbols in enumerate(reelstrip)
+        ]
+        self.rows = np.arange(max_rows)
+        self.reel_index = np.arange(len(reelstrip))[:, None]
+        # Cells below a reel's row count, for boards with uneven reels
+        self.empty_cells = self.rows[None, :] >= np.asarray(self.num_rows)[:, None]
+        if not self.empty_cells.any():
+            self.empty_cells = None
+
+    def window(self, positions: List[int]) -> List[List[int]]:
+        """Codes of one board as per-reel lists."""
+        return [
+            strip[position : position + rows]
+            for strip, position, rows in zip(self.strip_lists, positions, self.num_rows)
+        ]
+
+    def to_array(self, window: List[List[int]]) -> np.ndarray:
+        """(reels, rows) int16 array of a window, -1 below short reels."""
+        if self.empty_cells is not None:
+            width = len(self.rows)
+            window = [reel + [-1] * (width - len(reel)) for reel in window]
+        return np.array(window, dtype=np.int16)
+
+    def gather(self, positions) -> np.ndarray:
+        """Board codes for stop positions of shape (..., reels); returns (..., reels, rows)."""
+        codes = self.strips[self.reel_index, np.asarray(positions)[..., None] + self.rows]
+        if self.empty_cells is not None:
+            codes[..., self.empty_cells] = -1
+        return codes
+
+
 class Board(GeneralGameState):
     """Handles generation of a game board and symbols"""
 
+    # Per-reel symbol codes of a compact board until its Symbols are created
+    _board_window = None
+    _board = None
+    _top_symbols = None
+    _bottom_symbols = None
+    # Compact boards keep (codes or names, eagerly created symbols) until first read
+    _pending_board = None
+    _pending_top = None
+    _pending_bottom = None
+    _encoded_reelstrips = None
+    _cell_flags = (None, None)
+    # config.batch_board_size: {reel weights: (first sim, BoardBatch)} and boards drawn this sim
+    _batched_boards = None
+    _board_draws = 0
+
+    def reset_seed(self, sim: int = 0, seed_override=None) -> None:
+        """Reset rng seed and the count of boards drawn in this sim."""
+        super().reset_seed(sim, seed_override)
+        self._board_draws = 0
+
+    @property
+    def board(self) -> List[List[object]]:
+        """Game board as Symbol objects; a compact board creates them on first access."""
+        if self._pending_board is not None:
+            definitions = self.symbol_storage.definitions
+            eager = self._pending_board
+            self._board = [
+                [
+                    eager.get((reel, row)) or Symbol(definitions[code])
+                    for row, code in enumerate(reel_codes)
+                ]
+                for reel, reel_codes in enumerate(self._board_window)
+            ]
+            self._pending_board = None
+            # The Symbols can now be edited in place, so the codes may go stale
+            self._board_window = None
+        return self._board
+
+    @board.setter
+    def board(self, value: List[List[object]]) -> None:
+        self._board = value
+        self._board_window = None
+        self._pending_board = None
+
+    def get_board_codes(self) -> np.ndarray:
+        """(reels, rows) int16 symbol codes of the current board, -1 below short reels.
+
+        A compact board whose Symbols have not been created returns its drawn codes;
+        otherwise the board is encoded as it stands, including in-place edits.
+        """
+        if self._pending_board is not None:
+            return self.get_encoded_reelstrip(self.reelstrip_id).to_array(self._board_window)
+        return self.symbol_storage.encode_board(self.board)
+
+    @property
+    def top_symbols(self) -> List[object]:
+        """Padding symbols above the board."""
+        if self._pending_top is not None:
+            self._top_symbols = self._padding_symbols(*self._pending_top)
+            self._pending_top = None
+        return self._top_symbols
+
+    @top_symbols.setter
+    def top_symbols(self, value: List[object]) -> None:
+        self._top_symbols = value
+        self._pending_top = None
+
+    @property
+    def bottom_symbols(self) -> List[object]:
+        """Padding symbols below the board."""
+        if self._pending_bottom is not None:
+            self._bottom_symbols = self._padding_symbols(*self._pending_bottom)
+            self._pending_bottom = None
+        return self._bottom_symbols
+
+    @bottom_symbols.setter
+    def bottom_symbols(self, value: List[object]) -> None:
+        self._bottom_symbols = value
+        self._pending_bottom = None
+
+    def _padding_symbols(self, names: List[str], eager: dict) -> List[object]:
+        symbol_defs = self.symbol_storage.symbol_defs
+        return [eager.get(reel) or Symbol(symbol_defs[name]) for reel, name in enumerate(names)]
+
+    def get_encoded_reelstrip(self, reelstrip_id: str) -> EncodedReelstrip:
+        """Int-encoded reelstrip, built once per reelstrip id."""
+        if self._encoded_reelstrips is None:
+            self._encoded_reelstrips = {}
+        encoded = self._encoded_reelstrips.get(reelstrip_id)
+        if encoded is None:
+            encoded = EncodedReelstrip(self.config.reels[reelstrip_id], self.symbol_storage, self.config.num_rows)
+            self._encoded_reelstrips[reelstrip_id] = encoded
+        return encoded
+
+    def get_cell_flags(self) -> List[int]:
+        """Per symbol code: its special_symbols bitmask, plus FUNCTION_FLAG if it has special_symbol_functions."""
+        key, flags = self._cell_flags
+        if key != tuple(self.special_symbol_functions):
+            key = tuple(self.special_symbol_functions)
+            flags = [
+                int(mask) | (FUNCTION_FLAG if name in self.special_symbol_functions else 0)
+                for name, mask in zip(self.symbol_storage.names, self.symbol_storage.special_masks.tolist())
+            ]
+            self._cell_flags = (key, flags)
+        return flags
+
+    def create_compact_board_reelstrips(self) -> None:
+        """create_board_reelstrips on int-encoded reelstrips.
+
+        Draws the same stop positions and gives the same board, padding, special
+        symbols and anticipation. Symbols with special_symbol_functions (which may
+        draw random numbers) are created straight away in the usual order; all
+        other Symbols are only created when the board or padding is read.
+        With config.batch_board_size set, boards come from draw_batched_board().
+        """
+        reel_weights = self.get_current_distribution_conditions()["reel_weights"][self.gametype]
+        if self.config.batch_board_size:
+            self.draw_batched_board(reel_weights)
+            return
+        reelstrip_id = get_random_outcome(reel_weights)
+        reelstrip = self.config.reels[reelstrip_id]
+        reel_positions = [random.randrange(0, len(reelstrip[reel])) for reel in range(self.config.num_reels)]
+        self.set_compact_board(reelstrip_id, reel_positions)
+
+    def set_compact_board(self, reelstrip_id: str, reel_positions: List[int]) -> None:
+        """Make the compact board at the given stop positions the active board."""
+        storage = self.symbol_storage
+        self.reelstrip_id = reelstrip_id
+        self.reelstrip = self.config.reels[reelstrip_id]
+        encoded = self.get_encoded_reelstrip(reelstrip_id)
+        num_reels = self.config.num_reels
+        window = encoded.window(reel_positions)
+
+        functions = self.special_symbol_functions
+        flags = self.get_cell_flags()
+        eager_board, eager_top, eager_bottom = {}, {}, {}
+        top_names, bottom_names = [], []
+        special_cells = []
+        padding_positions = [0] * num_reels
+        for reel in range(num_reels):
+            reel_pos = reel_positions[reel]
+            reel_length = len(self.reelstrip[reel])
+            num_rows = self.config.num_rows[reel]
+            if self.config.include_padding:
+                top_names.append(self.reelstrip[reel][(reel_pos - 1) % reel_length])
+                bottom_names.append(self.reelstrip[reel][(reel_pos + num_rows) % reel_length])
+                if top_names[-1] in functions:
+                    eager_top[reel] = self.create_symbol(top_names[-1])
+                if bottom_names[-1] in functions:
+                    eager_bottom[reel] = self.create_symbol(bottom_names[-1])
+            for row, code in enumerate(window[reel]):
+                flag = flags[code]
+                if flag:
+                    if flag & FUNCTION_FLAG:
+                        eager_board[(reel, row)] = self.create_symbol(storage.names[code])
+                    if flag & ~FUNCTION_FLAG:
+                        special_cells.append((reel, row, code))
+            padding_positions[reel] = (reel_pos + num_rows + 1) % reel_length
+
+        special_syms_on_board = {special_symbol: [] for special_symbol in self.config.special_symbols}
+        special_counts = dict.fromkeys(special_syms_on_board, 0)
+        first_scatter_reel = -1
+        for reel, row, code in special_cells:
+            special_keys = storage.special_keys[code]
+            sym = eager_board.get((reel, row))
+            is_scatter = sym.check_attribute("scatter") if sym is not None else "scatter" in special_keys
+            for special_symbol in special_keys:
+                special_counts[special_symbol] += 1
+                if (
+                    is_scatter
+                    and special_counts[special_symbol] >= self.config.anticipation_triggers[self.gametype]
+                    and first_scatter_reel == -1
+                ):
+                    first_scatter_reel = reel + 1
+            # Same result as get_special_symbols_on_board(); only eager symbols can carry extra attributes
+            for special_symbol in special_keys if sym is None else special_syms_on_board:
+                if sym is None or sym.check_attribute(special_symbol):
+                    special_syms_on_board[special_symbol].append({"reel": reel, "row": row})
+
+        anticipation = [0] * num_reels
+        if first_scatter_reel > -1 and first_scatter_reel != num_reels:
+            count = 1
+            for reel in range(first_scatter_reel, num_reels):
+                anticipation[reel] = count
+                count += 1
+
+        self._board = None
+        self._pending_board = eager_board
+        self._board_window = window
+        self.special_syms_on_board = special_syms_on_board
+        self.reel_positions = reel_positions
+        self.padding_position = padding_positions
+        self.anticipation = anticipation
+        if self.config.include_padding:
+            self._pending_top = (top_names, eager_top)
+            self._pending_bottom = (bottom_names, eager_bottom)
+
+    def draw_board_batch(self, seeds, reel_weights: dict = None) -> BoardBatch:
+        """Draw one board per seed from int-encoded reelstrips in a single pass.
+
+        Each sim's reelstrip (draw 0) and stops (draws 1..reels) come from
+        counter-based draws keyed on its seed, so a board is the same whichever
+        batch it is drawn in. These draws are independent of the `random` stream
+        used by run_spin. Batches feed array-based evaluators and sims (see
+        draw_batched_board), and set_board_from_batch() loads any one of them.
+
+        Args:
+            seeds: Per-sim seeds, e.g. simulation numbers.
+            reel_weights: {reelstrip_id: weight}; defaults to the current distribution
+                conditions for self.gametype.
+        """
+        if reel_weights is None:
+            reel_weights = self.get_current_distribution_conditions()["reel_weights"][self.gametype]
+        reelstrip_ids = list(reel_weights)
+        draws = seeded_draws(seeds, self.config.num_reels + 1)
+        choices = seeded_choice(draws[:, 0], reel_weights)
+        positions = np.empty((len(draws), self.config.num_reels), dtype=np.int64)
+        codes = np.empty((len(draws), self.config.num_reels, max(self.config.num_rows)), dtype=np.int16)
+        for choice, reelstrip_id in enumerate(reelstrip_ids):
+            boards = slice(None) if len(reelstrip_ids) == 1 else np.flatnonzero(choices == choice)
+            encoded = self.get_encoded_reelstrip(reelstrip_id)
+            positions[boards] = seeded_integers(draws[boards, 1:], encoded.lengths)
+            codes[boards] = encoded.gather(positions[boards])
+        return BoardBatch([reelstrip_ids[choice] for choice in choices.tolist()], positions, codes)
+
+    def set_board_from_batch(self, batch: BoardBatch, index: int) -> None:
+        """Make board `index` of a BoardBatch the active (compact) board."""
+        self.set_compact_board(batch.reelstrip_ids[index], batch.positions[index].tolist())
+
+    def draw_batched_board(self, reel_weights: dict) -> None:
+        """Make this sim's next board the active board, drawn from seed (sim, boards drawn so far).
+
+        First boards of config.batch_board_size consecutive sims are drawn together
+        and kept per reel_weights; later boards of a sim (repeats, free spins) are
+        drawn on their own. Each board depends only on its sim and position in the
+        sim, so results do not depend on threads or batch boundaries.
+        """
+        draw = self._board_draws
+        self._board_draws += 1
+        if draw:
+            batch = self.draw_board_batch([self.sim * BOARD_SEED_STRIDE + draw], reel_weights)
+            self.set_board_from_batch(batch, 0)
+            return
+
+        if self._batched_boards is None:
+            self._batched_boards = {}
+        key = tuple(reel_weights.items())
+        first_sim, batch = self._batched_boards.get(key, (None, None))
+        if first_sim is None or not first_sim <= self.sim < first_sim + len(batch.reelstrip_ids):
+            first_sim = self.sim
+            sims = np.arange(first_sim, first_sim + self.config.batch_board_size)
+            batch = self.draw_board_batch(sims * BOARD_SEED_STRIDE, reel_weights)
+            self._batched_boards[key] = (first_sim, batch)
+        self.set_board_from_batch(batch, self.sim - first_sim)
+
     def create_board_reelstrips(self) -> None:
         """Randomly selects stopping positions from a reelstrip."""
+        if self.config.compact_board:
+            self.create_compact_board_reelstrips()
+            return
         if self.config.include_padding:
             top_symbols = []
             bottom_symbols = []
@@ -318,5 +643,5 @@ class Board(GeneralGameState):
 
         new_positions = random.choices(free_positions, additional_count)[0]
         random.shuffle(new_positions)
-        for np in new_positions:
-            self.board[np[0]][np[1]] = self.create_symbol(symbol_name)
+        for pos in new_positions:
+            self.board[pos[0]][pos[1]] = self.create_symbol(symbol_name)
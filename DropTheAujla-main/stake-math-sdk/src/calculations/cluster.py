@@ -1,7 +1,6 @@
 from collections import defaultdict
 from abc import ABC
 from typing import List, Dict
-from src.calculations.board import Board
 from src.calculations.symbol import Symbol
 from src.config.config import Config
 from src.wins.multiplier_strategy import apply_mult
@@ -25,84 +24,80 @@ class Cluster:
         return (reel_to_overlay, row_to_overlay)
 
     @staticmethod
-    def get_neighbours(board: list[list[Symbol]], reel: int, row: int, local_checked: list) -> list:
-        """All neighbouring symbols within board range."""
-        neighbours = []
-        if reel > 0:
-            if (reel - 1, row) not in local_checked:
-                neighbours += [(reel - 1, row)]
-                local_checked += [(reel - 1, row)]
-        if reel < len(board) - 1:
-            if (reel + 1, row) not in local_checked:
-                neighbours += [(reel + 1, row)]
-                local_checked += [(reel + 1, row)]
-        if row > 0:
-            if (reel, row - 1) not in local_checked:
-                neighbours += [(reel, row - 1)]
-                local_checked += [(reel, row - 1)]
-        if row < len(board[reel]) - 1:
-            if (reel, row + 1) not in local_checked:
-                neighbours += [(reel, row + 1)]
-                local_checked += [(reel, row + 1)]
-        return neighbours
+    def get_bitboards(board: list[list[Symbol]], wild_key: str = "wild") -> tuple:
+        """Integer bitboards of each non-wild symbol's positions and of all wilds.
+
+        Position (reel, row) is bit reel * stride + row. stride leaves one empty
+        bit after the tallest reel, so single-bit row shifts never wrap onto the
+        neighbouring reel. Symbols are keyed in board (reel, row) order.
+        """
+        stride = max(len(reel) for reel in board) + 1
+        symbol_masks = {}
+        wild_mask = 0
+        for reel, symbols in enumerate(board):
+            bit = 1 << (reel * stride)
+            for sym in symbols:
+                if sym.check_attribute(wild_key):
+                    wild_mask |= bit
+                else:
+                    symbol_masks[sym.name] = symbol_masks.get(sym.name, 0) | bit
+                bit <<= 1
+        return symbol_masks, wild_mask, stride
 
     @staticmethod
-    def in_cluster(board: list[list[Symbol]], reel: int, row: int, og_symbol: str, wild_key: str = "wild") -> bool:
-        """Checks if a symbol (including wilds) match cluster type."""
-        if board[reel][row].check_attribute(wild_key) or og_symbol == board[reel][row].name:
-            return True
+    def flood_fill(seed: int, allowed: int, stride: int) -> int:
+        """Grow `seed` through orthogonally adjacent bits of `allowed`, all frontier bits per step."""
+        cluster = seed
+        frontier = seed
+        while frontier:
+            grown = (frontier << 1 | frontier >> 1 | frontier << stride | frontier >> stride) & allowed & ~cluster
+            cluster |= grown
+            frontier = grown
+        return cluster
 
     @staticmethod
-    def check_all_neighbours(
-        board: Board,
-        already_checked: list,
-        local_checked: list,
-        potential_cluster: list,
-        reel,
-        row,
-        og_symbol: str,
-        wild_key: str = "wild",
-    ):
-        """Recursively check neighbours for like-symbols."""
-        neighbours = Cluster.get_neighbours(board, reel, row, local_checked)
-        for reel_, row_ in neighbours:
-            if Cluster.in_cluster(board, reel_, row_, og_symbol, wild_key):
-                potential_cluster += [(reel_, row_)]
-                already_checked += [(reel_, row_)]
-                Cluster.check_all_neighbours(
-                    board,
-                    already_checked,
-                    local_checked,
-                    potential_cluster,
-                    reel_,
-                    row_,
-                    og_symbol,
-                    wild_key,
-                )
+    def cluster_positions(seed_index: int, cluster: int, stride: int) -> list:
+        """(reel, row) positions of a cluster, in the order get_clusters has always listed them.
+
+        From each position, unvisited neighbours are claimed in (reel - 1, reel + 1,
+        row - 1, row + 1) order and then followed depth-first one at a time.
+        """
+        if cluster == 1 << seed_index:
+            return [divmod(seed_index, stride)]
+        unclaimed = cluster ^ (1 << seed_index)
+        order = []
+        stack = [seed_index]
+        while stack:
+            if not unclaimed:
+                # Nothing left to claim: the rest come off the stack as they are
+                order.extend(reversed(stack))
+                break
+            index = stack.pop()
+            order.append(index)
+            neighbours = []
+            for neighbour in (index - stride, index + stride, index - 1, index + 1):
+                if neighbour >= 0 and (unclaimed >> neighbour) & 1:
+                    unclaimed ^= 1 << neighbour
+                    neighbours.append(neighbour)
+            stack.extend(reversed(neighbours))
+        return [divmod(position, stride) for position in order]
 
     @staticmethod
     def get_clusters(board: list[list[Symbol]], wild_key: str = "wild") -> dict:
-        """Return all symbol clusters of size >= 1."""
-        already_checked = []
+        """Return all symbol clusters of size >= 1.
+
+        Wilds join every adjacent cluster but never start one. Clusters are
+        listed per symbol in board order of their first position.
+        """
+        symbol_masks, wild_mask, stride = Cluster.get_bitboards(board, wild_key)
         clusters = defaultdict(list)
-        for reel, _ in enumerate(board):
-            for row, _ in enumerate(board[reel]):
-                if (reel, row) not in already_checked and not (board[reel][row].check_attribute(wild_key)):
-                    potential_cluster = [(reel, row)]
-                    already_checked += [(reel, row)]
-                    local_checked = [(reel, row)]
-                    symbol = board[reel][row].name
-                    Cluster.check_all_neighbours(
-                        board,
-                        already_checked,
-                        local_checked,
-                        potential_cluster,
-                        reel,
-                        row,
-                        symbol,
-                        wild_key,
-                    )
-                    clusters[symbol].append(potential_cluster)
+        for symbol, remaining in symbol_masks.items():
+            allowed = remaining | wild_mask
+            while remaining:
+                seed = remaining & -remaining
+                cluster = Cluster.flood_fill(seed, allowed, stride)
+                clusters[symbol].append(Cluster.cluster_positions(seed.bit_length() - 1, cluster, stride))
+                remaining &= ~cluster
 
         return clusters
 
@@ -1,8 +1,9 @@
 """Evaluates and records winds for lines games."""
 
-from src.calculations.symbol import Symbol
+import numpy as np
+from src.calculations.symbol import Symbol, SymbolStorage
 from src.config.config import Config
-from src.wins.multiplier_strategy import apply_mult
+from src.wins.multiplier_strategy import apply_mult, apply_mult_values
 from src.events.events import (
     win_info_event,
     set_win_event,
@@ -144,3 +145,135 @@ class Lines:
 
         for win in gamestate.win_data["wins"]:
             record_line(len(win["positions"]), win["symbol"], win["meta"]["multiplier"], gamestate.gametype)
+
+
+class LinesEvaluatorNP:
+    """Lines.get_lines over batches of int-encoded boards.
+
+    Paylines are compiled into a (lines, reels) row index and the paytable into a
+    dense (symbol code, kind) table, so run lengths, wild substitution and the
+    base-vs-wild comparison are array operations over every line of every board.
+    Only paying lines are turned into win dictionaries, using the original
+    paytable values, so results match Lines.get_lines exactly. Wilds are the
+    symbols listed under `wild_key` in config.special_symbols; symbol multipliers
+    are passed as an array (see board_attribute_array).
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        symbol_storage: SymbolStorage,
+        wild_key: str = "wild",
+        wild_sym: str = "W",
+    ):
+        self.config = config
+        self.names = symbol_storage.names
+        self.wild_sym = wild_sym
+        self.line_ids = list(config.paylines.keys())
+        self.line_rows = np.array([config.paylines[line_index] for line_index in self.line_ids], dtype=np.int64)
+        self.line_row_lists = self.line_rows.tolist()
+        num_reels = self.line_rows.shape[1]
+        self.reel_index = np.arange(num_reels)
+
+        # Trailing entries stand for empty cells / missing symbols (code -1)
+        self.is_wild = np.array([wild_key in keys for keys in symbol_storage.special_keys] + [False])
+        self.pays = np.zeros((len(self.names) + 1, num_reels + 1))
+        self.wild_pays = np.zeros(num_reels + 1)
+        for (kind, name), value in config.paytable.items():
+            if name in symbol_storage.codes and kind <= num_reels:
+                self.pays[symbol_storage.codes[name], kind] = value
+            if name == wild_sym and kind <= num_reels:
+                self.wild_pays[kind] = value
+
+    def evaluate(
+        self,
+        codes: np.ndarray,
+        multipliers: np.ndarray = None,
+        multiplier_method: str = "symbol",
+        global_multiplier: int = 1,
+    ) -> dict:
+        """Line wins for a batch of boards.
+
+        Args:
+            codes: (boards, reels, rows) symbol codes.
+            multipliers: Optional (boards, reels, rows) symbol multiplier values.
+            multiplier_method: "symbol", "global" or "combined", as in Lines.get_lines.
+            global_multiplier: Global multiplier for every board.
+
+        Returns:
+            {board index: {"totalWin", "wins"}} for boards with at least one line win.
+        """
+        num_reels = len(self.reel_index)
+        line_syms = np.asarray(codes)[:, self.reel_index, self.line_rows]
+        wild = self.is_wild[line_syms]
+        wild_matches = np.cumprod(wild, axis=2).sum(axis=2)
+        has_target = wild_matches < num_reels
+        target = np.take_along_axis(line_syms, np.minimum(wild_matches, num_reels - 1)[..., None], axis=2)[..., 0]
+        target = np.where(has_target, target, -1)
+        run = np.cumprod((line_syms == target[..., None]) | wild, axis=2).sum(axis=2)
+        paying = (self.pays[target, run] > 0) | (self.wild_pays[wild_matches] > 0)
+
+        if multipliers is not None and multiplier_method != "global":
+            line_mults = np.asarray(multipliers)[:, self.reel_index, self.line_rows]
+        else:
+            line_mults = None
+
+        paytable = self.config.paytable
+        results = {}
+        for board, line in zip(*np.nonzero(paying)):
+            board, line = int(board), int(line)
+            num_wilds = int(wild_matches[board, line])
+            wild_win = paytable.get((num_wilds, self.wild_sym), 0)
+            base_win = 0
+            if has_target[board, line]:
+                target_name = self.names[target[board, line]]
+                base_win = paytable.get((int(run[board, line]), target_name), 0)
+
+            if wild_win > base_win:
+                symbol, kind, win_amount = self.names[line_syms[board, line, 0]], num_wilds, wild_win
+            else:
+                symbol, kind, win_amount = target_name, int(run[board, line]), base_win
+            rows = self.line_row_lists[line]
+            positions = [{"reel": idx, "row": rows[idx]} for idx in range(kind)]
+            symbol_mults = line_mults[board, line, :kind].tolist() if line_mults is not None else []
+            line_win, applied_mult = apply_mult_values(
+                multiplier_method,
+                win_amount=win_amount,
+                global_multiplier=global_multiplier,
+                multiplier_values=symbol_mults,
+            )
+
+            return_data = results.setdefault(board, {"totalWin": 0, "wins": []})
+            return_data["totalWin"] += line_win
+            return_data["wins"].append(
+                Lines.line_win_info(
+                    symbol,
+                    kind,
+                    line_win,
+                    positions,
+                    {
+                        "lineIndex": self.line_ids[line],
+                        "multiplier": applied_mult,
+                        "winWithoutMult": win_amount,
+                        "globalMult": int(global_multiplier),
+                        "lineMultiplier": int(applied_mult / global_multiplier),
+                    },
+                )
+            )
+        return results
+
+    def get_lines(
+        self,
+        board_codes: np.ndarray,
+        multipliers: np.ndarray = None,
+        multiplier_method: str = "symbol",
+        global_multiplier: int = 1,
+    ) -> dict:
+        """Line wins for a single (reels, rows) board, in the Lines.get_lines format."""
+        results = self.evaluate(
+            np.asarray(board_codes)[None],
+            None if multipliers is None else np.asarray(multipliers)[None],
+            multiplier_method,
+            global_multiplier,
+        )
+        return results.get(0, {"totalWin": 0, "wins": []})
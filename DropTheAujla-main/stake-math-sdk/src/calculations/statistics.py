@@ -1,5 +1,6 @@
 import random
 from typing import Union
+import numpy as np
 
 
 def get_random_outcome(distribution: dict, totalWeight: float = None) -> Union[float, int]:
@@ -17,6 +18,38 @@ def get_random_outcome(distribution: dict, totalWeight: float = None) -> Union[f
     return Exception("error drawing item from distribution")
 
 
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser on uint64 arrays (wrapping arithmetic)."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def seeded_draws(seeds, num_draws: int) -> np.ndarray:
+    """Counter-based random 64-bit words, shape (len(seeds), num_draws).
+
+    Row i depends only on seeds[i], so a sim gets the same draws however sims
+    are batched, without constructing a generator per sim.
+    """
+    keys = _splitmix64(np.asarray(seeds, dtype=np.int64).astype(np.uint64))
+    counters = np.arange(num_draws, dtype=np.uint64)
+    return _splitmix64(keys[:, None] ^ _splitmix64(counters)[None, :])
+
+
+def seeded_integers(draws: np.ndarray, upper) -> np.ndarray:
+    """Map 64-bit draws to integers in [0, upper) (upper < 2**32, broadcast against draws)."""
+    upper = np.asarray(upper, dtype=np.uint64)
+    return (((draws >> np.uint64(32)) * upper) >> np.uint64(32)).astype(np.int64)
+
+
+def seeded_choice(draws: np.ndarray, distribution: dict) -> np.ndarray:
+    """Vectorised get_random_outcome over 64-bit draws; returns indexes into list(distribution)."""
+    cumulative = np.cumsum(np.asarray(list(distribution.values()), dtype=np.float64))
+    rolls = (draws >> np.uint64(11)).astype(np.float64) * (cumulative[-1] / 2.0**53)
+    return np.minimum(np.searchsorted(cumulative, rolls, side="right"), len(cumulative) - 1)
+
+
 def get_mean_std_median(dist: dict) -> tuple[float, float, float]:
     """Returns mean and standard deviation from an ordered win-distribution."""
     total = 0
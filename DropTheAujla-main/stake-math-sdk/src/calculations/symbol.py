@@ -1,5 +1,7 @@
 """Handle symbol classes and initial generation."""
 
+import numpy as np
+
 
 class SymbolDefinition:
     """Define symbol class object structure."""
@@ -132,9 +134,55 @@ class SymbolStorage:
                 paytable=paytable_by_symbol.get(name),
             )
 
+        # Integer encoding used by compact boards: code -> name, and a bitmask of
+        # the special_symbols keys each symbol belongs to
+        self.names = sorted(self.symbol_defs)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        self.special_bits = {prop: 1 << bit for bit, prop in enumerate(config.special_symbols)}
+        masks = [
+            sum(bit for prop, bit in self.special_bits.items() if name in config.special_symbols[prop])
+            for name in self.names
+        ]
+        # Trailing 0 so that empty cells (code -1) index a mask with no flags
+        self.special_masks = np.array(masks + [0], dtype=np.uint32)
+        self.definitions = [self.symbol_defs[name] for name in self.names]
+        self.special_keys = [
+            tuple(prop for prop in config.special_symbols if name in config.special_symbols[prop]) for name in self.names
+        ]
+
+    def encode(self, names: list) -> np.ndarray:
+        """Encode symbol names as int16 codes."""
+        try:
+            return np.array([self.codes[name] for name in names], dtype=np.int16)
+        except KeyError as err:
+            raise ValueError(f"Symbol '{err.args[0]}' is not registered") from err
+
+    def encode_board(self, board: list) -> np.ndarray:
+        """Encode a board of Symbols as a (reels, rows) int16 array, -1 below short reels."""
+        codes = np.full((len(board), max(len(reel) for reel in board)), -1, dtype=np.int16)
+        for reel, symbols in enumerate(board):
+            codes[reel, : len(symbols)] = [self.codes[sym.name] for sym in symbols]
+        return codes
+
     def create_symbol(self, name: str):
         """Create a new instance of symbol class."""
         try:
             return Symbol(self.symbol_defs[name])
         except KeyError:
             raise ValueError(f"Symbol '{name}' is not registered")
+
+
+def board_attribute_array(board: list, attribute: str) -> np.ndarray:
+    """Numeric attribute (e.g. multiplier) of every Symbol on a board as a (reels, rows) array; 0 where unset.
+
+    The array is integer unless a value is fractional, so wins built from it
+    keep the same JSON types as wins built from the Symbols.
+    """
+    values = [[0] * max(len(reel) for reel in board) for reel in board]
+    for reel, symbols in enumerate(board):
+        for row, sym in enumerate(symbols):
+            if sym.check_attribute(attribute):
+                value = getattr(sym, attribute, None)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[reel][row] = value
+    return np.array(values)
@@ -1,7 +1,8 @@
 """Ways wins executables/calculations."""
 
 from collections import defaultdict
-from src.calculations.symbol import Symbol
+import numpy as np
+from src.calculations.symbol import Symbol, SymbolStorage
 from src.config.config import Config
 from src.wins.multiplier_strategy import apply_mult
 from src.events.events import (
@@ -162,3 +163,181 @@ class Ways:
                     "gametype": gamestate.gametype,
                 }
             )
+
+
+class WaysEvaluatorNP:
+    """Ways.get_ways_data over batches of int-encoded boards.
+
+    Each symbol on reel 0 of a board gets a row of per-reel counts, and each
+    board gets per-reel wild counts and multiplier sums. A symbol's kind is its
+    run of leading reels holding the symbol or a wild, and its ways are the
+    product of per-reel counts over that run. Every Ways multiplier_strategy is
+    supported, and the board strategy keeps its running total across symbols.
+    Only paying symbols are expanded into win dictionaries, which match
+    Ways.get_ways_data. Wilds are the names in config.special_symbols[wild_key].
+    Symbol multipliers are passed as an array
+    (see board_attribute_array).
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        symbol_storage: SymbolStorage,
+        wild_key: str = "wild",
+        multiplier_key: str = "multiplier",
+    ):
+        self.config = config
+        self.names = symbol_storage.names
+        self.multiplier_key = multiplier_key
+
+        # Trailing entries stand for empty cells (code -1)
+        self.is_wild = np.array([name in config.special_symbols[wild_key] for name in self.names] + [False])
+        self.has_mult = np.array([multiplier_key in keys for keys in symbol_storage.special_keys] + [False])
+        max_kind = max(kind for kind, _ in config.paytable)
+        self.in_paytable = np.zeros((len(self.names), max_kind + 1), dtype=bool)
+        for kind, name in config.paytable:
+            if name in symbol_storage.codes:
+                self.in_paytable[symbol_storage.codes[name], kind] = True
+
+    def evaluate(
+        self,
+        codes: np.ndarray,
+        multipliers: np.ndarray = None,
+        global_multiplier: int = 1,
+        multiplier_strategy: str = "symbol",
+    ) -> dict:
+        """Ways wins for a batch of boards.
+
+        Args:
+            codes: (boards, reels, rows) symbol codes, -1 for empty cells.
+            multipliers: Optional (boards, reels, rows) symbol multiplier values.
+            global_multiplier: Used by the "global" strategy.
+            multiplier_strategy: "symbol", "board" or "global", as in Ways.get_ways_data.
+
+        Returns:
+            {board index: {"totalWin", "wins"}} for boards with at least one ways win.
+        """
+        assert multiplier_strategy in ["symbol", "board", "global"]
+        codes = np.asarray(codes)
+        num_reels = codes.shape[1]
+        mults = np.zeros(codes.shape, dtype=np.int64) if multipliers is None else np.asarray(multipliers)
+        has_mult = self.has_mult[codes] | (mults != 0)
+        wild = self.is_wild[codes]
+        bonus_mults = np.where(has_mult, mults * (mults > 1), 0)
+        weighted = np.where(has_mult, mults, 1)
+
+        # Per-board wild counts and multiplier sums, (boards, reels)
+        wild_counts = wild.sum(axis=2)
+        if multiplier_strategy == "global":
+            wild_mult_sums = np.zeros_like(wild_counts)
+        else:
+            wild_mult_sums = np.where(wild & has_mult, bonus_mults, 0).sum(axis=2)
+        reel_wild_counts = np.where(wild, weighted, 0).sum(axis=2) if multiplier_strategy == "symbol" else wild_counts
+
+        # Only symbols on reel 0 can win: one (board, symbol) pair per first row
+        # holding the symbol, in the order Ways.get_ways_data evaluates them
+        first_reel = codes[:, 0, :]
+        repeated = np.tril(first_reel[:, :, None] == first_reel[:, None, :], -1).any(axis=2)
+        boards, rows = np.nonzero(~repeated & (first_reel >= 0))
+        symbols = first_reel[boards, rows]
+
+        # (pairs, reels) symbol counts and per-reel totals
+        matches = codes[boards] == symbols[:, None, None]
+        sym_counts = matches.sum(axis=2)
+        if multiplier_strategy == "symbol":
+            reel_sym_counts = np.where(matches, weighted[boards], 0).sum(axis=2)
+        else:
+            reel_sym_counts = sym_counts
+        active = (sym_counts > 0) | (wild_counts[boards] > 0)
+        kinds = np.cumprod(active, axis=1).sum(axis=1)
+        in_run = np.arange(num_reels) < kinds[:, None]
+        reel_counts = reel_sym_counts + reel_wild_counts[boards]
+        ways = np.where(in_run, reel_counts, 1).prod(axis=1)
+        symbol_mults = np.where(in_run, wild_mult_sums[boards], 0).sum(axis=1)
+
+        if multiplier_strategy == "board":
+            # Board multipliers keep accumulating across the symbols of a board
+            sym_bonus = np.where(in_run, np.where(matches, bonus_mults[boards], 0).sum(axis=2), 0).sum(axis=1)
+            contributions = sym_bonus + symbol_mults
+            cumulative = np.cumsum(contributions)
+            group_start = np.searchsorted(boards, boards)
+            running = cumulative - (cumulative - contributions)[group_start]
+
+        max_kind = self.in_paytable.shape[1] - 1
+        paying = self.in_paytable[symbols, np.minimum(kinds, max_kind)] & (kinds <= max_kind)
+
+        paytable = self.config.paytable
+        wild_codes = set(np.flatnonzero(self.is_wild[:-1]).tolist())
+        results = {}
+        board_lists = {}
+        for pair in np.flatnonzero(paying).tolist():
+            board = int(boards[pair])
+            if board not in board_lists:
+                board_codes = codes[board].tolist()
+                board_mults = mults[board].tolist()
+                board_has_mult = has_mult[board].tolist()
+                wilds = []
+                for reel, column in enumerate(board_codes):
+                    wilds.append([])
+                    for row, code in enumerate(column):
+                        if code in wild_codes:
+                            wilds[reel].append({"reel": reel, "row": row})
+                            if board_has_mult[reel][row]:
+                                wilds[reel][-1][self.multiplier_key] = board_mults[reel][row]
+                board_lists[board] = (board_codes, wilds)
+            board_codes, wilds = board_lists[board]
+            symbol = int(symbols[pair])
+            name = self.names[symbol]
+            kind = int(kinds[pair])
+            symbol_ways = ways[pair].item()
+
+            positions = []
+            for reel in range(kind):
+                column = board_codes[reel]
+                positions += [{"reel": reel, "row": row} for row, code in enumerate(column) if code == symbol]
+                positions += wilds[reel]
+
+            match multiplier_strategy:
+                case "global":
+                    win_multiplier = global_multiplier
+                case "board":
+                    win_multiplier = max(running[pair].item(), 1)
+                case "symbol":
+                    win_multiplier = 1
+
+            win = round(paytable[kind, name] * symbol_ways, 2)
+            win_amt = round(win * win_multiplier, 2)
+            return_data = results.setdefault(board, {"totalWin": 0, "wins": []})
+            return_data["wins"] += [
+                {
+                    "symbol": name,
+                    "kind": kind,
+                    "win": win_amt,
+                    "positions": positions,
+                    "meta": {
+                        "ways": symbol_ways,
+                        "globalMult": win_multiplier,
+                        "winWithoutMult": win,
+                        "symbolMult": symbol_mults[pair].item(),
+                    },
+                }
+            ]
+            return_data["totalWin"] += win_amt
+
+        return results
+
+    def get_ways_data(
+        self,
+        board_codes: np.ndarray,
+        multipliers: np.ndarray = None,
+        global_multiplier: int = 1,
+        multiplier_strategy: str = "symbol",
+    ) -> dict:
+        """Ways wins for a single (reels, rows) board, in the Ways.get_ways_data format."""
+        results = self.evaluate(
+            np.asarray(board_codes)[None],
+            None if multipliers is None else np.asarray(multipliers)[None],
+            global_multiplier,
+            multiplier_strategy,
+        )
+        return results.get(0, {"totalWin": 0, "wins": []})
@@ -39,6 +39,13 @@ class Config:
         self.freegame_type = "freegame"
 
         self.include_padding = True
+        # Draw boards from int-encoded reelstrips (see Board.create_compact_board_reelstrips);
+        # Symbol objects are only built when gamestate.board is read
+        self.compact_board = False
+        # With compact_board, draw boards for this many sims at once from counter-based
+        # draws keyed on (sim, board within sim) instead of the `random` stream. Boards
+        # stay reproducible per sim but differ from the default draws
+        self.batch_board_size = None
 
         # Define the number of scatter-symbols required to award free-spins
         self.freespin_triggers = {}
@@ -49,6 +56,12 @@ class Config:
         self.padding_reels = {}  # symbol configuration displayed before the board reveal
 
         self.write_event_list = True
+        # If set, compressed books are re-written as zstd frames of this many books
+        # with a .idx sidecar for random access (see src/write_data/book_index.py)
+        self.book_index_frame_size = None
+        # Compressed temp books are merged by concatenating their zstd frames. Set to
+        # a thread count (-1 = all cores) to recompress them into one frame instead
+        self.book_recompress_threads = None
 
         self.bet_modes = []
         self.opt_params = {None: None}
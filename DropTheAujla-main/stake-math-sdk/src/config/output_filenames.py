@@ -142,7 +142,7 @@ class OutputFiles:
 
     def get_temp_force_name(self, betmode: str, thread_index: int, repeat_count: int):
         """Naming convention for temp force files."""
-        return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
+        return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.npz")
 
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
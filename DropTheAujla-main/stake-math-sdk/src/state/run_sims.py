@@ -2,14 +2,18 @@ import time
 import math
 import random
 import hashlib
-from multiprocessing import Process, Manager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
 import cProfile
+from copy import deepcopy
 from warnings import warn
 import shutil
 import asyncio
-from typing import Dict
+from typing import Dict, List
 
-from src.write_data.write_data import output_lookup_and_force_files
+import numpy as np
+
+from src.write_data.write_data import output_lookup_and_force_files, record_library_events, write_library_events
 
 
 def create_books(
@@ -149,7 +153,7 @@ def run_multi_process_sims(
     profiling: bool = False,
     set_sim_amount=False,
 ):
-    """Setup multiprocessing manager for running all game-mode simulations."""
+    """Assign criteria and seeds, then run all game-mode simulations on a persistent worker pool."""
     print("\nCreating books for", game_id, "in", betmode)
     num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
     sims_per_thread = int(num_sims / threads / num_repeats)
@@ -205,17 +209,14 @@ def run_multi_process_sims(
             criteria_counter[c] += 1
             simulation_seeds.append(offset_val)
 
-    for repeat in range(num_repeats):
-        print("Batch", repeat + 1, "of", num_repeats)
-        processes = []
-        manager = Manager()
-        all_betmode_configs = manager.list()
-        if profiling:
+    if profiling:
+        for repeat in range(num_repeats):
+            print("Batch", repeat + 1, "of", num_repeats)
             asyncio.run(
                 profile_and_visualize(
                     game_id=game_id,
                     gamestate=gamestate,
-                    all_betmode_configs=all_betmode_configs,
+                    all_betmode_configs=[],
                     betmode=betmode,
                     sim_allocation=criteria_assignment,
                     threads=threads,
@@ -227,45 +228,159 @@ def run_multi_process_sims(
                     simulation_seeds=simulation_seeds,
                 )
             )
-        elif threads == 1:
-            gamestate.run_sims(
-                betmode_copy_list=all_betmode_configs,
-                betmode=betmode,
-                sim_to_criteria=criteria_assignment,
-                total_threads=threads,
-                total_repeats=num_repeats,
-                num_sims=sims_per_thread,
-                thread_index=0,
-                repeat_count=repeat,
-                compress=compress,
-                write_event_list=write_event_list,
-                simulation_seeds=simulation_seeds,
-            )
-        else:
-            for thread in range(threads):
-                process = Process(
-                    target=gamestate.run_sims,
-                    args=(
-                        all_betmode_configs,
-                        betmode,
-                        criteria_assignment,
-                        threads,
-                        num_repeats,
-                        sims_per_thread,
-                        thread,
-                        repeat,
-                        compress,
-                        write_event_list,
-                        simulation_seeds,
-                    ),
-                )
-                print("Started thread", thread)
-                process.start()
-                processes += [process]
+        return
+
+    # Batches are (thread, repeat) pairs; each owns a fixed sim range and temp file names
+    batches = [
+        (betmode, threads, num_repeats, sims_per_thread, thread, repeat, compress)
+        for repeat in range(num_repeats)
+        for thread in range(threads)
+    ]
+    results = []
+    if threads == 1:
+        for batch in batches:
+            print("Batch", batch[5] + 1, "of", num_repeats)
+            results.append(_run_batch(gamestate, criteria_assignment, simulation_seeds, batch))
+    else:
+        results = run_batch_pool(gamestate, criteria_assignment, simulation_seeds, batches, threads)
+        gamestate.combine([bet_modes for _, _, bet_modes, _ in results], betmode)
+        gamestate.get_betmode(betmode).lock_force_keys()
+
+    if write_event_list:
+        event_items = {}
+        for _, _, _, library_events in sorted(results, key=lambda result: (result[1], result[0])):
+            record_library_events(event_items, library_events.values())
+        write_library_events(gamestate, [], betmode, event_items)
+
+
+class SharedSimulationPlan:
+    """Criteria and seeds for every sim of a betmode, held in shared memory.
+
+    Criteria are stored as int32 codes into `criteria_names`. Workers attach by
+    name, so the plan is copied once rather than pickled into every batch.
+    """
+
+    def __init__(self, criteria_assignment: List[str], simulation_seeds: List[int]):
+        self.criteria_names = sorted(set(criteria_assignment))
+        codes = {name: code for code, name in enumerate(self.criteria_names)}
+        self.length = len(criteria_assignment)
+        self._criteria_shm, criteria = _shared_array(self.length, np.int32)
+        self._seeds_shm, seeds = _shared_array(len(simulation_seeds), np.int64)
+        criteria[:] = [codes[name] for name in criteria_assignment]
+        seeds[:] = simulation_seeds
+        self.spec = (
+            self._criteria_shm.name,
+            self.length,
+            self._seeds_shm.name,
+            len(simulation_seeds),
+            self.criteria_names,
+        )
+
+    def close(self) -> None:
+        for shm in (self._criteria_shm, self._seeds_shm):
+            shm.close()
+            shm.unlink()
+
+
+class _CriteriaView:
+    """Sequence of criteria names over shared int32 codes."""
+
+    def __init__(self, codes: np.ndarray, names: List[str]):
+        self._codes = codes
+        self._names = names
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, sim: int) -> str:
+        return self._names[self._codes[sim]]
+
+
+class _SeedView:
+    """Sequence of python-int seeds over a shared int64 array (random.seed rejects numpy ints)."""
+
+    def __init__(self, seeds: np.ndarray):
+        self._seeds = seeds
+
+    def __len__(self) -> int:
+        return len(self._seeds)
+
+    def __getitem__(self, sim: int) -> int:
+        return int(self._seeds[sim])
+
+
+def _shared_array(length: int, dtype, name: str = None):
+    """Create (or attach to, given name) a shared 1-d array."""
+    size = max(length * np.dtype(dtype).itemsize, 1)
+    shm = SharedMemory(name=name, create=name is None, size=size)
+    return shm, np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+
+
+_worker = {}
+
+
+def _init_batch_worker(gamestate: object, spec: tuple) -> None:
+    """Pool initializer: keep the initial gamestate and attach the shared plan."""
+    criteria_name, criteria_length, seeds_name, seeds_length, criteria_names = spec
+    criteria_shm, criteria = _shared_array(criteria_length, np.int32, criteria_name)
+    seeds_shm, seeds = _shared_array(seeds_length, np.int64, seeds_name)
+    _worker["gamestate"] = gamestate
+    _worker["shm"] = (criteria_shm, seeds_shm)
+    _worker["criteria"] = _CriteriaView(criteria, criteria_names)
+    _worker["seeds"] = _SeedView(seeds)
+
+
+def _run_pooled_batch(batch: tuple):
+    # Every batch starts from the betmode's initial gamestate, as a freshly started process would
+    gamestate = deepcopy(_worker["gamestate"])
+    return _run_batch(gamestate, _worker["criteria"], _worker["seeds"], batch)
+
+
+def _run_batch(gamestate: object, criteria, seeds, batch: tuple):
+    """Run one (thread, repeat) batch; books, LUTs and force records go to its temp files."""
+    betmode, threads, num_repeats, sims_per_thread, thread, repeat, compress = batch
+    bet_modes = []
+    gamestate.run_sims(
+        betmode_copy_list=bet_modes,
+        betmode=betmode,
+        sim_to_criteria=criteria,
+        total_threads=threads,
+        total_repeats=num_repeats,
+        num_sims=sims_per_thread,
+        thread_index=thread,
+        repeat_count=repeat,
+        compress=compress,
+        write_event_list=False,
+        simulation_seeds=seeds,
+    )
+    return thread, repeat, bet_modes[0], gamestate.library_events
+
+
+def run_batch_pool(
+    gamestate: object,
+    criteria_assignment: List[str],
+    simulation_seeds: List[int],
+    batches: List[tuple],
+    threads: int,
+) -> list:
+    """Run batches on a pool of `threads` persistent workers.
+
+    The pool and shared plan are set up once per betmode; idle workers pull the
+    next batch, so uneven batches do not leave cores waiting.
+    """
+    plan = SharedSimulationPlan(criteria_assignment, simulation_seeds)
+    results = []
+    try:
+        # A worker that dies hard breaks the pool: pending futures raise BrokenProcessPool
+        pool = ProcessPoolExecutor(max_workers=threads, initializer=_init_batch_worker, initargs=(gamestate, plan.spec))
+        try:
             print("All threads are online.")
-            for process in processes:
-                process.join()
-            print("Finished joining threads.")
-            gamestate.combine(all_betmode_configs, betmode)
-            gamestate.get_betmode(betmode).lock_force_keys()
-            manager.shutdown()
+            futures = [pool.submit(_run_pooled_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(f"Finished batch {len(results)} of {len(batches)}")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        plan.close()
+    return results
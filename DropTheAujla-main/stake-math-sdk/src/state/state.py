@@ -1,3 +1,4 @@
+from array import array
 from copy import copy, deepcopy
 from abc import ABC, abstractmethod
 from warnings import warn
@@ -11,9 +12,10 @@ from src.state.books import Book
 from src.write_data.write_data import (
     print_recorded_wins,
     make_lookup_tables,
-    write_json,
     make_lookup_pay_split,
     write_library_events,
+    record_library_events,
+    BookWriter,
 )
 
 
@@ -25,7 +27,10 @@ class GeneralGameState(ABC):
         self.output_files = OutputFiles(self.config)
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type, config.wincap)
         self.library = {}
+        self.library_events = {}
+        self.book_writer = None
         self.recorded_events = {}
+        self.interned_descriptions = {}
         self.special_symbol_functions = {}
         self.temp_wins = []
         self.create_symbol_map()
@@ -141,10 +146,9 @@ class GeneralGameState(ABC):
         Freespin triggers are most commonly used, i.e {"kind": X, "symbol": "S", "gametype": "basegame"}
         It is recommended to otherwise record rare events with several keys in order to reduce the overall file-size containing many duplicate ids
         """
-        dstr = {}
-        for k, v in description.items():
-            dstr[str(k)] = str(v)
-        self.temp_wins.append(dstr)
+        key = tuple(sorted((str(k), str(v)) for k, v in description.items()))
+        # Intern descriptions so every record of the same event shares one tuple
+        self.temp_wins.append(self.interned_descriptions.setdefault(key, key))
         self.temp_wins.append(self.book_id)
 
     def check_force_keys(self, description) -> None:
@@ -167,22 +171,28 @@ class GeneralGameState(ABC):
 
     def imprint_wins(self) -> None:
         """Record all events to library if criteria conditions are satisfied."""
-        for temp_win_index in range(int(len(self.temp_wins) / 2)):
-            description = tuple(sorted(self.temp_wins[2 * temp_win_index].items()))
-            book_id = self.temp_wins[2 * temp_win_index + 1]
-            if description in self.recorded_events and (
-                book_id not in self.recorded_events[description]["bookIds"]
-            ):
-                self.recorded_events[description]["timesTriggered"] += 1
-                self.recorded_events[description]["bookIds"] += [book_id]
-            elif description not in self.recorded_events:
+        for temp_win_index in range(0, len(self.temp_wins), 2):
+            description = self.temp_wins[temp_win_index]
+            book_id = self.temp_wins[temp_win_index + 1]
+            recorded = self.recorded_events.get(description)
+            if recorded is None:
                 self.check_force_keys(description)
                 self.recorded_events[description] = {
                     "timesTriggered": 1,
-                    "bookIds": [book_id],
+                    "bookIds": array("I", [book_id]),
                 }
+            elif recorded["bookIds"][-1] != book_id:
+                # Book ids only increase within a batch, so the last id is the only possible duplicate
+                recorded["timesTriggered"] += 1
+                recorded["bookIds"].append(book_id)
         self.temp_wins = []
-        self.library[self.sim + 1] = copy(self.book.to_json())
+        book_json = self.book.to_json()
+        if self.book_writer is not None:
+            # Book is on disk; keep only the fields lookup tables need
+            self.book_writer.write(book_json)
+            record_library_events(self.library_events, book_json["events"])
+            book_json = {key: value for key, value in book_json.items() if key != "events"}
+        self.library[self.sim + 1] = copy(book_json)
         self.win_manager.update_end_round_wins()
 
     def update_final_win(self) -> None:
@@ -255,15 +265,25 @@ class GeneralGameState(ABC):
 
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type, mode_max_win)
         self.library = {}
+        self.library_events = {}
         self.recorded_events = {}
+        self.interned_descriptions = {}
         self.betmode = betmode
         self.num_sims = num_sims
-        for sim in range(
-            thread_index * num_sims + (total_threads * num_sims) * repeat_count,
-            (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
-        ):
-            self.criteria = sim_to_criteria[sim]
-            self.run_spin(sim, simulation_seeds[sim])
+        self.book_writer = BookWriter(
+            self.output_files.get_temp_multi_thread_name(betmode, thread_index, repeat_count, compress),
+            regular_json=self.config.output_regular_json,
+        )
+        try:
+            for sim in range(
+                thread_index * num_sims + (total_threads * num_sims) * repeat_count,
+                (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
+            ):
+                self.criteria = sim_to_criteria[sim]
+                self.run_spin(sim, simulation_seeds[sim])
+        finally:
+            self.book_writer.close()
+            self.book_writer = None
         mode_cost = self.get_current_betmode().get_cost()
 
         print(
@@ -275,16 +295,10 @@ class GeneralGameState(ABC):
             flush=True,
         )
 
-        write_json(
-            self,
-            self.output_files.get_temp_multi_thread_name(
-                betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
-            ),
-        )
         print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
         make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
         make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
 
         if write_event_list:
-            write_library_events(self, list(self.library.values()), betmode)
+            write_library_events(self, [], betmode, self.library_events)
         betmode_copy_list.append(self.config.bet_modes)
@@ -31,13 +31,19 @@ def apply_global_mult(win_amount: float, global_multiplier: int) -> tuple:
 
 def apply_added_symbol_mult(board: Board, win_amount: float, positions: List[Dict], multiplier_key: str) -> tuple:
     """Get multiplier attribute from all winning positions"""
-    symbol_multiplier = 0
+    multiplier_values = []
     for pos in positions:
-        if (
-            board[pos["reel"]][pos["row"]].check_attribute(multiplier_key)
-            and board[pos["reel"]][pos["row"]].get_attribute(multiplier_key) > 1
-        ):
-            symbol_multiplier += board[pos["reel"]][pos["row"]].get_attribute(multiplier_key)
+        if board[pos["reel"]][pos["row"]].check_attribute(multiplier_key):
+            multiplier_values.append(board[pos["reel"]][pos["row"]].get_attribute(multiplier_key))
+    return apply_symbol_mult_values(win_amount, multiplier_values)
+
+
+def apply_symbol_mult_values(win_amount: float, multiplier_values: list) -> tuple:
+    """Add up symbol multipliers above 1 taken from the winning positions"""
+    symbol_multiplier = 0
+    for value in multiplier_values:
+        if value > 1:
+            symbol_multiplier += value
     return (round(win_amount * max(symbol_multiplier, 1), 2), max(symbol_multiplier, 1))
 
 
@@ -47,3 +53,21 @@ def apply_combined_mult(
     """Apply symbol multipliers and then global multiplier"""
     win, sym_mult = apply_added_symbol_mult(board, win_amount, positions, multiplier_key)
     return (win * global_multiplier  , sym_mult * global_multiplier)
+
+
+def apply_mult_values(
+    strategy: str,
+    win_amount: float = 0.0,
+    global_multiplier: int = 1,
+    multiplier_values: list = None,
+):
+    """apply_mult from the multiplier values at the winning positions instead of a board."""
+    if multiplier_values is None:
+        multiplier_values = ()
+    win, sym_mult = apply_symbol_mult_values(win_amount, multiplier_values)
+    strat = {
+        "global": apply_global_mult(win_amount, global_multiplier),
+        "symbol": (win, sym_mult),
+        "combined": (win * global_multiplier, sym_mult * global_multiplier),
+    }
+    return strat[strategy]
@@ -0,0 +1,251 @@
+"""Random-access index for compressed simulation books.
+
+Books are rewritten as a sequence of independent zstd frames holding
+`frame_books` books each. The result is still a valid multi-frame .jsonl.zst
+file, so sequential readers (with read_across_frames) see the same lines.
+A binary sidecar `<books>.idx` maps book id -> (frame, offset in frame):
+
+    header   : BookIndexHeader (magic, version, frame_books, counts, books file size,
+               CRC32 of the final frame) - readers refuse a books file it does not match
+    frames   : num_frames x (file offset u64, compressed size u32, decompressed size u32)
+    books    : num_books  x (book id i64, frame u32, offset in frame u32), sorted by id
+
+Readers memory-map the sidecar and the books file and decompress a single
+frame per lookup.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import zstandard as zstd
+
+INDEX_MAGIC = b"BKIX"
+INDEX_VERSION = 2
+DEFAULT_FRAME_BOOKS = 256
+
+# magic, version, frame_books, num_frames, num_books, books_size, tail_crc
+HEADER = struct.Struct("<4sIIQQQI")
+FRAME_DTYPE = np.dtype([("offset", "<u8"), ("compressed", "<u4"), ("size", "<u4")])
+BOOK_DTYPE = np.dtype([("id", "<i8"), ("frame", "<u4"), ("offset", "<u4")])
+
+
+def index_path_for(books_path: str) -> str:
+    """Sidecar index name for a books file."""
+    return books_path + ".idx"
+
+
+def iter_book_lines(books_path: str, chunk_size: int = 1 << 20):
+    """Yield non-empty newline-terminated book lines from a .jsonl or .jsonl.zst file."""
+    with open(books_path, "rb") as f:
+        reader = f
+        if books_path.endswith(".zst"):
+            reader = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        pending = b""
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield line + b"\n"
+        if pending.strip():
+            yield pending + b"\n"
+
+
+def write_indexed_books(
+    books_path: str,
+    output_path: str = None,
+    frame_books: int = DEFAULT_FRAME_BOOKS,
+    level: int = 3,
+) -> str:
+    """Rewrite books as frames of `frame_books` books and write the sidecar index.
+
+    Args:
+        books_path: Existing books file (.jsonl or .jsonl.zst).
+        output_path: Framed .jsonl.zst to write; defaults to replacing books_path
+            (a .jsonl input is written alongside as .jsonl.zst).
+        frame_books: Books per zstd frame; smaller frames mean cheaper lookups,
+            larger frames compress better.
+        level: zstd compression level.
+
+    Returns:
+        Path of the framed books file.
+    """
+    if output_path is None:
+        output_path = books_path if books_path.endswith(".zst") else books_path + ".zst"
+    # Per-process temp names: concurrent builders each publish a complete file via os.replace
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    compressor = zstd.ZstdCompressor(level=level)
+
+    frames = []
+    tail = [b""]
+    book_ids = []
+    book_frames = []
+    book_offsets = []
+
+    def flush(lines, out):
+        data = b"".join(lines)
+        compressed = compressor.compress(data)
+        frames.append((out.tell(), len(compressed), len(data)))
+        out.write(compressed)
+        tail[0] = compressed
+
+    with open(temp_path, "wb") as out:
+        lines = []
+        position = 0
+        for line in iter_book_lines(books_path):
+            book_ids.append(json.loads(line)["id"])
+            book_frames.append(len(frames))
+            book_offsets.append(position)
+            lines.append(line)
+            position += len(line)
+            if len(lines) == frame_books:
+                flush(lines, out)
+                lines = []
+                position = 0
+        if lines:
+            flush(lines, out)
+        books_size = out.tell()
+
+    book_table = np.empty(len(book_ids), dtype=BOOK_DTYPE)
+    book_table["id"] = book_ids
+    book_table["frame"] = book_frames
+    book_table["offset"] = book_offsets
+    book_table = book_table[np.argsort(book_table["id"], kind="stable")]
+    frame_table = np.array(frames, dtype=FRAME_DTYPE)
+
+    index_temp = f"{index_path_for(output_path)}.{os.getpid()}.tmp"
+    with open(index_temp, "wb") as f:
+        f.write(HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, frame_books, len(frame_table), len(book_table), books_size, zlib.crc32(tail[0])
+        ))
+        f.write(frame_table.tobytes())
+        f.write(book_table.tobytes())
+
+    # Two renames are not one atomic step: a reader between them sees a new index with
+    # the old books (or the reverse) and is refused by the header check in BookIndexReader.
+    os.replace(temp_path, output_path)
+    os.replace(index_temp, index_path_for(output_path))
+    return output_path
+
+
+class BookIndexReader:
+    """Fetch individual books from a framed books file without full decompression."""
+
+    def __init__(self, books_path: str, cache_frames: int = 8):
+        """Memory-map the books file and its sidecar index.
+
+        Args:
+            books_path: Framed books file written by write_indexed_books.
+            cache_frames: Number of decompressed frames kept for neighbouring lookups.
+
+        Raises:
+            ValueError: The sidecar is not a current index or was built for another books file.
+        """
+        self.books_path = books_path
+        self._books_file = open(books_path, "rb")
+        self._index_file = open(index_path_for(books_path), "rb")
+        self._books = mmap.mmap(self._books_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._index) < HEADER.size or self._index[:4] != INDEX_MAGIC:
+                raise ValueError(f"Not a book index: {index_path_for(books_path)}")
+            magic, version, self.frame_books, num_frames, num_books, books_size, tail_crc = HEADER.unpack_from(
+                self._index, 0
+            )
+            if version != INDEX_VERSION:
+                raise ValueError(f"Book index version {version}, expected {INDEX_VERSION}: {index_path_for(books_path)}")
+
+            frames_start = HEADER.size
+            books_start = frames_start + num_frames * FRAME_DTYPE.itemsize
+            self.frames = np.frombuffer(self._index, dtype=FRAME_DTYPE, count=num_frames, offset=frames_start)
+            self.books = np.frombuffer(self._index, dtype=BOOK_DTYPE, count=num_books, offset=books_start)
+            tail = b""
+            if num_frames:
+                offset, compressed, _ = self.frames[-1].tolist()
+                tail = self._books[offset : offset + compressed]
+            if len(self._books) != books_size or zlib.crc32(tail) != tail_crc:
+                raise ValueError(f"Book index does not match {books_path}")
+        except ValueError:
+            self.frames = self.books = None
+            self._close_files()
+            raise
+        self._ids = self.books["id"]
+        self.num_books = int(num_books)
+        self.first_id = int(self._ids[0]) if num_books else 0
+        self.contiguous = bool(num_books and int(self._ids[-1]) - self.first_id == num_books - 1)
+
+        self._decompressor = zstd.ZstdDecompressor()
+        self._cache = OrderedDict()
+        self._cache_frames = cache_frames
+
+    def __len__(self) -> int:
+        return self.num_books
+
+    def __contains__(self, book_id: int) -> bool:
+        return self._locate(book_id) is not None
+
+    def _locate(self, book_id: int):
+        if self.contiguous:
+            position = book_id - self.first_id
+            if not 0 <= position < self.num_books:
+                return None
+        else:
+            position = int(np.searchsorted(self._ids, book_id))
+            if position >= self.num_books or int(self._ids[position]) != book_id:
+                return None
+        entry = self.books[position]
+        return int(entry["frame"]), int(entry["offset"])
+
+    def frame(self, frame_index: int) -> bytes:
+        """Decompressed contents of one frame (LRU cached)."""
+        data = self._cache.get(frame_index)
+        if data is not None:
+            self._cache.move_to_end(frame_index)
+            return data
+        offset, compressed, size = self.frames[frame_index].tolist()
+        data = self._decompressor.decompress(self._books[offset : offset + compressed], max_output_size=size)
+        self._cache[frame_index] = data
+        if len(self._cache) > self._cache_frames:
+            self._cache.popitem(last=False)
+        return data
+
+    def get_raw(self, book_id: int) -> bytes:
+        """JSON line of a book, without decoding."""
+        location = self._locate(book_id)
+        if location is None:
+            raise KeyError(book_id)
+        frame_index, offset = location
+        data = self.frame(frame_index)
+        end = data.find(b"\n", offset)
+        return data[offset : end if end != -1 else len(data)]
+
+    def get(self, book_id: int) -> dict:
+        """Decoded book."""
+        return json.loads(self.get_raw(book_id))
+
+    def _close_files(self) -> None:
+        self._books.close()
+        self._index.close()
+        self._books_file.close()
+        self._index_file.close()
+
+    def close(self) -> None:
+        self.frames = self.books = self._ids = None
+        self._cache.clear()
+        self._close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
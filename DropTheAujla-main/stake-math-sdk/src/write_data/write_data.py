@@ -6,8 +6,9 @@ import shutil
 import os
 import hashlib
 import json
-import ast
+import numpy as np
 import zstandard as zstd
+from src.write_data.book_index import write_indexed_books
 
 
 def get_sha_256(file_to_hash: str):
@@ -103,18 +104,20 @@ def make_lookup_pay_split(gamestate: object, name: str):
     file.close()
 
 
-def write_library_events(gamestate: object, library: list, gametype: str):
+def record_library_events(event_items: dict, events: list) -> None:
+    """Keep the first example of each event type seen in a book."""
+    for instance in events:
+        lib_event = instance["type"]
+        if lib_event not in event_items:
+            event_items[lib_event] = {key: instance[key] for key in instance if key != "index"}
+
+
+def write_library_events(gamestate: object, library: list, gametype: str, event_items: dict = None):
     """Write all unique events within a given mode - with one example application."""
-    unique_event = []
-    event_items = {}
-    for event in library:
-        for instance in event["events"]:
-            lib_event = instance["type"]
-            if lib_event not in unique_event:
-                unique_event.append(lib_event)
-                item_keys = instance.keys()
-                dict_details = {key: instance[key] for key in item_keys if key != "index"}
-                event_items[lib_event] = dict_details
+    if event_items is None:
+        event_items = {}
+        for event in library:
+            record_library_events(event_items, event["events"])
     json_object = json.dumps(event_items, indent=4)
     with open(
         os.path.join(gamestate.output_files.config_path, f"event_config_{gametype}.json"),
@@ -144,18 +147,24 @@ def output_lookup_and_force_files(
             )
 
     if compress:
-        temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
-        with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
-            for fname in file_list:
-                with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
-                    outfile.write(decompressed.decode("UTF-8"))
-
         final_out = gamestate.output_files.get_final_book_name(betmode, True)
-        with open(temp_book_output_path, "rb") as f_in, open(final_out, "wb") as f_out:
-            f_out.write(zstd.ZstdCompressor().compress(f_in.read()))
-
-        os.remove(temp_book_output_path)
+        recompress_threads = getattr(gamestate.config, "book_recompress_threads", None)
+        with open(final_out, "wb") as f_out:
+            if recompress_threads:
+                compressor = zstd.ZstdCompressor(threads=recompress_threads)
+                with compressor.stream_writer(f_out, closefd=False) as writer:
+                    for fname in file_list:
+                        with open(fname, "rb") as infile:
+                            zstd.ZstdDecompressor().copy_stream(infile, writer)
+            else:
+                # A sequence of zstd frames is itself a valid zstd file
+                for fname in file_list:
+                    with open(fname, "rb") as infile:
+                        shutil.copyfileobj(infile, f_out)
+
+        frame_books = getattr(gamestate.config, "book_index_frame_size", None)
+        if frame_books:
+            write_indexed_books(final_out, frame_books=frame_books)
     else:
         with open(
             gamestate.output_files.get_final_book_name(betmode, False),
@@ -187,13 +196,18 @@ def output_lookup_and_force_files(
             )
 
     for filename in file_list:
-        force_chunk = ast.literal_eval(json.load(open(filename, "r", encoding="UTF-8")))
+        force_chunk = read_recorded_wins(filename)
         for key in force_chunk:
             if force_results_dict.get(key) is not None:
                 force_results_dict[key]["timesTriggered"] += force_chunk[key]["timesTriggered"]
-                force_results_dict[key]["bookIds"] += force_chunk[key]["bookIds"]
+                force_results_dict[key]["bookIds"].append(force_chunk[key]["bookIds"])
             else:
-                force_results_dict[key] = force_chunk[key]
+                force_results_dict[key] = {
+                    "timesTriggered": force_chunk[key]["timesTriggered"],
+                    "bookIds": [force_chunk[key]["bookIds"]],
+                }
+    for key in force_results_dict:
+        force_results_dict[key]["bookIds"] = np.concatenate(force_results_dict[key]["bookIds"]).tolist()
 
     force_results_dict_just_for_rob = []
     for force_combination in force_results_dict:
@@ -261,28 +275,85 @@ def output_lookup_and_force_files(
                 outfile.write(infile.read())
 
 
+class BookWriter:
+    """Stream books to a temp file as they are imprinted.
+
+    .zst files go through a zstd stream_writer, so only the compressor window is
+    held in memory rather than the whole batch. Plain files are written as JSONL,
+    or as a single JSON array when regular_json is set.
+    """
+
+    def __init__(self, filename: str, regular_json: bool = False, level: int = 3):
+        self.filename = filename
+        self.regular_json = regular_json and not filename.endswith(".zst")
+        self.count = 0
+        self._file = open(filename, "wb")
+        if filename.endswith(".zst"):
+            self._stream = zstd.ZstdCompressor(level=level).stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+        if self.regular_json:
+            self._stream.write(b"[")
+
+    def write(self, book: dict) -> None:
+        """Append one book."""
+        data = json.dumps(book).encode("UTF-8")
+        if self.regular_json:
+            self._stream.write(data if self.count == 0 else b", " + data)
+        else:
+            self._stream.write(data + b"\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the zstd frame (or JSON array) and close the file."""
+        if self._file.closed:
+            return
+        if self.regular_json:
+            self._stream.write(b"]")
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def write_json(gamestate, filename: str):
-    """Convert the list of dictionaries to a JSON-encoded string and compress it in chunks."""
-    json_objects = [json.dumps(item) for item in gamestate.library.values()]
-    combined_data = "\n".join(json_objects) + "\n"
-
-    if filename.endswith(".zst"):
-        compressor = zstd.ZstdCompressor()
-        compressed_data = compressor.compress(combined_data.encode("UTF-8"))
-        with open(filename, "wb") as f:
-            f.write(compressed_data)
-    else:
-        with open(filename, "w", encoding="UTF-8") as f:
-            if not (gamestate.config.output_regular_json):
-                f.write(combined_data)
-            else:
-                j_regular = [item for item in gamestate.library.values()]
-                f.write(json.dumps(j_regular))
+    """Stream every book in the gamestate library to filename."""
+    with BookWriter(filename, regular_json=gamestate.config.output_regular_json) as writer:
+        for item in gamestate.library.values():
+            writer.write(item)
 
 
 def print_recorded_wins(gamestate: object, name: str = ""):
-    """Temporary file generation for wins/recorded results."""
-    json_object = json.dumps(str(gamestate.recorded_events), indent=4)
-    file = open(name, "w", encoding="UTF-8")
-    file.write(json_object)
-    file.close()
+    """Temporary file generation for wins/recorded results.
+
+    Written as an .npz: the description keys once as JSON, with per-key trigger
+    counts and all bookIds concatenated into one uint32 array.
+    """
+    descriptions = list(gamestate.recorded_events.keys())
+    records = [gamestate.recorded_events[description] for description in descriptions]
+    book_ids = [np.asarray(record["bookIds"], dtype=np.uint32) for record in records]
+    with open(name, "wb") as f:
+        np.savez(
+            f,
+            descriptions=np.array(json.dumps([list(map(list, description)) for description in descriptions])),
+            times_triggered=np.array([record["timesTriggered"] for record in records], dtype=np.int64),
+            lengths=np.array([len(ids) for ids in book_ids], dtype=np.int64),
+            book_ids=np.concatenate(book_ids) if book_ids else np.empty(0, dtype=np.uint32),
+        )
+
+
+def read_recorded_wins(name: str) -> dict:
+    """Load a temp force file as {description: {"timesTriggered": int, "bookIds": uint32 array}}."""
+    with np.load(name, allow_pickle=False) as data:
+        descriptions = json.loads(str(data["descriptions"]))
+        times_triggered = data["times_triggered"].tolist()
+        book_ids = np.split(data["book_ids"], np.cumsum(data["lengths"])[:-1]) if descriptions else []
+    return {
+        tuple(tuple(pair) for pair in description): {"timesTriggered": times, "bookIds": ids}
+        for description, times, ids in zip(descriptions, times_triggered, book_ids)
+    }
@@ -0,0 +1,53 @@
+from src.calculations.board import Board
+
+
+class GameBoardConfig:
+    """Small uneven board with two reelstrips."""
+
+    def __init__(self):
+        self.game_id = "0_test_board"
+        self.num_reels = 3
+        self.num_rows = [3, 2, 4]
+        self.paytable = {(3, "H1"): 10, (3, "L1"): 2, (3, "W"): 20}
+        self.special_symbols = {"wild": ["W"], "scatter": ["S"], "multiplier": ["W"]}
+        self.reels = {
+            "BR0": [["H1", "L1", "W", "S", "L1"], ["S", "H1", "L1"], ["L1", "L1", "H1", "W", "S", "H1"]],
+            "BR1": [["W", "H1", "H1"], ["L1", "S", "W", "H1"], ["H1", "S", "L1", "L1"]],
+        }
+        self.reel_weights = {"BR0": 1, "BR1": 3}
+        self.include_padding = True
+        self.compact_board = True
+        self.batch_board_size = None
+        self.anticipation_triggers = {"basegame": 2, "freegame": 2}
+        self.basegame_type = "basegame"
+        self.freegame_type = "freegame"
+
+
+class BoardTest(Board):
+    """Board with the gamestate plumbing it needs stubbed out."""
+
+    def __init__(self, config):
+        self.config = config
+        self.create_symbol_map()
+        self.assign_special_sym_function()
+        self.gametype = config.basegame_type
+        self.sim = 0
+
+    def assign_special_sym_function(self):
+        self.special_symbol_functions = {"W": [self.assign_mult_property]}
+
+    def assign_mult_property(self, symbol) -> dict:
+        symbol.assign_attribute({"multiplier": 2})
+
+    def get_current_distribution_conditions(self) -> dict:
+        return {"reel_weights": {self.config.basegame_type: self.config.reel_weights}}
+
+    def run_spin(self, sim, simulation_seed=None):
+        pass
+
+    def run_freespin(self):
+        pass
+
+
+def board_names(board) -> list:
+    return [[sym.name for sym in reel] for reel in board]
@@ -0,0 +1,97 @@
+"""Test counter-based draws and batched boards."""
+
+import numpy as np
+from src.calculations.board import BOARD_SEED_STRIDE
+from src.calculations.statistics import seeded_choice, seeded_draws, seeded_integers
+from tests.board.board_test_config import BoardTest, GameBoardConfig, board_names
+
+
+def test_draws_depend_only_on_seed():
+    seeds = np.arange(1000, 2000)
+    draws = seeded_draws(seeds, 6)
+    assert draws.shape == (1000, 6)
+    assert (seeded_draws(seeds[500:510], 6) == draws[500:510]).all()
+    assert (seeded_draws([1500], 6)[0] == draws[500]).all()
+    assert len(np.unique(draws)) == draws.size
+
+
+def test_integers_cover_each_reel_range():
+    lengths = np.array([3, 70, 5])
+    stops = seeded_integers(seeded_draws(np.arange(30000), 3), lengths)
+    assert (stops.min(axis=0) == 0).all()
+    assert (stops.max(axis=0) == lengths - 1).all()
+    counts = np.bincount(stops[:, 0])
+    assert np.allclose(counts / counts.sum(), 1 / 3, atol=0.02)
+
+
+def test_choice_follows_weights():
+    choices = seeded_choice(seeded_draws(np.arange(40000), 1)[:, 0], {"BR0": 1, "BR1": 3})
+    assert set(choices.tolist()) == {0, 1}
+    assert abs(choices.mean() - 0.75) < 0.02
+
+
+def batch_state():
+    gamestate = BoardTest(GameBoardConfig())
+    return gamestate, gamestate.draw_board_batch(np.arange(2000))
+
+
+def test_batch_shapes_and_uneven_reels():
+    gamestate, batch = batch_state()
+    assert batch.positions.shape == (2000, 3)
+    assert batch.codes.shape == (2000, 3, 4)
+    assert len(batch.reelstrip_ids) == 2000
+    assert (batch.codes[:, 0, 3:] == -1).all() and (batch.codes[:, 1, 2:] == -1).all()
+    assert (batch.codes[:, 2] >= 0).all()
+
+
+def test_batch_boards_come_from_chosen_reelstrip():
+    gamestate, batch = batch_state()
+    reels = gamestate.config.reels
+    assert set(batch.reelstrip_ids) == {"BR0", "BR1"}
+    assert abs(batch.reelstrip_ids.count("BR1") / 2000 - 0.75) < 0.05
+    for index in range(0, 2000, 37):
+        reelstrip = reels[batch.reelstrip_ids[index]]
+        for reel, stop in enumerate(batch.positions[index].tolist()):
+            assert 0 <= stop < len(reelstrip[reel])
+            expected = [
+                reelstrip[reel][(stop + row) % len(reelstrip[reel])] for row in range(gamestate.config.num_rows[reel])
+            ]
+            names = [gamestate.symbol_storage.names[code] for code in batch.codes[index, reel].tolist() if code >= 0]
+            assert names == expected
+
+
+def test_set_board_from_batch_matches_compact_board():
+    gamestate, batch = batch_state()
+    compact = BoardTest(GameBoardConfig())
+    for index in range(0, 2000, 53):
+        gamestate.set_board_from_batch(batch, index)
+        compact.set_compact_board(batch.reelstrip_ids[index], batch.positions[index].tolist())
+        assert (gamestate.get_board_codes() == batch.codes[index]).all()
+        assert board_names(gamestate.board) == board_names(compact.board)
+        assert [sym.name for sym in gamestate.top_symbols] == [sym.name for sym in compact.top_symbols]
+        assert gamestate.special_syms_on_board == compact.special_syms_on_board
+        assert gamestate.anticipation == compact.anticipation
+        assert gamestate.reelstrip_id == batch.reelstrip_ids[index]
+
+
+def draw_sims(batch_size: int, sims) -> dict:
+    gamestate = BoardTest(GameBoardConfig())
+    gamestate.config.batch_board_size = batch_size
+    boards = {}
+    for sim in sims:
+        gamestate.reset_seed(sim)
+        for draw in range(2):
+            gamestate.create_board_reelstrips()
+            boards[(sim, draw)] = (gamestate.reelstrip_id, board_names(gamestate.board))
+    return boards
+
+
+def test_batched_sim_boards_depend_only_on_sim():
+    boards = draw_sims(64, range(100))
+    assert draw_sims(7, reversed(range(100))) == boards
+    assert boards[(5, 0)] != boards[(5, 1)]
+
+    gamestate = BoardTest(GameBoardConfig())
+    first = gamestate.draw_board_batch([42 * BOARD_SEED_STRIDE])
+    gamestate.set_board_from_batch(first, 0)
+    assert boards[(42, 0)] == (first.reelstrip_ids[0], board_names(gamestate.board))
@@ -0,0 +1,37 @@
+"""Test compact (int-encoded) boards against their Symbol boards."""
+
+import random
+
+import pytest
+from tests.board.board_test_config import BoardTest, GameBoardConfig, board_names
+
+
+@pytest.fixture
+def gamestate():
+    return BoardTest(GameBoardConfig())
+
+
+def test_compact_board_matches_legacy(gamestate):
+    for seed in range(20):
+        random.seed(seed)
+        gamestate.config.compact_board = True
+        gamestate.create_board_reelstrips()
+        compact = (board_names(gamestate.board), gamestate.special_syms_on_board, gamestate.anticipation)
+        random.seed(seed)
+        gamestate.config.compact_board = False
+        gamestate.create_board_reelstrips()
+        assert compact == (board_names(gamestate.board), gamestate.special_syms_on_board, gamestate.anticipation)
+
+
+def test_board_codes_follow_in_place_edits(gamestate):
+    random.seed(3)
+    gamestate.create_board_reelstrips()
+    storage = gamestate.symbol_storage
+    drawn = gamestate.get_board_codes()
+    assert drawn.shape == (3, 4)
+    assert (drawn[1, 2:] == -1).all()
+
+    gamestate.board[0][0] = gamestate.create_symbol("S")
+    codes = gamestate.get_board_codes()
+    assert codes[0, 0] == storage.codes["S"]
+    assert (codes == storage.encode_board(gamestate.board)).all()
@@ -0,0 +1,44 @@
+"""Test int-encoded reelstrips used by compact boards."""
+
+import numpy as np
+from types import SimpleNamespace
+from src.calculations.board import EncodedReelstrip
+from src.calculations.symbol import SymbolStorage
+
+CONFIG = SimpleNamespace(
+    paytable={(3, "H1"): 10, (3, "L1"): 2},
+    special_symbols={"wild": ["W"], "scatter": ["S"], "multiplier": ["W"]},
+)
+STORAGE = SymbolStorage(CONFIG, ["H1", "L1", "W", "S"])
+REELSTRIP = [["H1", "L1", "W", "S"], ["S", "H1"], ["L1", "L1", "H1", "W", "S"]]
+
+
+def decode(window):
+    return [[STORAGE.names[code] if code >= 0 else None for code in reel] for reel in window]
+
+
+def test_window_wraps_around_reels():
+    encoded = EncodedReelstrip(REELSTRIP, STORAGE, [3, 3, 3])
+    window = encoded.window([3, 1, 4])
+    assert decode(window) == [["S", "H1", "L1"], ["H1", "S", "H1"], ["S", "L1", "L1"]]
+    assert encoded.to_array(window).tolist() == window
+
+
+def test_gather_matches_window_for_batches():
+    encoded = EncodedReelstrip(REELSTRIP, STORAGE, [2, 1, 3])
+    positions = np.array([[0, 0, 0], [3, 1, 4], [2, 0, 3]])
+    codes = encoded.gather(positions)
+    assert codes.shape == (3, 3, 3)
+    for board, stops in zip(codes, positions.tolist()):
+        assert board.tolist() == encoded.to_array(encoded.window(stops)).tolist()
+    assert decode(codes[1].tolist()) == [["S", "H1", None], ["H1", None, None], ["S", "L1", "L1"]]
+
+
+def test_special_masks():
+    wild, scatter, multiplier = (STORAGE.special_bits[key] for key in ("wild", "scatter", "multiplier"))
+    masks = STORAGE.special_masks
+    assert masks[STORAGE.codes["W"]] == wild | multiplier
+    assert masks[STORAGE.codes["S"]] == scatter
+    assert masks[STORAGE.codes["H1"]] == 0
+    assert masks[-1] == 0
+    assert STORAGE.special_keys[STORAGE.codes["W"]] == ("wild", "multiplier")
@@ -0,0 +1,32 @@
+"""Fixtures for state tests built on the fifty_fifty sample game."""
+
+import os
+import sys
+
+import pytest
+import src.config.config as config_module
+import src.config.output_filenames as output_filenames
+from src.config.paths import PATH_TO_GAMES
+
+GAME_DIR = os.path.join(PATH_TO_GAMES, "fifty_fifty")
+GAME_MODULES = ("gamestate", "game_config", "game_override", "game_executables", "game_calculations", "game_events")
+
+
+@pytest.fixture
+def fifty_fifty(monkeypatch):
+    """GameState factory for the fifty_fifty sample game, writing its library under a given folder."""
+    monkeypatch.syspath_prepend(GAME_DIR)
+    for name in GAME_MODULES:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    from gamestate import GameState
+    from game_config import GameConfig
+
+    def make(games_path):
+        monkeypatch.setattr(config_module, "PATH_TO_GAMES", str(games_path))
+        monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(games_path))
+        config = GameConfig()
+        return GameState(config), config
+
+    yield make
+    for name in GAME_MODULES:
+        sys.modules.pop(name, None)
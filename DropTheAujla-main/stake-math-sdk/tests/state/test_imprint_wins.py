@@ -0,0 +1,41 @@
+"""Test event recording across books."""
+
+from array import array
+
+
+def test_repeated_descriptions_count_once_per_book(tmp_path, fifty_fifty):
+    gamestate, _ = fifty_fifty(tmp_path)
+    gamestate.betmode = "base"
+    gamestate.criteria = "basegame"
+    trigger = {"kind": 3, "symbol": "S", "gametype": "basegame"}
+    other = {"kind": 4, "symbol": "S", "gametype": "basegame"}
+
+    for sim in (1, 2, 5):
+        gamestate.reset_seed(sim)
+        gamestate.reset_book()
+        for _ in range(3):
+            gamestate.record(trigger)
+        if sim == 2:
+            gamestate.record(other)
+            gamestate.record(other)
+        gamestate.imprint_wins()
+
+    key = tuple(sorted((str(k), str(v)) for k, v in trigger.items()))
+    other_key = tuple(sorted((str(k), str(v)) for k, v in other.items()))
+    assert gamestate.recorded_events[key] == {"timesTriggered": 3, "bookIds": array("I", [1, 2, 5])}
+    assert gamestate.recorded_events[other_key] == {"timesTriggered": 1, "bookIds": array("I", [2])}
+    assert set(gamestate.get_current_betmode().get_force_keys()) >= {"kind", "symbol", "gametype"}
+
+
+def test_recorded_descriptions_are_interned(tmp_path, fifty_fifty):
+    gamestate, _ = fifty_fifty(tmp_path)
+    gamestate.betmode = "base"
+    gamestate.criteria = "basegame"
+    gamestate.reset_book()
+    gamestate.record({"kind": 3, "symbol": "S"})
+    gamestate.record({"symbol": "S", "kind": 3})
+    assert gamestate.temp_wins[0] is gamestate.temp_wins[2]
+    gamestate.imprint_wins()
+    gamestate.reset_book()
+    gamestate.record({"kind": 3, "symbol": "S"})
+    assert gamestate.temp_wins[0] is next(iter(gamestate.recorded_events))
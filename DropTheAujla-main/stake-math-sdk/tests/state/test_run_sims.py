@@ -0,0 +1,62 @@
+"""Test pooled book creation against a single-process run."""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+import zstandard as zstd
+from src.state import run_sims
+
+
+def published(games_path, name):
+    return games_path / "fifty_fifty" / "library" / "publish_files" / name
+
+
+def test_pooled_books_match_single_process(tmp_path, fifty_fifty):
+    outputs = {}
+    for threads in (1, 2):
+        games_path = tmp_path / f"threads_{threads}"
+        gamestate, config = fifty_fifty(games_path)
+        run_sims.create_books(gamestate, config, {"base": 100}, 50, threads, True, False)
+        with open(published(games_path, "books_base.jsonl.zst"), "rb") as f:
+            books = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+        outputs[threads] = (books, published(games_path, "lookUpTable_base_0.csv").read_text())
+
+    assert outputs[1][0].count(b"\n") == 100
+    assert outputs[2] == outputs[1]
+
+
+def _failing_batch(*args):
+    raise RuntimeError("batch failed")
+
+
+def _dying_batch(*args):
+    os._exit(1)
+
+
+@pytest.mark.parametrize(
+    "batch_function, error",
+    [(_failing_batch, RuntimeError), (_dying_batch, BrokenProcessPool)],
+    ids=["worker_error", "worker_killed"],
+)
+def test_shared_plan_unlinked_after_worker_failure(tmp_path, fifty_fifty, monkeypatch, batch_function, error):
+    gamestate, _ = fifty_fifty(tmp_path)
+    gamestate.betmode = "base"
+    plans = []
+
+    class RecordingPlan(run_sims.SharedSimulationPlan):
+        def __init__(self, *args):
+            super().__init__(*args)
+            plans.append(self.spec)
+
+    monkeypatch.setattr(run_sims, "SharedSimulationPlan", RecordingPlan)
+    monkeypatch.setattr(run_sims, "_run_batch", batch_function)
+    batches = [("base", 2, 1, 5, thread, 0, True) for thread in range(2)]
+    with pytest.raises(error):
+        run_sims.run_batch_pool(gamestate, ["basegame"] * 10, list(range(10)), batches, 2)
+
+    [(criteria_name, _, seeds_name, _, _)] = plans
+    for name in (criteria_name, seeds_name):
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
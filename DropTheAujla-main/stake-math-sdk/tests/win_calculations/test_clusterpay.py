@@ -99,3 +99,34 @@ def test_basic_cluster(gamestate):
         clusters=clusters,
     )
     assert total_win == gamestate.config.paytable[(9, "H1")]
+
+
+def test_cluster_position_order(gamestate):
+    """Wilds join every adjacent cluster; positions keep the neighbour-search order."""
+    layout = [
+        ["H1", "H1", "X", "H2", "H2", "X"],
+        ["WM", "H1", "X", "H2", "WM", "H2"],
+        ["H1", "X", "H1", "WM", "X", "H2"],
+        ["H1", "H1", "H1", "X", "X", "X"],
+        ["X", "X", "X", "X", "H1", "X"],
+        ["H2", "X", "X", "X", "X", "X"],
+    ]
+    gamestate.board = [[gamestate.create_symbol(name) for name in reel] for reel in layout]
+
+    clusters = Cluster.get_clusters(gamestate.board)
+    assert list(clusters) == ["H1", "X", "H2"]
+    assert clusters["H1"] == [
+        [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (2, 2), (2, 3), (1, 1), (0, 1)],
+        [(4, 4)],
+    ]
+    assert clusters["H2"] == [[(0, 3), (1, 3), (2, 3), (1, 4), (1, 5), (2, 5), (0, 4)], [(5, 0)]]
+    assert [len(cluster) for cluster in clusters["X"]] == [2, 1, 1, 16]
+
+
+def test_board_sized_cluster(gamestate):
+    """A single cluster covering a large board."""
+    gamestate.board = [[gamestate.create_symbol("H1") for _ in range(60)] for _ in range(60)]
+
+    clusters = Cluster.get_clusters(gamestate.board)
+    assert len(clusters["H1"]) == 1
+    assert sorted(clusters["H1"][0]) == [(reel, row) for reel in range(60) for row in range(60)]
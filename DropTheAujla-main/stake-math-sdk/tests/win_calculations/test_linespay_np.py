@@ -0,0 +1,81 @@
+"""Test array-based lines evaluation against Lines.get_lines."""
+
+import json
+import random
+
+import numpy as np
+import pytest
+from tests.win_calculations.test_linespay import create_test_lines_gamestate
+from src.calculations.lines import Lines, LinesEvaluatorNP
+from src.calculations.symbol import board_attribute_array
+
+
+@pytest.fixture
+def gamestate():
+    """Initialise test state."""
+    return create_test_lines_gamestate()
+
+
+def evaluate(gamestate, **kwargs):
+    evaluator = LinesEvaluatorNP(gamestate.config, gamestate.symbol_storage)
+    return evaluator.get_lines(
+        gamestate.symbol_storage.encode_board(gamestate.board),
+        board_attribute_array(gamestate.board, "multiplier"),
+        **kwargs,
+    )
+
+
+def fill_board(gamestate, name_at):
+    for idx, _ in enumerate(gamestate.board):
+        for idy, _ in enumerate(gamestate.board[idx]):
+            gamestate.board[idx][idy] = gamestate.create_symbol(name_at(idx, idy))
+
+
+def test_linespay_np_basic(gamestate):
+    fill_board(gamestate, lambda reel, row: "H1" if reel != len(gamestate.board) - 1 else "W")
+    windata = evaluate(gamestate)
+    assert windata["totalWin"] == (gamestate.config.paytable[(5, "H1")] * len(gamestate.config.paylines))
+    assert windata == Lines.get_lines(gamestate.board, gamestate.config)
+
+
+def test_linespay_np_wilds(gamestate):
+    fill_board(gamestate, lambda reel, row: "W" if reel < 4 else "H1")
+    windata = evaluate(gamestate)
+    assert windata["totalWin"] == (gamestate.config.paytable[(4, "W")] * len(gamestate.config.paylines))
+    assert windata == Lines.get_lines(gamestate.board, gamestate.config)
+
+
+def test_linespay_np_mult(gamestate):
+    fill_board(gamestate, lambda reel, row: "WM" if row == 0 else "X")
+    windata = evaluate(gamestate)
+    assert windata["totalWin"] == (gamestate.config.paytable[(5, "WM")] * sum([3, 3, 3, 3, 3]))
+    assert windata == Lines.get_lines(gamestate.board, gamestate.config)
+
+
+@pytest.mark.parametrize("multiplier_method", ["symbol", "global", "combined"])
+def test_linespay_np_batch_matches_lines(gamestate, multiplier_method):
+    """Random boards evaluated as one batch match Lines.get_lines board by board."""
+    rng = random.Random(7)
+    names = ["W", "W", "H1", "H1", "H1", "WM", "WM", "M", "X", "S"]
+    boards, codes, mults = [], [], []
+    for _ in range(300):
+        fill_board(gamestate, lambda reel, row: rng.choice(names))
+        boards.append([list(reel) for reel in gamestate.board])
+        codes.append(gamestate.symbol_storage.encode_board(gamestate.board))
+        mults.append(board_attribute_array(gamestate.board, "multiplier"))
+
+    evaluator = LinesEvaluatorNP(gamestate.config, gamestate.symbol_storage)
+    results = evaluator.evaluate(
+        np.stack(codes), np.stack(mults), multiplier_method=multiplier_method, global_multiplier=2
+    )
+    paying = 0
+    for index, board in enumerate(boards):
+        expected = Lines.get_lines(
+            board, gamestate.config, multiplier_method=multiplier_method, global_multiplier=2
+        )
+        if expected["wins"]:
+            paying += 1
+            assert json.dumps(results[index]) == json.dumps(expected)
+        else:
+            assert index not in results
+    assert paying > 0
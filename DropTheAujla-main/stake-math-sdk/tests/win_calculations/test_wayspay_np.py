@@ -0,0 +1,86 @@
+"""Test array-based ways evaluation against Ways.get_ways_data."""
+
+import json
+import random
+
+import numpy as np
+import pytest
+from tests.win_calculations.test_wayspay import create_test_ways_gamestate, setup_test_board
+from src.calculations.ways import Ways, WaysEvaluatorNP
+from src.calculations.symbol import board_attribute_array
+
+
+@pytest.fixture
+def gamestate():
+    """Initialise test state."""
+    return create_test_ways_gamestate()
+
+
+def evaluate(gamestate, board, **kwargs):
+    evaluator = WaysEvaluatorNP(gamestate.config, gamestate.symbol_storage)
+    return evaluator.get_ways_data(
+        gamestate.symbol_storage.encode_board(board),
+        board_attribute_array(board, "multiplier"),
+        **kwargs,
+    )
+
+
+def test_basic_ways_np(gamestate):
+    for idx, _ in enumerate(gamestate.board):
+        for idy, _ in enumerate(gamestate.board[idx]):
+            name = "H1" if idx < len(gamestate.board) - 1 else "W"
+            gamestate.board[idx][idy] = gamestate.create_symbol(name)
+
+    windata = evaluate(gamestate, gamestate.board)
+    totalWays = len(gamestate.board[0]) ** len(gamestate.board)
+    assert windata["totalWin"] == totalWays * gamestate.config.paytable[(5, "H1")]
+    assert windata == Ways.get_ways_data(gamestate.config, gamestate.board)
+
+
+@pytest.mark.parametrize("multiplier_strategy", ["symbol", "board", "global"])
+def test_multiplier_strategies_np(gamestate, multiplier_strategy):
+    board = setup_test_board(gamestate, wild_mults=(2, 3))
+    windata = evaluate(gamestate, board, global_multiplier=5, multiplier_strategy=multiplier_strategy)
+    expected = Ways.get_ways_data(
+        config=gamestate.config, board=board, global_multiplier=5, multiplier_strategy=multiplier_strategy
+    )
+    assert windata["wins"]
+    assert json.dumps(windata) == json.dumps(expected)
+
+
+@pytest.mark.parametrize("multiplier_strategy", ["symbol", "board", "global"])
+def test_ways_np_batch_matches_ways(gamestate, multiplier_strategy):
+    """Random boards evaluated as one batch match Ways.get_ways_data board by board."""
+    rng = random.Random(5)
+    names = ["H1", "H1", "H2", "H2", "W", "X", "S"]
+    boards = []
+    for _ in range(300):
+        board = []
+        for _ in range(gamestate.config.num_reels):
+            reel = []
+            for _ in range(gamestate.config.num_rows[0]):
+                sym = gamestate.create_symbol(rng.choice(names))
+                if rng.random() < 0.3:
+                    setattr(sym, "multiplier", rng.choice([1, 2, 3]))
+                reel.append(sym)
+            board.append(reel)
+        boards.append(board)
+
+    evaluator = WaysEvaluatorNP(gamestate.config, gamestate.symbol_storage)
+    results = evaluator.evaluate(
+        np.stack([gamestate.symbol_storage.encode_board(board) for board in boards]),
+        np.stack([board_attribute_array(board, "multiplier") for board in boards]),
+        global_multiplier=3,
+        multiplier_strategy=multiplier_strategy,
+    )
+    paying = 0
+    for index, board in enumerate(boards):
+        expected = Ways.get_ways_data(
+            gamestate.config, board, global_multiplier=3, multiplier_strategy=multiplier_strategy
+        )
+        if expected["wins"]:
+            paying += 1
+            assert json.dumps(results[index]) == json.dumps(expected)
+        else:
+            assert index not in results
+    assert paying > 0
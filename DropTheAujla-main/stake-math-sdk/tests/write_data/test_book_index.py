@@ -0,0 +1,65 @@
+"""Test framed book writing and random-access lookup."""
+
+import json
+import zstandard as zstd
+import pytest
+from src.write_data.book_index import BookIndexReader, index_path_for, iter_book_lines, write_indexed_books
+
+
+def write_books(path, book_ids):
+    lines = "".join(json.dumps({"id": i, "payoutMultiplier": i * 10, "events": [{"index": 0}]}) + "\n" for i in book_ids)
+    with open(path, "wb") as f:
+        f.write(zstd.ZstdCompressor().compress(lines.encode("UTF-8")))
+    return lines
+
+
+def test_lookup_every_book(tmp_path):
+    books = str(tmp_path / "books_base.jsonl.zst")
+    original = write_books(books, range(1, 1001))
+    write_indexed_books(books, frame_books=64)
+
+    with BookIndexReader(books) as reader:
+        assert len(reader) == 1000
+        assert len(reader.frames) == 16
+        assert reader.contiguous
+        for book_id in (1, 64, 65, 500, 1000):
+            assert reader.get(book_id)["payoutMultiplier"] == book_id * 10
+        assert 0 not in reader and 1001 not in reader
+        with pytest.raises(KeyError):
+            reader.get(1001)
+
+    # Framed file still reads sequentially as the same JSONL
+    assert b"".join(iter_book_lines(books)).decode("UTF-8") == original
+
+
+def test_sparse_unsorted_ids(tmp_path):
+    books = str(tmp_path / "books_bonus.jsonl.zst")
+    ids = [50, 3, 900, 7, 12]
+    write_books(books, ids)
+    write_indexed_books(books, frame_books=2)
+
+    with BookIndexReader(books) as reader:
+        assert not reader.contiguous
+        assert [reader.get(i)["id"] for i in ids] == ids
+        assert 4 not in reader
+    assert index_path_for(books).endswith(".jsonl.zst.idx")
+
+
+def test_index_refuses_other_books(tmp_path):
+    books = str(tmp_path / "books_base.jsonl.zst")
+    write_books(books, range(1, 101))
+    write_indexed_books(books, frame_books=16)
+    stale_index = open(index_path_for(books), "rb").read()
+
+    # Books republished, index left behind (or the reverse)
+    write_books(books, range(1, 121))
+    write_indexed_books(books, frame_books=16)
+    with open(index_path_for(books), "wb") as f:
+        f.write(stale_index)
+    with pytest.raises(ValueError, match="does not match"):
+        BookIndexReader(books)
+
+    with open(index_path_for(books), "wb") as f:
+        f.write(b"BKIX" + bytes(60))
+    with pytest.raises(ValueError, match="version"):
+        BookIndexReader(books)
@@ -0,0 +1,57 @@
+"""Test streaming book output."""
+
+import io
+import json
+import zstandard as zstd
+from src.write_data.write_data import BookWriter, record_library_events
+
+BOOKS = [{"id": i, "payoutMultiplier": i * 10, "events": [{"index": 0, "type": "reveal"}]} for i in range(1, 301)]
+
+
+def test_zst_stream_matches_jsonl(tmp_path):
+    path = str(tmp_path / "books_base_0_0.jsonl.zst")
+    with BookWriter(path) as writer:
+        for book in BOOKS:
+            writer.write(book)
+    assert writer.count == len(BOOKS)
+
+    out = io.BytesIO()
+    with open(path, "rb") as f:
+        zstd.ZstdDecompressor().copy_stream(f, out)
+    assert out.getvalue().decode("UTF-8") == "".join(json.dumps(book) + "\n" for book in BOOKS)
+
+
+def test_concatenated_frames_read_as_one_file(tmp_path):
+    merged = io.BytesIO()
+    for part, books in enumerate((BOOKS[:100], BOOKS[100:])):
+        path = str(tmp_path / f"books_base_{part}_0.jsonl.zst")
+        with BookWriter(path) as writer:
+            for book in books:
+                writer.write(book)
+        with open(path, "rb") as f:
+            merged.write(f.read())
+
+    merged.seek(0)
+    reader = zstd.ZstdDecompressor().stream_reader(merged, read_across_frames=True)
+    assert reader.read().decode("UTF-8") == "".join(json.dumps(book) + "\n" for book in BOOKS)
+
+
+def test_regular_json_array(tmp_path):
+    path = str(tmp_path / "books_base_0_0.json")
+    with BookWriter(path, regular_json=True) as writer:
+        for book in BOOKS:
+            writer.write(book)
+    with open(path, encoding="UTF-8") as f:
+        assert f.read() == json.dumps(BOOKS)
+
+    empty = str(tmp_path / "books_empty.json")
+    BookWriter(empty, regular_json=True).close()
+    with open(empty, encoding="UTF-8") as f:
+        assert json.load(f) == []
+
+
+def test_record_library_events_keeps_first_example():
+    event_items = {}
+    record_library_events(event_items, [{"index": 0, "type": "win", "amount": 1}])
+    record_library_events(event_items, [{"index": 1, "type": "win", "amount": 5}, {"index": 2, "type": "end"}])
+    assert event_items == {"win": {"type": "win", "amount": 1}, "end": {"type": "end"}}
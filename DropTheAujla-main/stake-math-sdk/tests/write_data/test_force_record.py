@@ -0,0 +1,26 @@
+"""Test the temporary force-record format."""
+
+from types import SimpleNamespace
+from src.write_data.write_data import print_recorded_wins, read_recorded_wins
+
+
+def test_force_record_round_trip(tmp_path):
+    recorded_events = {
+        (("gametype", "basegame"), ("kind", "3"), ("symbol", "S")): {"timesTriggered": 3, "bookIds": [2, 9, 4000000]},
+        (("gametype", "freegame"), ("kind", "5"), ("symbol", "H1")): {"timesTriggered": 1, "bookIds": [7]},
+        (("symbol", "W"),): {"timesTriggered": 0, "bookIds": []},
+    }
+    name = str(tmp_path / "force_base_0_0.npz")
+    print_recorded_wins(SimpleNamespace(recorded_events=recorded_events), name)
+
+    loaded = read_recorded_wins(name)
+    assert list(loaded) == list(recorded_events)
+    for key, record in recorded_events.items():
+        assert loaded[key]["timesTriggered"] == record["timesTriggered"]
+        assert loaded[key]["bookIds"].tolist() == record["bookIds"]
+
+
+def test_empty_force_record(tmp_path):
+    name = str(tmp_path / "force_base_0_0.npz")
+    print_recorded_wins(SimpleNamespace(recorded_events={}), name)
+    assert read_recorded_wins(name) == {}
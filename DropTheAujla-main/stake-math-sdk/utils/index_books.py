@@ -0,0 +1,46 @@
+"""
+Build or query the random-access index for compressed books
+    Args:
+    -f books file (.jsonl.zst or .jsonl)
+    [optional] -k books per zstd frame, default 256
+    [optional] -b book id to fetch after indexing
+    Example:
+    python3 -m utils.index_books -f 'games/0_0_lines/library/publish_files/books_base.jsonl.zst' -k 256 -b 42
+"""
+
+import os
+import argparse
+import time
+
+from src.write_data.book_index import (
+    BookIndexReader,
+    DEFAULT_FRAME_BOOKS,
+    index_path_for,
+    write_indexed_books,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index compressed books for random access.")
+    parser.add_argument("-f", "--file", required=True, help="Books file to index")
+    parser.add_argument("-k", "--frame-books", type=int, default=DEFAULT_FRAME_BOOKS, help="Books per zstd frame")
+    parser.add_argument("-b", "--book", type=int, help="Book id to fetch")
+    args = parser.parse_args()
+
+    books_path = args.file
+    if not os.path.exists(index_path_for(books_path)):
+        start = time.time()
+        books_path = write_indexed_books(books_path, frame_books=args.frame_books)
+        print(f"Indexed {books_path} in {time.time() - start:.2f}s")
+
+    with BookIndexReader(books_path) as reader:
+        print(f"{len(reader)} books in {len(reader.frames)} frames of {reader.frame_books}")
+        if args.book is not None:
+            start = time.perf_counter()
+            raw = reader.get_raw(args.book)
+            print(f"Fetched book {args.book} in {(time.perf_counter() - start) * 1000:.3f} ms")
+            print(raw.decode("UTF-8"))
+
+
+if __name__ == "__main__":
+    main()
@@ -34,7 +34,7 @@ def check_consistency():
     
     with open(books_path, "rb") as fh:
         dctx = zstd.ZstdDecompressor()
-        with dctx.stream_reader(fh) as reader:
+        with dctx.stream_reader(fh, read_across_frames=True) as reader:
             # We need to process line by line. 
             # stream_reader provides a stream. We need to buffer and split lines.
             buffer = ""
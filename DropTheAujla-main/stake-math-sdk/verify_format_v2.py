@@ -50,7 +50,7 @@ def verify_format():
     try:
         with open(f"{base_path}/{events_path}", "rb") as fh:
             dctx = zstd.ZstdDecompressor()
-            with dctx.stream_reader(fh) as reader:
+            with dctx.stream_reader(fh, read_across_frames=True) as reader:
                 chunk = reader.read(4096)
                 text = chunk.decode("utf-8")
                 first_line = text.split("\n")[0]
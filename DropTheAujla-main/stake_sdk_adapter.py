@@ -7,7 +7,7 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 from config import GameConfig
-from game_math import RTPCalculator, MultiplierEngine
+from game_math import RTPCalculator, MultiplierEngine, ExactRTPEngine
 
 # Add SDK to path
 sdk_path = Path(__file__).parent / "stake-math-sdk"
@@ -63,6 +63,9 @@ class DropTheDictatorSDKAdapter:
         total_rtp = sum(outcome['rtp_contribution'] for outcome in outcomes)
         total_probability = sum(outcome['probability'] for outcome in outcomes)
         
+        # Full model: collectibles, black hole and max win cap included
+        full_model = ExactRTPEngine().statistics()
+        
         return {
             'theoretical_rtp': total_rtp,
             'theoretical_rtp_percentage': total_rtp * 100,
@@ -70,7 +73,13 @@ class DropTheDictatorSDKAdapter:
             'num_outcomes': len(outcomes),
             'outcomes': outcomes,
             'target_rtp': self.target_rtp * 100,
-            'variance_from_target': (total_rtp - self.target_rtp) * 100
+            'variance_from_target': (total_rtp - self.target_rtp) * 100,
+            'full_model_rtp': full_model['rtp'],
+            'full_model_rtp_percentage': full_model['rtp_percentage'],
+            'full_model_variance': full_model['variance'],
+            'full_model_hit_rate': full_model['hit_rate'],
+            'full_model_max_multiplier': full_model['max_multiplier'],
+            'full_model_max_win_odds': full_model['max_win_odds'],
         }
     
     def generate_outcome_table(self) -> str:
@@ -178,6 +187,14 @@ class DropTheDictatorSDKAdapter:
             f"Number of Outcomes: {validation['num_outcomes']}",
             f"Total Probability: {validation['total_probability']:.6f}",
             "",
+            "FULL PAYOUT MODEL (EXACT)",
+            "-"*70,
+            f"RTP (collectibles + black hole + cap): {validation['full_model_rtp_percentage']:.4f}%",
+            f"Variance: {validation['full_model_variance']:.4f}",
+            f"Hit Rate: {validation['full_model_hit_rate'] * 100:.2f}%",
+            f"Max Multiplier: {validation['full_model_max_multiplier']:.2f}x",
+            f"Max Win Odds: 1 in {validation['full_model_max_win_odds']:,.0f}",
+            "",
             "COMPARISON WITH CUSTOM MATH ENGINE",
             "-"*70,
             f"SDK Method RTP: {comparison['sdk_rtp']:.4f}%",
@@ -0,0 +1,5 @@
+"""Keep app-level journals, secrets and archives off disk during tests."""
+
+import os
+
+os.environ['RGS_DATA_DIR'] = ''
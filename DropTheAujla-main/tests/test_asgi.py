@@ -0,0 +1,127 @@
+"""Test the ASGI app end to end with in-memory receive/send."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+import app
+import asgi
+from asgi import MAX_BODY_BYTES, RGSApplication
+
+
+def call(application, method, path, body=b'', query=b'', on_send=None):
+    """Run one request; returns (status, headers, body chunks)"""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if on_send is not None:
+            on_send(message)
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start, chunks = sent[0], [message['body'] for message in sent[1:]]
+    return start['status'], dict(start['headers']), chunks
+
+
+def call_json(application, method, path, data=None, query=b''):
+    status, _, chunks = call(application, method, path, json.dumps(data or {}).encode(), query)
+    return status, json.loads(b''.join(chunks))
+
+
+@pytest.fixture
+def rgs():
+    application = RGSApplication(simulation_workers=1, handler_threads=2)
+    yield application
+    application.shutdown()
+
+
+def test_round_trip_routes(rgs):
+    status, session = call_json(rgs, 'POST', '/wallet/authenticate')
+    assert status == 200
+    token = session['session_token']
+
+    status, played = call_json(rgs, 'POST', '/play', {'sessionID': token, 'bet': app.MIN_BET})
+    assert status == 200
+    assert played['balance'] == app.STARTING_BALANCE - app.MIN_BET
+
+    status, spawn = call_json(rgs, 'GET', f"/spawn/{played['round_id']}", query=b'section=pushables&range=0:3')
+    assert status == 200 and len(spawn['items']) == 3
+
+    status, ended = call_json(rgs, 'POST', '/endround', {'sessionID': token, 'round_id': played['round_id']})
+    assert status == 200
+    assert ended['balance'] == played['balance'] + played['payout']
+
+    status, record = call_json(rgs, 'GET', f"/round/{played['round_id']}")
+    assert status == 200 and record['status'] == 'completed'
+    assert 'account_id' not in record
+
+
+def test_handlers_run_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def handler(data):
+        threads.append(threading.current_thread())
+        return {'ok': True}, 200
+
+    monkeypatch.setattr(asgi, 'handle_authenticate', handler)
+    application = RGSApplication(handler_threads=1)
+    try:
+        assert call_json(application, 'POST', '/wallet/authenticate') == (200, {'ok': True})
+    finally:
+        application.shutdown()
+    assert threads[0] is not threading.main_thread()
+
+
+def test_errors(rgs):
+    assert call_json(rgs, 'GET', '/nope')[0] == 404
+    assert call_json(rgs, 'GET', '/play')[0] == 404
+    assert call_json(rgs, 'POST', '/play', {'sessionID': 'missing', 'bet': app.MIN_BET})[0] == 401
+
+    status, _, chunks = call(rgs, 'POST', '/play', b'{not json')
+    assert status == 400 and json.loads(b''.join(chunks))['code'] == 'INVALID_JSON'
+
+    status, _, chunks = call(rgs, 'POST', '/play', b' ' * (MAX_BODY_BYTES + 1))
+    assert status == 413 and json.loads(b''.join(chunks))['code'] == 'BODY_TOO_LARGE'
+
+
+def test_simulate_rejects_invalid_fields(rgs):
+    status, body = call_json(rgs, 'POST', '/simulate', {'workers': 'x'})
+    assert (status, body['code']) == (400, 'INVALID_REQUEST')
+
+
+def test_saturated_node_sheds_load():
+    application = RGSApplication(max_queued=0)
+    status, _, chunks = call(application, 'POST', '/wallet/authenticate')
+    assert status == 503
+    assert json.loads(b''.join(chunks))['code'] == 'SERVER_BUSY'
+
+
+def test_simulate_streams_ndjson_inside_limiter(monkeypatch):
+    monkeypatch.setattr(app, 'SIMULATION_WORKERS', 2)
+    application = RGSApplication(simulation_workers=2)
+    active = []
+    data = {'num_rounds': 4000, 'bet': app.MONETARY_PRECISION, 'workers': 2, 'stream': True}
+    try:
+        status, headers, chunks = call(
+            application, 'POST', '/simulate', json.dumps(data).encode(),
+            on_send=lambda message: active.append(application.limiter.active)
+        )
+    finally:
+        application.shutdown()
+
+    assert status == 200
+    assert headers[b'content-type'] == b'application/x-ndjson'
+    lines = [json.loads(line) for line in b''.join(chunks).splitlines()]
+    assert [line['type'] for line in lines] == ['progress', 'progress', 'result']
+    assert lines[1]['rounds_completed'] == 4000
+    result = lines[-1]
+    del result['type']
+    assert result == app.run_simulation(4000, app.MONETARY_PRECISION)
+    assert set(active) == {1}
+    assert application.limiter.active == 0
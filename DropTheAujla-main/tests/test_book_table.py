@@ -0,0 +1,99 @@
+"""Test book-table draws over the SDK frame index."""
+
+import json
+import os
+import random
+from collections import Counter
+
+import pytest
+import zstandard as zstd
+import app
+import book_table
+from book_table import BookTable
+
+WEIGHTS = {1: 50, 2: 30, 3: 15, 4: 5}
+
+
+def publish(directory, book_ids=(1, 2, 3, 4)):
+    with open(os.path.join(directory, 'lookUpTable_base_0.csv'), 'w') as f:
+        for book_id in book_ids:
+            f.write(f"{book_id},{WEIGHTS[book_id]},{book_id * 100}\n")
+    lines = ''.join(json.dumps({'id': i, 'payoutMultiplier': i * 100, 'events': [{'book': i}]}) + '\n' for i in book_ids)
+    with open(os.path.join(directory, 'books_base.jsonl.zst'), 'wb') as f:
+        f.write(zstd.ZstdCompressor().compress(lines.encode()))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(book_table, 'DEFAULT_CACHE_DIR', str(tmp_path / 'default-cache'))
+    return tmp_path / 'default-cache'
+
+
+def test_indexes_into_cache_without_touching_publish_files(tmp_path, cache_dir):
+    publish_dir = tmp_path / 'publish'
+    publish_dir.mkdir()
+    publish(str(publish_dir))
+    certified = (publish_dir / 'books_base.jsonl.zst').read_bytes()
+    table = BookTable(str(publish_dir))
+    assert sorted(os.listdir(publish_dir)) == ['books_base.jsonl.zst', 'lookUpTable_base_0.csv']
+    assert (publish_dir / 'books_base.jsonl.zst').read_bytes() == certified
+    assert len(os.listdir(cache_dir)) == 2
+    draw = table.draw(0.0, 0.0)
+    assert draw.book == {'id': draw.book_id, 'payoutMultiplier': draw.book_id * 100, 'events': [{'book': draw.book_id}]}
+    assert draw.payout_multiplier == draw.book_id * 100
+    assert table.rtp() == sum(w * i for i, w in WEIGHTS.items()) / sum(WEIGHTS.values())
+
+
+def test_cache_dir_and_rebuild_on_new_books(tmp_path):
+    publish_dir, cache_dir = tmp_path / 'publish', tmp_path / 'cache'
+    publish_dir.mkdir()
+    publish(str(publish_dir), book_ids=(1, 2))
+    assert BookTable(str(publish_dir), cache_dir=str(cache_dir)).index.get(2)['id'] == 2
+    assert sorted(os.listdir(publish_dir)) == ['books_base.jsonl.zst', 'lookUpTable_base_0.csv']
+
+    publish(str(publish_dir))
+    [index_name] = [name for name in os.listdir(cache_dir) if name.endswith('.idx')]
+    future = os.path.getmtime(cache_dir / index_name) + 10
+    os.utime(publish_dir / 'books_base.jsonl.zst', (future, future))
+    assert len(BookTable(str(publish_dir), cache_dir=str(cache_dir)).index) == 4
+
+
+def test_uses_matching_publish_sidecar_only(tmp_path, cache_dir):
+    publish(str(tmp_path), book_ids=(1, 2))
+    book_table.write_indexed_books(str(tmp_path / 'books_base.jsonl.zst'))
+    assert len(BookTable(str(tmp_path)).index) == 2
+    assert not cache_dir.exists()
+
+    # Books republished without a fresh sidecar: the stale index is refused, not trusted
+    publish(str(tmp_path))
+    assert len(BookTable(str(tmp_path)).index) == 4
+    assert cache_dir.exists()
+
+
+def test_independent_floats_follow_weights(tmp_path):
+    publish(str(tmp_path))
+    table = BookTable(str(tmp_path))
+    rng = random.Random(7)
+    counts = Counter(table.draw(rng.random(), rng.random()).book_id for _ in range(40_000))
+    for book_id, weight in WEIGHTS.items():
+        assert abs(counts[book_id] / 40_000 - weight / 100) < 0.01
+
+
+def test_play_flips_coin_with_independent_draw(tmp_path, monkeypatch):
+    publish(str(tmp_path))
+    table = BookTable(str(tmp_path))
+    draws = []
+    real_draw = table.draw
+    monkeypatch.setattr(table, 'draw', lambda column, coin: draws.append((column, coin)) or real_draw(column, coin))
+    monkeypatch.setattr(app, 'OUTCOME_SOURCE', 'books')
+    monkeypatch.setattr(app, 'get_book_table', lambda mode=app.BOOK_MODE: table)
+
+    token = app.handle_authenticate({})[0]['session_token']
+    played, status = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+    assert status == 200
+    assert played['events'] == [{'book': app.rounds.get(played['round_id'])['outcome']['book_id']}]
+
+    round_data = app.rounds.get(played['round_id'])
+    session = app.sessions.get(app.account_id(token))
+    stream = app.get_rng_stream(session['server_seed'], session['client_seed'])
+    assert draws == [(round_data['rng_value'], stream.draw(round_data['nonce'], app.BOOK_COIN_DRAW))]
@@ -0,0 +1,139 @@
+"""Test compiled weight tables, counter-mode draws and the RTP engines."""
+
+import hashlib
+import hmac
+import struct
+
+import numpy as np
+import pytest
+from config import GameConfig
+from game_math import ExactRTPEngine, GameMath, MultiplierEngine, OutcomeTable, ProvablyFairRNG, VectorRTPSimulator
+
+SERVER_SEED, CLIENT_SEED = 'f' * 64, 'c' * 16
+
+
+@pytest.fixture
+def restore_weights():
+    multiplier, black_hole = GameConfig.MULTIPLIER_WEIGHTS, GameConfig.BLACK_HOLE
+    yield
+    GameConfig.update_weights(multiplier, black_hole['multiplier_weights'])
+    OutcomeTable.clear_cache()
+
+
+def test_table_reused_until_weights_updated(restore_weights):
+    table = MultiplierEngine.multiplier_table()
+    assert MultiplierEngine.multiplier_table() is table
+
+    GameConfig.update_weights(multiplier_weights=[(0.0, 1), (2.0, 1)])
+    rebuilt = MultiplierEngine.multiplier_table()
+    assert rebuilt is not table
+    assert rebuilt.values == [0.0, 2.0]
+    assert MultiplierEngine.select_multiplier(0.75) == 2.0
+
+    black_hole = MultiplierEngine.black_hole_table()
+    GameConfig.update_weights(black_hole_weights=[(4.0, 1)])
+    assert MultiplierEngine.black_hole_table().values == [4.0]
+    assert MultiplierEngine.black_hole_table() is not black_hole
+    assert MultiplierEngine.multiplier_table().values == [0.0, 2.0]
+
+
+def test_reassigned_weight_list_rebuilds(restore_weights):
+    table = OutcomeTable.for_weights('test', [(1.0, 1)])
+    assert OutcomeTable.for_weights('test', [(3.0, 1)]).values == [3.0]
+    assert OutcomeTable.for_weights('test', [(1.0, 1)]) is not table
+
+
+def test_vector_replay_reproduces_round_results():
+    game = GameMath(SERVER_SEED, CLIENT_SEED, lazy_spawn=True)
+    expected = [game.generate_round_result(1.0)['final_multiplier'] for _ in range(200)]
+
+    simulator = VectorRTPSimulator(replay_rng=ProvablyFairRNG(SERVER_SEED, CLIENT_SEED))
+    multipliers = simulator.payout_multipliers(*simulator._draw_uniforms(200))
+    assert multipliers.tolist() == expected
+
+
+def test_vector_chunks_merge_to_unchunked_statistics():
+    results = [
+        VectorRTPSimulator(chunk_size=chunk_size, replay_rng=ProvablyFairRNG(SERVER_SEED, CLIENT_SEED)).run(500)
+        for chunk_size in (500, 64, 7)
+    ]
+    game = GameMath(SERVER_SEED, CLIENT_SEED, lazy_spawn=True)
+    multipliers = np.array([game.generate_round_result(1.0)['final_multiplier'] for _ in range(500)])
+    for result in results:
+        assert result['num_rounds'] == 500
+        assert result['rtp'] == pytest.approx(multipliers.mean(), rel=1e-12)
+        assert result['variance'] == pytest.approx(multipliers.var(), rel=1e-9)
+        assert result['max_multiplier'] == multipliers.max()
+
+
+def test_exact_pmf_is_normalised_and_matches_simulation():
+    engine = ExactRTPEngine()
+    values, probabilities = engine.payout_pmf()
+    assert probabilities.sum() == pytest.approx(1.0, abs=1e-12)
+    assert np.all(probabilities >= 0) and np.all(np.diff(values) > 0)
+    assert values[-1] <= GameConfig.MAX_WIN_MULTIPLIER
+
+    stats = engine.statistics()
+    simulated = VectorRTPSimulator(seed=11).run(1_000_000)
+    assert abs(simulated['rtp'] - stats['rtp']) < 5 * stats['std_dev'] / 1_000_000 ** 0.5
+    assert simulated['hit_rate'] == pytest.approx(stats['hit_rate'], abs=0.005)
+
+
+def test_exact_engine_small_model():
+    engine = ExactRTPEngine(
+        multiplier_weights=[(0.0, 1), (2.0, 1)],
+        collectibles={'coin': {'max_per_round': 2, 'spawn_probability': 0.5, 'value_multiplier': 1.0}},
+        black_hole={'trigger_probability': 0.25, 'multiplier_weights': [(3.0, 1)]},
+        max_win_multiplier=8.0
+    )
+    values, probabilities = engine.payout_pmf()
+    # base + bonus is 0..4 with probabilities 1/8, 1/4, 1/4, 1/4, 1/8; the black hole
+    # triples it a quarter of the time and 9 and 12 are capped at 8
+    sums = {0: 0.125, 1: 0.25, 2: 0.25, 3: 0.25, 4: 0.125}
+    assert dict(zip(values.tolist(), probabilities.tolist())) == pytest.approx({
+        0.0: sums[0], 1.0: 0.75 * sums[1], 2.0: 0.75 * sums[2], 3.0: 0.75 * sums[3] + 0.25 * sums[1],
+        4.0: 0.75 * sums[4], 6.0: 0.25 * sums[2], 8.0: 0.25 * (sums[3] + sums[4]),
+    })
+    assert engine.statistics()['rtp'] == pytest.approx(2.8125)
+    assert probabilities.sum() == pytest.approx(1.0)
+
+
+def test_counter_mode_draws_are_per_index_deterministic():
+    rng = ProvablyFairRNG(SERVER_SEED, CLIENT_SEED)
+    before = [rng.random_for(5, index) for index in range(10)]
+    for _ in range(3):
+        rng.generate_random()
+    assert [rng.random_for(5, index) for index in range(10)] == before
+    assert rng.randoms_for(5, 3, 4) == before[3:7]
+    assert ProvablyFairRNG(SERVER_SEED, CLIENT_SEED).random_for(5, 7) == before[7]
+    assert len(set(before)) == 10 and rng.random_for(6, 0) != before[0]
+
+
+def test_expanded_draws_match_stateless_sha512():
+    rng = ProvablyFairRNG(SERVER_SEED, CLIENT_SEED)
+
+    def reference(nonce, index):
+        if index < 3:
+            digest = hmac.new(SERVER_SEED.encode(), f"{CLIENT_SEED}:{nonce}:{index}".encode(), hashlib.sha256).digest()
+            return int.from_bytes(digest[:4], 'big') / 0xFFFFFFFF
+        block, word = divmod(index - 3, 16)
+        digest = hmac.new(SERVER_SEED.encode(), f"{CLIENT_SEED}:{nonce}:{block}".encode(), hashlib.sha512).digest()
+        return struct.unpack('>16I', digest)[word] / 0xFFFFFFFF
+
+    indices = [0, 1, 2, 3, 4, 18, 19, 64, 100]
+    assert [rng.random_for(9, index) for index in indices] == [reference(9, index) for index in indices]
+    draws = rng.draws_for(9)
+    assert [draws(index) for index in reversed(indices)] == [reference(9, index) for index in reversed(indices)]
+    assert rng.randoms_for(9, 0, 40) == [reference(9, index) for index in range(40)]
+    for index in (3, 20, 64):
+        assert rng.verify_result(SERVER_SEED, CLIENT_SEED, 9, reference(9, index), index=index)
+
+
+def test_verify_result_round_trip():
+    rng = ProvablyFairRNG(SERVER_SEED, CLIENT_SEED)
+    value = rng.generate_random()
+    nonce = rng.nonce - 1
+    assert rng.verify_result(SERVER_SEED, CLIENT_SEED, nonce, value)
+    assert rng.verify_result(SERVER_SEED, CLIENT_SEED, nonce, rng.random_for(nonce, 4), index=4)
+    assert not rng.verify_result(SERVER_SEED, CLIENT_SEED, nonce, rng.random_for(nonce, 4), index=5)
+    assert not rng.verify_result(SERVER_SEED, CLIENT_SEED, nonce + 1, value)
@@ -0,0 +1,318 @@
+"""Test the balance ledger, its journal and recovery across a restart."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import journal
+from journal import JournalWriter, iter_journal
+from ledger import BalanceLedger, InsufficientFunds, UnknownAccount
+from session_store import MemoryBackend
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_apply_is_idempotent_and_journaled(tmp_path):
+    path = str(tmp_path / 'ledger.jsonl')
+    ledger = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    ledger.open_account('acct', 100)
+    assert ledger.apply('acct', -30, 'play:1', meta={'round_id': 'r1'}).balance == 70
+    replay = ledger.apply('acct', -30, 'play:1')
+    assert replay.replayed and replay.balance == 70 and replay.meta == {'round_id': 'r1'}
+    with pytest.raises(InsufficientFunds):
+        ledger.apply('acct', -71, 'play:2')
+    with pytest.raises(UnknownAccount):
+        ledger.apply('other', 1, 'x')
+    ledger.close()
+
+    entries = list(iter_journal(path))
+    assert [(entry['account'], entry['seq'], entry['balance']) for entry in entries] == [('acct', 1, 100), ('acct', 2, 70)]
+
+    fresh = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    assert fresh.recover() == 1
+    assert fresh.balance('acct') == 70
+    assert fresh.apply('acct', -30, 'play:1').replayed
+
+
+def test_journal_group_commits_concurrent_appends(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(journal.os, 'fsync', lambda fd: fsyncs.append(fd) or real_fsync(fd))
+    writer = JournalWriter(str(tmp_path / 'j.jsonl'))
+
+    def append_many(thread):
+        for i in range(50):
+            writer.append({'thread': thread, 'i': i})
+
+    threads = [threading.Thread(target=append_many, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    entries = list(iter_journal(writer.path))
+    assert len(entries) == 400
+    for t in range(8):
+        assert [entry['i'] for entry in entries if entry['thread'] == t] == list(range(50))
+    assert len(fsyncs) < 400
+
+
+def test_journal_failure_is_raised(tmp_path):
+    writer = JournalWriter(str(tmp_path / 'missing' / 'j.jsonl'))
+    with pytest.raises(OSError):
+        writer.append({'a': 1})
+
+
+def test_journal_failure_leaves_balance_untouched(tmp_path):
+    ledger = BalanceLedger(MemoryBackend(max_entries=None), journal_path=str(tmp_path / 'ledger.jsonl'))
+    ledger.open_account('acct', 100)
+    ledger.close()
+    ledger._journal._writer.path = str(tmp_path / 'missing' / 'ledger.jsonl')
+    with pytest.raises(OSError):
+        ledger.apply('acct', -30, 'play:1')
+    assert ledger.balance('acct') == 100
+
+
+def test_lost_cas_is_aborted_on_replay(tmp_path):
+    path = str(tmp_path / 'ledger.jsonl')
+    backend = MemoryBackend(max_entries=None)
+    ledger = BalanceLedger(backend, journal_path=path)
+    ledger.open_account('acct', 100)
+
+    # Another process takes seq 2 between our read and our CAS
+    real_cas = backend.compare_and_set
+    def racing_cas(key, expected, value, ttl=None):
+        backend.compare_and_set = real_cas
+        rival = dict(expected, balance=expected['balance'] - 50, seq=expected['seq'] + 1)
+        assert real_cas(key, expected, rival, ttl)
+        return real_cas(key, expected, value, ttl)
+    backend.compare_and_set = racing_cas
+    assert ledger.apply('acct', -30, 'play:1').balance == 20
+    ledger.close()
+
+    assert [entry.get('abort') for entry in iter_journal(path)] == [None, None, 2, None]
+    fresh = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    fresh.recover()
+    assert fresh.balance('acct') == 20
+    assert fresh.apply('acct', -30, 'play:1').replayed
+
+
+def test_abort_drops_the_loser_when_the_winner_journaled_second():
+    ledger = BalanceLedger(MemoryBackend(max_entries=None))
+    entry = lambda seq, key, delta, balance: {'account': 'acct', 'seq': seq, 'key': key, 'delta': delta,
+                                              'balance': balance, 'meta': None, 'at': time.time()}
+    # Two workers write seq 2; b wins the CAS and a aborts after b's entry is on disk
+    folded = ledger._fold([
+        entry(1, 'open', 100, 100),
+        entry(2, 'a', -10, 90),
+        entry(2, 'b', -20, 80),
+        {'account': 'acct', 'abort': 2, 'key': 'a', 'at': time.time()},
+    ])
+    assert [(record['balance'], record['seq'], list(record['keys'])) for record in folded] == [(80, 2, ['open', 'b'])]
+
+    # A loser that crashed before journaling its abort: the next seq shows who won
+    folded = ledger._fold([
+        entry(1, 'open', 100, 100),
+        entry(2, 'b', -20, 80),
+        entry(2, 'a', -10, 90),
+        entry(3, 'c', -5, 75),
+    ])
+    assert [(record['balance'], record['seq'], list(record['keys'])) for record in folded] == [(75, 3, ['open', 'b', 'c'])]
+
+
+def test_checkpoint_snapshots_and_truncates(tmp_path):
+    path = str(tmp_path / 'ledger.jsonl')
+    ledger = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    for account in ('a', 'b'):
+        ledger.open_account(account, 100)
+        for i in range(10):
+            ledger.apply(account, -1, f"play:{i}")
+    ledger.checkpoint()
+    assert os.path.getsize(path) == 0
+    assert not os.path.exists(path + journal.CLOSED_SUFFIX)
+    assert len(list(iter_journal(path + journal.SNAPSHOT_SUFFIX))) == 2
+
+    ledger.apply('a', -5, 'play:tail')
+    ledger.close()
+    fresh = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    assert fresh.recover() == 2
+    assert (fresh.balance('a'), fresh.balance('b')) == (85, 90)
+    assert fresh.apply('b', -1, 'play:3').replayed
+
+    # A crash after writing the snapshot but before deleting the closed segment replays the same state
+    os.replace(path, path + journal.CLOSED_SUFFIX)
+    again = BalanceLedger(MemoryBackend(max_entries=None), journal_path=path)
+    again.recover()
+    assert (again.balance('a'), again.balance('b')) == (85, 90)
+
+
+def test_journal_checkpoints_automatically(tmp_path):
+    path = str(tmp_path / 'j.jsonl')
+    folds = []
+    log = journal.Journal(path, lambda entries: folds.append(1) or list(entries)[-1:], checkpoint_every=5)
+    for i in range(12):
+        log.append({'i': i})
+    log.close()
+    for _ in range(100):
+        if not log._checkpointing:
+            break
+        time.sleep(0.01)
+    assert folds
+    assert [entry['i'] for entry in log.entries()][-1] == 11
+
+
+def test_journal_shared_by_two_writers_keeps_every_entry(tmp_path):
+    path = str(tmp_path / 'j.jsonl')
+    fold = lambda entries: list(entries)
+    first = journal.Journal(path, fold, checkpoint_every=0)
+    second = journal.Journal(path, fold, checkpoint_every=0)
+
+    first.append({'i': 0})
+    second.append({'i': 1})
+    first.checkpoint()
+    # second's handle still points at the segment first just folded away
+    second.append({'i': 2})
+    first.append({'i': 3})
+    first.checkpoint()
+    second.append({'i': 4})
+    second.checkpoint()
+    first.close()
+    second.close()
+
+    assert sorted(entry['i'] for entry in first.entries()) == [0, 1, 2, 3, 4]
+    assert not os.path.exists(path + journal.CLOSED_SUFFIX)
+
+
+RESTART_SCRIPT = '''
+import json, sys
+import app
+app.recover_ledger()
+step = sys.argv[1]
+if step == 'play':
+    token = app.handle_authenticate({})[0]['session_token']
+else:
+    token = sys.argv[2]
+played, status = app.handle_play({'sessionID': token, 'bet': app.MIN_BET, 'idempotency_key': 'k-1'})
+result = {'token': token, 'status': status, 'played': played}
+if step == 'end':
+    result['ended'] = app.handle_end_round({'sessionID': token, 'round_id': played.get('round_id')})
+    result['again'] = app.handle_end_round({'sessionID': token, 'round_id': played.get('round_id')})
+print(json.dumps(result))
+'''
+
+
+def test_active_round_survives_restart(tmp_path):
+    env = dict(os.environ, RGS_DATA_DIR=str(tmp_path / 'data'))
+
+    def run(*args):
+        output = subprocess.run(
+            [sys.executable, '-c', RESTART_SCRIPT, *args], cwd=APP_DIR, env=env,
+            check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+    # Restart between /play and /endround: the retry replays the same round and it can still end
+    first = run('play')
+    assert first['status'] == 200
+    second = run('end', first['token'])
+    assert second['status'] == 200
+    assert second['played'] == first['played']
+    ended, ended_status = second['ended']
+    assert ended_status == 200 and ended['status'] == 'completed'
+    assert ended['balance'] == first['played']['balance'] + first['played']['payout']
+    assert second['again'][0]['code'] == 'ROUND_COMPLETED'
+
+    # The bearer token is never written to disk
+    data = tmp_path / 'data'
+    for name in ('ledger_journal.jsonl', 'session_journal.jsonl', 'round_journal.jsonl', 'play_key_journal.jsonl'):
+        assert first['token'] not in (data / name).read_text()
+    assert oct(os.stat(data / 'rgs_secret.key').st_mode & 0o777) == '0o600'
+
+
+WSGI_SCRIPT = '''
+import json, sys
+import app
+client = app.app.test_client()
+response = client.post('/endround', json={'sessionID': sys.argv[1], 'round_id': sys.argv[2]})
+print(json.dumps([response.get_json(), response.status_code]))
+'''
+
+
+def test_wsgi_worker_recovers_on_first_request(tmp_path):
+    env = dict(os.environ, RGS_DATA_DIR=str(tmp_path / 'data'))
+
+    def run(script, *args):
+        output = subprocess.run(
+            [sys.executable, '-c', script, *args], cwd=APP_DIR, env=env,
+            check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+    # A fresh import that never calls recover_ledger(), as under gunicorn app:app
+    first = run(RESTART_SCRIPT, 'play')
+    ended, status = run(WSGI_SCRIPT, first['token'], first['played']['round_id'])
+    assert status == 200
+    assert ended['balance'] == first['played']['balance'] + first['played']['payout']
+
+
+def test_replayed_play_rebuilds_a_lost_round():
+    import app
+    token = app.handle_authenticate({})[0]['session_token']
+    request = {'sessionID': token, 'bet': app.MIN_BET, 'idempotency_key': 'rebuild'}
+    played, _ = app.handle_play(request)
+    # Crash after the debit: neither the round nor its play key record was stored
+    app.rounds.delete(played['round_id'])
+    app.play_keys.delete(f"{app.account_id(token)}:rebuild")
+    replayed, status = app.handle_play(request)
+    assert status == 200 and replayed == played
+    assert app.handle_end_round({'sessionID': token, 'round_id': played['round_id']})[1] == 200
+
+
+def test_old_play_key_is_not_charged_twice():
+    import app
+    from ledger import MAX_REMEMBERED_KEYS
+    token = app.handle_authenticate({})[0]['session_token']
+    request = {'sessionID': token, 'bet': app.MIN_BET, 'idempotency_key': 'old'}
+    played, _ = app.handle_play(request)
+    for i in range(MAX_REMEMBERED_KEYS + 1):
+        app.handle_play({'sessionID': token, 'bet': app.MIN_BET, 'idempotency_key': f"newer-{i}"})
+    balance = app.ledger.balance(app.account_id(token))
+
+    replayed, status = app.handle_play(request)
+    assert status == 200 and replayed == played
+    assert app.ledger.balance(app.account_id(token)) == balance
+
+    # Once the completed round has left the live store the retry still replays, without reviving it
+    app.handle_end_round({'sessionID': token, 'round_id': played['round_id']})
+    app.rounds.delete(played['round_id'])
+    assert app.handle_play(request) == (played, 200)
+    assert app.rounds.get(played['round_id']) is None
+
+
+def test_replayed_credit_still_completes_the_round():
+    import app
+    from ledger import MAX_REMEMBERED_KEYS
+    token = app.handle_authenticate({})[0]['session_token']
+    played, _ = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+    request = {'sessionID': token, 'round_id': played['round_id']}
+    ended, _ = app.handle_end_round(request)
+
+    # Crash between the credit and storing the completed round
+    round_data = app.rounds.get(played['round_id'])
+    app.rounds.put(played['round_id'], dict(round_data, status='active'))
+    retried, status = app.handle_end_round(request)
+    assert status == 200 and retried['balance'] == ended['balance']
+    assert app.rounds.get(played['round_id'])['status'] == 'completed'
+
+    for _ in range(MAX_REMEMBERED_KEYS + 1):
+        other, _ = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+        app.handle_end_round({'sessionID': token, 'round_id': other['round_id']})
+    balance = app.ledger.balance(app.account_id(token))
+    late, status = app.handle_end_round(request)
+    assert (status, late['code']) == (400, 'ROUND_COMPLETED')
+    assert app.ledger.balance(app.account_id(token)) == balance
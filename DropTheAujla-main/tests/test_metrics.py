@@ -0,0 +1,54 @@
+"""Test the metrics registry and its Prometheus rendering."""
+
+from metrics import _NULL_STAGE, Histogram, MetricsRegistry, metrics_enabled_from_env
+
+
+def test_histogram_buckets_are_upper_bounds():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 2, 1]
+    assert (histogram.count, histogram.total) == (5, 3.65)
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry(enabled=True, target_rtp=0.9)
+    with registry.stage('play', 'rng'):
+        pass
+    registry.observe_request('play', 200, 0.002)
+    registry.observe_request('play', 200, 0.5)
+    registry.observe_request('play', 400, 0.002)
+    registry.record_round(100, 0)
+    registry.record_round(100, 80)
+
+    lines = registry.render().splitlines()
+    assert '# TYPE rgs_stage_seconds histogram' in lines
+    assert 'rgs_stage_seconds_count{endpoint="play",stage="rng"} 1' in lines
+    assert 'rgs_stage_seconds_bucket{endpoint="play",stage="total",le="0.001"} 0' in lines
+    assert 'rgs_stage_seconds_bucket{endpoint="play",stage="total",le="0.0025"} 2' in lines
+    assert 'rgs_stage_seconds_bucket{endpoint="play",stage="total",le="0.5"} 3' in lines
+    assert 'rgs_stage_seconds_bucket{endpoint="play",stage="total",le="+Inf"} 3' in lines
+    assert 'rgs_stage_seconds_sum{endpoint="play",stage="total"} 0.504' in lines
+    assert 'rgs_requests_total{endpoint="play",status="200"} 2' in lines
+    assert 'rgs_requests_total{endpoint="play",status="400"} 1' in lines
+    assert 'rgs_rounds_total 2' in lines and 'rgs_wins_total 1' in lines
+    assert 'rgs_observed_rtp 0.4' in lines
+    drift = next(line for line in lines if line.startswith('rgs_rtp_drift '))
+    assert abs(float(drift.split()[1]) + 0.5) < 1e-12
+
+
+def test_disabled_registry_is_a_no_op(monkeypatch):
+    registry = MetricsRegistry(enabled=False)
+    assert registry.stage('play', 'rng') is _NULL_STAGE
+    with registry.stage('play', 'rng') as stage:
+        assert stage is _NULL_STAGE
+    registry.observe_request('play', 200, 0.1)
+    registry.record_round(100, 50)
+    registry.inc('rgs_custom_total')
+    assert 'rgs_stage_seconds_count' not in registry.render()
+    assert 'rgs_rounds_total' not in registry.render()
+
+    monkeypatch.setenv('RGS_METRICS', 'true')
+    assert metrics_enabled_from_env()
+    monkeypatch.setenv('RGS_METRICS', '0')
+    assert not metrics_enabled_from_env()
@@ -0,0 +1,56 @@
+"""Test provably fair streams against the original stateless HMAC derivations."""
+
+import hashlib
+import hmac
+
+from provably_fair import ProvablyFairStream, expand_random, sub_random, sub_randoms
+
+SECRET, SERVER_SEED, CLIENT_SEED = 'a1' * 32, 'server-seed', 'client-seed'
+
+
+def reference_random(message):
+    """Original provably_fair_rng: first 4 bytes of HMAC-SHA256 over the message"""
+    digest = hmac.new(SECRET.encode(), message.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], 'big') / 2**32
+
+
+def reference_seeded_random(base_rng, index):
+    """Original seeded_random"""
+    return int.from_bytes(hashlib.sha256(f"{base_rng}:{index}".encode()).digest()[:4], 'big') / 2**32
+
+
+def test_random_and_draw_match_stateless_hmac():
+    stream = ProvablyFairStream(SECRET, SERVER_SEED, CLIENT_SEED)
+    for nonce in (0, 1, 2, 99, 10**9):
+        assert stream.random(nonce) == reference_random(f"{SERVER_SEED}:{CLIENT_SEED}:{nonce}")
+        for index in (-1, 0, 1, 17):
+            assert stream.draw(nonce, index) == reference_random(f"{SERVER_SEED}:{CLIENT_SEED}:{nonce}:{index}")
+    # Repeated calls do not disturb the absorbed prefix state
+    assert stream.randoms([5, 6, 5]) == [stream.random(5), stream.random(6), stream.random(5)]
+
+
+def test_expand_matches_reference_across_blocks():
+    stream = ProvablyFairStream(SECRET, SERVER_SEED, CLIENT_SEED)
+    for count in (1, 16, 17, 40):
+        values = stream.expand(7, count)
+        assert len(values) == count
+        assert values == expand_random(SECRET, SERVER_SEED, CLIENT_SEED, 7, count)
+        assert all(0 <= value < 1 for value in values)
+    assert stream.expand(7, 40)[:16] == stream.expand(7)
+    assert stream.expand(8, 16) != stream.expand(7, 16)
+
+
+def test_expanded_view_matches_expand():
+    stream = ProvablyFairStream(SECRET, SERVER_SEED, CLIENT_SEED)
+    expected = expand_random(SECRET, SERVER_SEED, CLIENT_SEED, 7, 40)
+    view = stream.expanded(7)
+    for index in (33, 0, 17, 15, 39, 16):
+        assert view(index) == expected[index]
+
+
+def test_sub_randoms_match_seeded_random():
+    base = ProvablyFairStream(SECRET, SERVER_SEED, CLIENT_SEED).random(3)
+    indices = [0, 1, 2, 50]
+    expected = [reference_seeded_random(base, index) for index in indices]
+    assert [sub_random(base, index) for index in indices] == expected
+    assert sub_randoms(base, indices) == expected
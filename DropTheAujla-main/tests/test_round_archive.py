@@ -0,0 +1,120 @@
+"""Test the round archive's on-disk index."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from round_archive import INDEX_FILENAME, RoundArchive, RoundCompactor
+from session_store import MemoryBackend, RoundStore
+
+
+def round_id(i):
+    return f"{i:032x}"
+
+
+def runs(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(INDEX_FILENAME + '.'))
+
+
+def test_lookup_across_tail_and_runs(tmp_path):
+    archive = RoundArchive(str(tmp_path), segment_records=8)
+    for batch in range(20):
+        archive.archive((round_id(i), {'bet': i}) for i in range(batch * 5, batch * 5 + 5))
+
+    assert len(archive) == 100
+    # 12 sealed segments of 8 merge down to runs of 64 + 32, leaving 4 records in the tail
+    assert runs(tmp_path) == ['rounds.idx.000000000000-000000000064', 'rounds.idx.000000000064-000000000096']
+    for i in range(100):
+        assert archive.get(round_id(i)) == {'bet': i, 'round_id': round_id(i)}
+    assert round_id(100) not in archive
+    assert archive.get(round_id(100)) is None
+    assert archive.get('not-hex') is None
+
+
+def test_concurrent_lookups(tmp_path):
+    archive = RoundArchive(str(tmp_path))
+    archive.archive((round_id(i), {'bet': i, 'pad': 'x' * 500}) for i in range(200))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        found = list(pool.map(lambda i: archive.get(round_id(i))['bet'], list(range(200)) * 10))
+    assert found == list(range(200)) * 10
+
+
+def test_newest_frame_wins(tmp_path):
+    archive = RoundArchive(str(tmp_path), segment_records=4)
+    archive.archive([(round_id(1), {'status': 'old'}), (round_id(2), {})])
+    archive.archive([(round_id(3), {}), (round_id(4), {})])
+    archive.archive([(round_id(1), {'status': 'new'})])
+    assert archive.get(round_id(1))['status'] == 'new'
+    for i in range(5, 16):
+        archive.archive([(round_id(i), {})])
+    assert len(runs(tmp_path)) == 1
+    assert archive.get(round_id(1))['status'] == 'new'
+
+
+def test_other_worker_sees_sealed_runs(tmp_path):
+    reader = RoundArchive(str(tmp_path), segment_records=4)
+    writer = RoundArchive(str(tmp_path), segment_records=4)
+    writer.archive((round_id(i), {'i': i}) for i in range(3))
+    assert reader.get(round_id(2)) == {'i': 2, 'round_id': round_id(2)}
+    writer.archive((round_id(i), {'i': i}) for i in range(3, 40))
+    assert all(reader.get(round_id(i))['i'] == i for i in range(40))
+    assert RoundArchive(str(tmp_path)).get(round_id(39))['i'] == 39
+
+
+def test_torn_log_frame_is_not_served(tmp_path):
+    archive = RoundArchive(str(tmp_path))
+    archive.archive([(round_id(1), {})])
+    with open(archive.log_path, 'r+b') as log:
+        log.truncate(os.path.getsize(archive.log_path) - 1)
+    assert archive.get(round_id(1)) is None
+
+
+def test_compactor_moves_completed_rounds(tmp_path):
+    rounds = RoundStore(MemoryBackend())
+    rounds.put(round_id(1), {'status': 'completed', 'completed_at': 0})
+    rounds.put(round_id(2), {'status': 'active'})
+    archive = RoundArchive(str(tmp_path))
+    assert RoundCompactor(rounds, archive, ttl=10).compact_once(now=100) == 1
+    assert rounds.get(round_id(1)) is None and round_id(1) in archive
+    assert rounds.get(round_id(2)) == {'status': 'active'}
+
+
+def test_end_round_replay_after_compaction(tmp_path, monkeypatch):
+    import app
+    archive = RoundArchive(str(tmp_path))
+    monkeypatch.setattr(app, '_round_archive', archive)
+    token = app.handle_authenticate({})[0]['session_token']
+    played, _ = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+    request = {'sessionID': token, 'round_id': played['round_id']}
+    assert app.handle_end_round(request)[1] == 200
+
+    RoundCompactor(app.rounds, archive, ttl=0).compact_once(now=time.time() + 1)
+    assert app.rounds.get(played['round_id']) is None
+    ended, status = app.handle_end_round(request)
+    assert (status, ended['code']) == (400, 'ROUND_COMPLETED')
+
+
+def test_completed_rounds_expire_without_archive(monkeypatch):
+    import app
+    assert app.get_round_archive() is None
+    token = app.handle_authenticate({})[0]['session_token']
+    played, _ = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+    active, _ = app.handle_play({'sessionID': token, 'bet': app.MIN_BET})
+    assert app.handle_end_round({'sessionID': token, 'round_id': played['round_id']})[1] == 200
+
+    later = time.time() + app.COMPLETED_ROUND_TTL_SECONDS + 1
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert app.rounds.get(played['round_id']) is None
+    assert app.rounds.get(active['round_id'])['status'] == 'active'
+
+
+def test_first_request_starts_the_compactor(tmp_path, monkeypatch):
+    import app
+    monkeypatch.setattr(app, '_round_archive', RoundArchive(str(tmp_path)))
+    monkeypatch.setattr(app, '_round_compactor', None)
+    monkeypatch.setattr(app, '_worker_pid', None)
+    assert app.app.test_client().post('/wallet/authenticate', json={}).status_code == 200
+    try:
+        assert app._round_compactor._thread.is_alive()
+    finally:
+        app.stop_round_compactor()
@@ -0,0 +1,244 @@
+"""Test the in-process and Redis session/round backends."""
+
+import socket
+import threading
+from collections import defaultdict
+
+import pytest
+import session_store
+from session_store import MemoryBackend, RedisBackend, RoundStore
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(session_store.time, "time", fake)
+    return fake
+
+
+def test_memory_ttl(clock):
+    backend = MemoryBackend(num_shards=2)
+    backend.set("a", {"v": 1}, ttl=10)
+    backend.set("b", {"v": 2})
+    clock.now += 9
+    assert backend.get("a") == {"v": 1}
+    assert sorted(backend.scan()) == ["a", "b"]
+    clock.now += 1
+    assert backend.get("a") is None
+    assert list(backend.scan()) == ["b"]
+    assert backend.get("b") == {"v": 2}
+
+
+def test_memory_lru_evicts_least_recently_used():
+    backend = MemoryBackend(num_shards=1, max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+    assert len(backend) == 2
+
+
+def test_memory_uncapped_expires_by_ttl_only(clock):
+    backend = MemoryBackend(num_shards=1, max_entries=None)
+    for i in range(5000):
+        backend.set(f"keep:{i}", i)
+        backend.set(f"tmp:{i}", i, ttl=5)
+    assert all(backend.get(f"keep:{i}") == i for i in range(5000))
+    assert len(backend) == 10_000
+
+    # Expired entries are swept once the shard grows again
+    clock.now += 5
+    for i in range(10_000):
+        backend.set(f"new:{i}", i)
+    assert len(backend) < 20_000
+    assert all(backend.get(f"keep:{i}") == i for i in range(5000))
+
+
+def test_memory_compare_and_set(clock):
+    backend = MemoryBackend(num_shards=1)
+    assert backend.compare_and_set("k", None, {"n": 1})
+    assert not backend.compare_and_set("k", None, {"n": 2})
+
+    current = backend.get("k")
+    assert not backend.compare_and_set("k", {"n": 1}, {"n": 2})  # equal but not the stored object
+    assert backend.compare_and_set("k", current, {"n": 2}, ttl=1)
+    assert backend.get("k") == {"n": 2}
+
+    clock.now += 1
+    assert backend.compare_and_set("k", None, {"n": 3})
+
+
+def test_round_store_keeps_rounds_past_session_capacity():
+    sessions = session_store.SessionStore(MemoryBackend(num_shards=1, max_entries=10))
+    rounds = RoundStore(MemoryBackend(num_shards=1, max_entries=None), ttl=60)
+    for i in range(100):
+        sessions.put(f"s{i}", {})
+        rounds.put(f"r{i}", {"status": "active"})
+    assert len(list(sessions.keys())) == 10
+    assert sorted(rounds.keys()) == sorted(f"r{i}" for i in range(100))
+
+
+def test_put_ttl_override_is_journaled(clock, tmp_path):
+    path = str(tmp_path / "rounds.jsonl")
+    rounds = RoundStore(MemoryBackend(max_entries=None), ttl=600, journal_path=path)
+    rounds.put("short", {"status": "completed"}, ttl=10)
+    rounds.put("long", {"status": "active"})
+    rounds.close()
+
+    clock.now += 20
+    assert rounds.get("short") is None and rounds.get("long") is not None
+    fresh = RoundStore(MemoryBackend(max_entries=None), ttl=600, journal_path=path)
+    assert fresh.recover() == 1
+    assert list(fresh.keys()) == ["long"]
+
+
+class FakeRedis:
+    """Threaded RESP server implementing the commands RedisBackend sends"""
+
+    def __init__(self, password=None, scan_page=2):
+        self.password = password
+        self.scan_page = scan_page
+        self.dbs = defaultdict(dict)
+        self.commands = []
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def url(self, password=None, db=0):
+        auth = f":{password}@" if password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/{db}"
+
+    def close(self):
+        self.listener.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _read_command(reader):
+        line = reader.readline()
+        if not line:
+            return None
+        assert line[:1] == b"*"
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(reader.readline()[1:-2])
+            args.append(reader.read(length + 2)[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _serve(self, conn):
+        reader = conn.makefile("rb")
+        state = {"db": 0, "authed": self.password is None}
+        with conn:
+            while True:
+                args = self._read_command(reader)
+                if args is None:
+                    return
+                self.commands.append([arg.decode() for arg in args])
+                conn.sendall(self._dispatch(state, args[0].decode().upper(), args[1:]))
+
+    def _dispatch(self, state, name, args):
+        if name == "AUTH":
+            if args[0].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            state["authed"] = True
+            return b"+OK\r\n"
+        if not state["authed"]:
+            return b"-NOAUTH Authentication required\r\n"
+        data = self.dbs[state["db"]]
+        if name == "SELECT":
+            state["db"] = int(args[0])
+            return b"+OK\r\n"
+        if name == "GET":
+            return self._bulk(data.get(args[0]))
+        if name == "SET":
+            data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if name == "DEL":
+            return b":%d\r\n" % (data.pop(args[0], None) is not None)
+        if name == "EVAL":
+            key, expected, new = args[2], args[3], args[4]
+            current = data.get(key)
+            if (current is None and expected != b"") or (current is not None and current != expected):
+                return b":0\r\n"
+            data[key] = new
+            return b":1\r\n"
+        if name == "SCAN":
+            cursor, prefix = int(args[0]), args[2].rstrip(b"*")
+            keys = sorted(key for key in data if key.startswith(prefix))
+            page = keys[cursor:cursor + self.scan_page]
+            following = cursor + self.scan_page if cursor + self.scan_page < len(keys) else 0
+            return b"*2\r\n" + self._bulk(str(following).encode()) + b"*%d\r\n" % len(page) + b"".join(map(self._bulk, page))
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis(password="hunter2")
+    yield server
+    server.close()
+
+
+def test_redis_auth_and_select(fake_redis):
+    backend = RedisBackend(fake_redis.url("hunter2", db=3))
+    backend.set("k", {"v": 1})
+    assert fake_redis.commands[:2] == [["AUTH", "hunter2"], ["SELECT", "3"]]
+    assert fake_redis.dbs[3][b"k"] == b'{"v":1}'
+    assert b"k" not in fake_redis.dbs[0]
+
+    with pytest.raises(RuntimeError, match="WRONGPASS"):
+        RedisBackend(fake_redis.url("wrong")).get("k")
+    with pytest.raises(RuntimeError, match="NOAUTH"):
+        RedisBackend(fake_redis.url()).get("k")
+
+
+def test_redis_get_set_delete(fake_redis):
+    backend = RedisBackend(fake_redis.url("hunter2"))
+    assert backend.get("missing") is None
+    backend.set("k", {"balance": 5, "keys": ["a"]})
+    assert backend.get("k") == {"balance": 5, "keys": ["a"]}
+    backend.set("t", 1, ttl=1.5)
+    assert fake_redis.commands[-1] == ["SET", "t", "1", "PX", "1500"]
+    backend.delete("k")
+    assert backend.get("k") is None
+
+
+def test_redis_compare_and_set(fake_redis):
+    backend = RedisBackend(fake_redis.url("hunter2"))
+    assert backend.compare_and_set("k", None, {"n": 1})
+    assert not backend.compare_and_set("k", None, {"n": 2})
+    assert not backend.compare_and_set("k", {"n": 0}, {"n": 2})
+    assert backend.compare_and_set("k", backend.get("k"), {"n": 2}, ttl=2)
+    assert backend.get("k") == {"n": 2}
+    assert fake_redis.commands[-2][-1] == "2000"
+
+
+def test_redis_scan_follows_cursor(fake_redis):
+    backend = RedisBackend(fake_redis.url("hunter2"))
+    rounds = RoundStore(backend)
+    for i in range(7):
+        rounds.put(f"r{i}", {"i": i})
+    backend.set("session:x", {})
+    assert sorted(rounds.keys()) == [f"r{i}" for i in range(7)]
+    assert sum(command[0] == "SCAN" for command in fake_redis.commands) == 4
@@ -0,0 +1,38 @@
+"""Test /simulate request validation and sharded runs through the Flask app."""
+
+import json
+
+import pytest
+import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, 'SIMULATION_WORKERS', 2)
+    yield app.app.test_client()
+    if app._simulation_pool is not None:
+        app._simulation_pool.shutdown()
+        app._simulation_pool = None
+
+
+def test_merged_shards_equal_single_run(client):
+    response = client.post('/simulate', json={'num_rounds': 4000, 'bet': app.MONETARY_PRECISION, 'workers': 2})
+    assert response.status_code == 200
+    assert response.get_json() == json.loads(json.dumps(app.run_simulation(4000, app.MONETARY_PRECISION)))
+
+
+@pytest.mark.parametrize('body', [
+    {'workers': 'many'},
+    {'workers': 0},
+    {'num_rounds': 'lots'},
+    {'num_rounds': 0},
+    {'num_rounds': app.MAX_SIMULATION_ROUNDS + 1},
+    {'num_rounds': 10.5},
+    {'bet': -1},
+    {'bet': True},
+    {'stream': 'yes'},
+])
+def test_invalid_fields_are_rejected(client, body):
+    response = client.post('/simulate', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_REQUEST'
@@ -0,0 +1,167 @@
+"""Test compact spawn plans and their expansion."""
+
+import json
+import random
+
+import numpy as np
+import pytest
+from game_math import ProvablyFairRNG
+from spawn_plan import SpawnPlan, TOP_SAFE, WORLD_CENTER_X
+
+
+def random_at(nonce):
+    return random.Random(nonce).random()
+
+
+def eager_spawn_data(generate_random, black_hole_triggered):
+    """The original GameMath._generate_spawn_data, drawing sequentially from generate_random"""
+    SCREEN_W, WORLDH = 1920, 20000
+    GROUND_Y = WORLDH - 700
+    DEADZONE = 1500
+    TOP, BOTTOM = DEADZONE, GROUND_Y - DEADZONE
+    CENTER, WIDTH = 8000, 1400
+    MIN_X, MAX_X = CENTER - (WIDTH / 2), CENTER + (WIDTH / 2)
+    spawn_data = {
+        'collectibles': [], 'black_holes': [], 'clouds': [], 'dark_clouds': [], 'pushables': [],
+        'config': {'screen_w': SCREEN_W, 'world_h': WORLDH, 'ground_y': GROUND_Y,
+                   'deadzone': DEADZONE, 'corridor_width': WIDTH, 'world_center_x': CENTER},
+    }
+
+    path_points = [(CENTER, TOP)]
+    current_x, current_y = CENTER, TOP
+    direction = 1 if generate_random() < 0.5 else -1
+    while current_y < BOTTOM:
+        next_y = current_y + 150 + generate_random() * (250 - 150)
+        if next_y > BOTTOM:
+            next_y = BOTTOM
+        if direction == 1:
+            target_x = CENTER + (100 + generate_random() * (500 - 100))
+        else:
+            target_x = CENTER - (100 + generate_random() * (500 - 100))
+        target_x = max(MIN_X + 100, min(MAX_X - 100, target_x))
+        path_points.append((target_x, next_y))
+        cloud_x = current_x - 150 if target_x - current_x > 0 else current_x + 150
+        spawn_data['clouds'].append({
+            'type': 1 if generate_random() < 0.5 else 2,
+            'x': round(cloud_x, 2),
+            'y': round(current_y + 100, 2),
+            'index': len(spawn_data['clouds']),
+        })
+        current_x, current_y = target_x, next_y
+        direction *= -1
+
+    for i in range(300):
+        ctype = 'chain' if generate_random() < 0.4 else 'music'
+        if len(path_points) > 1:
+            seg_idx = int(generate_random() * (len(path_points) - 1))
+            p1, p2 = path_points[seg_idx], path_points[seg_idx + 1]
+            t = generate_random()
+            px = p1[0] + (p2[0] - p1[0]) * t
+            py = p1[1] + (p2[1] - p1[1]) * t
+            px += (generate_random() - 0.5) * 300
+            spawn_data['collectibles'].append({'type': ctype, 'x': round(px, 2), 'y': round(py, 2), 'index': i})
+    for i in range(50):
+        x = MIN_X + generate_random() * WIDTH
+        y = TOP + generate_random() * (BOTTOM - DEADZONE - 300 - TOP)
+        spawn_data['black_holes'].append({'x': round(x, 2), 'y': round(y, 2),
+                                          'will_trigger': i == 0 and black_hole_triggered, 'index': i})
+    for i in range(20):
+        x = MIN_X + generate_random() * WIDTH
+        y = TOP + generate_random() * (BOTTOM - 550 - TOP)
+        spawn_data['pushables'].append({'x': round(x, 2), 'y': round(y, 2), 'index': i})
+    return spawn_data
+
+
+def typed(value):
+    """value with every leaf paired with its type, so 8150 and 8150.0 differ"""
+    if isinstance(value, dict):
+        return {key: typed(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [typed(item) for item in value]
+    return (type(value), value)
+
+
+@pytest.mark.parametrize('server_seed, client_seed, nonce_start, black_hole_triggered', [
+    ('a' * 64, 'client', 0, False),
+    ('b' * 64, 'client', 17, True),
+    ('c' * 64, 'other', 1000, False),
+])
+def test_expansion_matches_eager_generator(server_seed, client_seed, nonce_start, black_hole_triggered):
+    rng = ProvablyFairRNG(server_seed, client_seed)
+    plan = SpawnPlan.build(rng.random_at, nonce_start, black_hole_triggered)
+    rng.nonce = nonce_start
+    expected = eager_spawn_data(rng.generate_random, black_hole_triggered)
+    assert typed(plan.to_dict()) == typed(expected)
+    assert rng.nonce == plan.nonce_end
+
+
+def test_integral_coordinates_stay_ints():
+    plan = SpawnPlan.build(random_at, 0, False)
+    first = plan.clouds()[0]
+    assert type(first['x']) is int and first['x'] in (WORLD_CENTER_X - 150, WORLD_CENTER_X + 150)
+    assert first['y'] == TOP_SAFE + 100 and type(first['y']) is int
+
+    compact = plan.to_compact()
+    assert compact['path']['x'][0] == WORLD_CENTER_X and type(compact['path']['x'][0]) is int
+    assert compact['clouds']['x'][0] == first['x']
+    assert all(type(x) is float for x in compact['path']['x'][1:])
+
+
+def test_compact_plan_expands_collectibles():
+    plan = SpawnPlan.build(random_at, 5, True)
+    compact = json.loads(json.dumps(plan.to_compact()))
+    sections = compact['sections']
+    rebuilt = SpawnPlan(
+        random_at,
+        compact['nonce_start'],
+        compact['black_hole_triggered'],
+        np.array(compact['path']['x'], dtype=np.float64),
+        np.array(compact['path']['y'], dtype=np.float64),
+        np.array(compact['clouds']['type'], dtype=np.uint8),
+        np.array(compact['clouds']['x'], dtype=np.float64),
+        np.array(compact['clouds']['y'], dtype=np.float64),
+        {name: section['nonce'] for name, section in sections.items()},
+        sections['collectibles']['count'],
+    )
+    assert rebuilt.to_dict() == plan.to_dict()
+    assert rebuilt.nonce_end == compact['nonce_end']
+
+
+def test_spawn_endpoint_keeps_path():
+    import app
+
+    session = app.handle_authenticate({})[0]
+    played, status = app.handle_play({'sessionID': session['session_token'], 'bet': app.MIN_BET})
+    assert status == 200
+    compact, status = app.handle_spawn(played['round_id'], {})
+    assert status == 200
+    assert len(compact['path']['x']) == len(compact['clouds']['x']) + 1
+
+
+def test_spawn_endpoint_rejects_negative_range():
+    import app
+
+    session = app.handle_authenticate({})[0]
+    played, _ = app.handle_play({'sessionID': session['session_token'], 'bet': app.MIN_BET})
+    for bad in ('-1:', '-5:2', '0:-1'):
+        body, status = app.handle_spawn(played['round_id'], {'section': 'collectibles', 'range': bad})
+        assert (status, body['code']) == (400, 'INVALID_RANGE')
+    body, status = app.handle_spawn(played['round_id'], {'section': 'collectibles', 'range': '1:3'})
+    assert status == 200 and body['start'] == 1 and len(body['items']) == min(2, body['count'] - 1)
+
+
+def test_spawn_endpoint_draws_from_the_published_expansion():
+    import app
+    from provably_fair import expand_random
+
+    session = app.handle_authenticate({})[0]
+    played, _ = app.handle_play({'sessionID': session['session_token'], 'bet': app.MIN_BET})
+    compact, _ = app.handle_spawn(played['round_id'], {})
+    round_data = app.rounds.get(played['round_id'])
+    seeds = app.sessions.get(round_data['account_id'])
+    draws = expand_random(app.SERVER_SECRET, seeds['server_seed'], seeds['client_seed'],
+                          round_data['nonce'], compact['nonce_end'])
+    plan = SpawnPlan.build(draws.__getitem__, 0, round_data['outcome']['black_hole_triggered'])
+    assert {'round_id': played['round_id'], **plan.to_compact()} == compact
+    assert plan.to_dict() == app.get_spawn_plan(seeds['server_seed'], seeds['client_seed'], round_data['nonce'],
+                                                round_data['outcome']['black_hole_triggered']).to_dict()